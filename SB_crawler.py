@@ -1,4 +1,5 @@
 import os
+import contextlib
 import json
 import re
 import time
@@ -9,17 +10,27 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from UCanScrapeX import XCrawler
+from event_archive import ArchivedKeys
+from event_categorizer import categorize_event
+from event_model import Event, load_event_file, save_event_file
+from file_lock import file_lock
+from tweet_parser import parse_time_range
+
+SB_VENUE_NAME = "玩具間"
+SB_CALENDAR_URL = "https://studiobondage.com/sb%e7%8e%a9%e5%85%b7%e9%96%93%e6%b4%bb%e5%8b%95%e6%97%a5%e6%9b%86/"
+
 
 class SBCrawler:
     """SB玩具間活動日曆爬蟲"""
     
-    def __init__(self, driver=None, user_data_dir="profile1", locale_code='zh-TW'):
+    def __init__(self, driver=None, user_data_dir="profile1", locale_code='zh-TW', calendar_url=SB_CALENDAR_URL):
         """初始化爬蟲
         
         Args:
             driver: 外部傳入的 WebDriver（如果提供，則使用此 driver；否則創建新的）
             user_data_dir: 瀏覽器配置目錄（當 driver 為 None 時使用）
             locale_code: 語言代碼（當 driver 為 None 時使用）
+            calendar_url: 活動日曆網址（離線重播時可指向本機的 fixture 伺服器）
         """
         self.external_driver = driver is not None  # 記錄是否使用外部 driver
         
@@ -32,16 +43,27 @@ class SBCrawler:
             self.crawler = XCrawler(user_data_dir=user_data_dir, locale_code=locale_code)
             self.driver = self.crawler.driver
             
-        self.venue_name = "玩具間"
+        self.venue_name = SB_VENUE_NAME
         self.output_dir = "outputs"
+        self.calendar_url = calendar_url
+        self.last_events_added = 0  # 最近一次 save_events 新增的活動數
         
-    def scrape_events(self, url="https://studiobondage.com/sb%e7%8e%a9%e5%85%b7%e9%96%93%e6%b4%bb%e5%8b%95%e6%97%a5%e6%9b%86/", debug=False):
+    def _phase(self, metrics, name):
+        """有傳入 metrics 時以場地名稱記錄階段耗時，否則不做任何事"""
+        if metrics is None:
+            return contextlib.nullcontext()
+        return metrics.phase(name, account=self.venue_name)
+
+    def scrape_events(self, url=None, debug=False, metrics=None):
         """爬取 SB玩具間 活動日曆
         
         Args:
-            url: 活動日曆網址
+            url: 活動日曆網址（預設為 self.calendar_url）
             debug: 是否顯示詳細 debug 信息
+            metrics: CrawlMetrics（可選），記錄頁面載入與解析耗時及活動數
         """
+        if url is None:
+            url = self.calendar_url
         # 記錄原始窗口大小
         original_size = self.driver.get_window_size()
         original_width = original_size['width']
@@ -57,45 +79,49 @@ class SBCrawler:
                 print(f"[DEBUG] 瀏覽器窗口已調整為 360x750")
             
             print(f"⏳ 正在訪問 {url}")
-            self.driver.get(url)
-            
-            # 等待頁面載入 - 等待表格出現
-            time.sleep(3)  # 等待頁面完全載入
+            with self._phase(metrics, 'sb_page_load'):
+                self.driver.get(url)
+                
+                # 等待頁面載入 - 等待表格出現
+                time.sleep(3)  # 等待頁面完全載入
             
             print("✅ 頁面載入成功，開始解析活動...")
             
-            # 先獲取當前顯示的年月
-            current_year, current_month = self._get_current_year_month(debug=debug)
+            with self._phase(metrics, 'sb_parse'):
+                # 先獲取當前顯示的年月
+                current_year, current_month = self._get_current_year_month(debug=debug)
             
-            if debug:
-                print(f"[DEBUG] 當前日曆: {current_year} 年 {current_month} 月")
+                if debug:
+                    print(f"[DEBUG] 當前日曆: {current_year} 年 {current_month} 月")
             
-            # 找到所有包含活動的表格單元格（只找有 has_events 類的）
-            event_cells = self.driver.find_elements(By.CSS_SELECTOR, "td.has_events")
+                # 找到所有包含活動的表格單元格（只找有 has_events 類的）
+                event_cells = self.driver.find_elements(By.CSS_SELECTOR, "td.has_events")
             
-            if debug:
-                print(f"[DEBUG] 找到 {len(event_cells)} 個包含活動的 td 元素")
+                if debug:
+                    print(f"[DEBUG] 找到 {len(event_cells)} 個包含活動的 td 元素")
             
-            events = []
-            taipei_tz = pytz.timezone('Asia/Taipei')
+                events = []
+                taipei_tz = pytz.timezone('Asia/Taipei')
             
-            for i, cell in enumerate(event_cells):
-                try:
-                    if debug:
-                        print(f"\n[DEBUG] === 單元格 #{i+1} ===")
+                for i, cell in enumerate(event_cells):
+                    try:
+                        if debug:
+                            print(f"\n[DEBUG] === 單元格 #{i+1} ===")
                     
-                    event_data_list = self._parse_event_cell(cell, taipei_tz, current_year, current_month, debug=debug)
-                    if event_data_list:
-                        for event_data in event_data_list:
-                            events.append(event_data)
-                            if debug:
-                                print(f"[DEBUG] ✅ 成功解析活動: {event_data['title']}")
-                except Exception as e:
-                    if debug:
-                        print(f"⚠️ 解析單元格 #{i+1} 時出錯: {e}")
-                        traceback.print_exc()
-                    continue
+                        event_data_list = self._parse_event_cell(cell, taipei_tz, current_year, current_month, debug=debug)
+                        if event_data_list:
+                            for event_data in event_data_list:
+                                events.append(event_data)
+                                if debug:
+                                    print(f"[DEBUG] ✅ 成功解析活動: {event_data.title}")
+                    except Exception as e:
+                        if debug:
+                            print(f"⚠️ 解析單元格 #{i+1} 時出錯: {e}")
+                            traceback.print_exc()
+                        continue
             
+            if metrics is not None:
+                metrics.count('sb_events', len(events), account=self.venue_name)
             print(f"📊 統計: 成功解析 {len(events)} 個活動")
             return events
             
@@ -195,10 +221,9 @@ class SBCrawler:
                     try:
                         time_span = event_item.find_element(By.CSS_SELECTOR, "span.time")
                         time_text = time_span.text.strip()
-                        time_match = re.search(r'(\d{1,2}):(\d{2})\s*[–\-~～]\s*(\d{1,2}):(\d{2})', time_text)
-                        if time_match:
-                            start_time = f"{int(time_match.group(1)):02d}:{time_match.group(2)}"
-                            end_time = f"{int(time_match.group(3)):02d}:{time_match.group(4)}"
+                        # 與推文共用時間範圍解析（全形與各種破折號由正規化處理）
+                        start_time, end_time = parse_time_range(time_text)
+                        if start_time:
                             if debug:
                                 print(f"[DEBUG] 解析時間: {start_time} ~ {end_time}")
                     except:
@@ -233,19 +258,18 @@ class SBCrawler:
                         pass
                     
                     # 建立活動數據
-                    event_data = {
-                        "date": date_str,
-                        "text": f"{self.venue_name} - {title} {start_time}~{end_time}" if start_time else f"{self.venue_name} - {title}",
-                        "check": True,  # 從網站抓下來的都設為 True
-                        "venue": self.venue_name,
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "link": link,
-                        "title": title,
-                        "brief_description": "",
-                        "delete": False,
-                        "category": self._categorize_event(title)
-                    }
+                    event_data = Event(
+                        date=date_str,
+                        check=True,  # 從網站抓下來的都設為 True
+                        venue=self.venue_name,
+                        start_time=start_time,
+                        end_time=end_time,
+                        link=link,
+                        title=title,
+                        delete=False,
+                        category=self._categorize_event(title)
+                    ).normalize()
+                    event_data.text = event_data.build_text()
                     
                     events.append(event_data)
                     
@@ -262,30 +286,17 @@ class SBCrawler:
             return None
     
     def _categorize_event(self, title):
-        """根據標題自動分類活動"""
-        title_lower = title.lower()
-        
-        # 根據關鍵字分類
-        if 'bd' in title_lower or '綁縛' in title:
-            return 'bd'
-        elif 'sp' in title_lower or '拍打' in title:
-            return 'sp'
-        elif 'v.i.p' in title_lower or 'vip' in title_lower or '別館' in title:
-            return 'ss'
-        elif '放飛' in title or '聊天' in title or 'ds' in title_lower or 'sm' in title_lower:
-            return 'so'
-        elif '工作坊' in title or '體驗' in title:
-            return 'wk'
-        else:
-            return 'so'  # 預設為社交類
+        """根據標題自動分類活動（規則見 category_rules.json），沒有符合的規則時為社交類"""
+        return categorize_event(title, default='so')
     
-    def save_events(self, events, filename=None, merge_existing=True):
+    def save_events(self, events, filename=None, merge_existing=True, metrics=None):
         """儲存活動到 JSON 檔案
         
         Args:
             events: 要儲存的活動列表
             filename: 檔案名稱（預設為 玩具間_events.json）
             merge_existing: 是否與現有檔案合併（預設為 True）
+            metrics: CrawlMetrics（可選），記錄合併與寫檔耗時、新增活動數及寫入位元組
         """
         try:
             os.makedirs(self.output_dir, exist_ok=True)
@@ -295,25 +306,36 @@ class SBCrawler:
             
             filepath = os.path.join(self.output_dir, filename)
             
-            final_events = events
+            # 讀取、合併到寫回都持有檔案鎖，UI 同時編輯玩具間的活動時不會被覆蓋
+            with file_lock(filepath):
+                # 已封存（過去月份或已刪除）的活動不在檔案中，以去重鍵略過，避免被重新加回
+                archived_keys = ArchivedKeys.load(self.output_dir, self.venue_name)
+                events = [event for event in events if not archived_keys.has_date_title(event.date, event.title)]
+                final_events = events
+                self.last_events_added = len(events)
             
-            # 如果要合併，先讀取現有檔案
-            if merge_existing and os.path.exists(filepath):
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        existing_events = json.load(f)
-                    
-                    # 合併活動，避免重複
-                    final_events = self._merge_events(existing_events, events)
-                    print(f"📋 已與現有 {len(existing_events)} 個活動合併")
-                except Exception as e:
-                    print(f"⚠️ 讀取現有檔案時出錯，將使用新資料: {e}")
+                # 如果要合併，先讀取現有檔案
+                if merge_existing and os.path.exists(filepath):
+                    try:
+                        with self._phase(metrics, 'sb_merge'):
+                            existing_events = load_event_file(filepath, venue=self.venue_name)
+                        
+                            # 合併活動，避免重複
+                            final_events = self._merge_events(existing_events, events)
+                        self.last_events_added = len(final_events) - len(existing_events)
+                        if metrics is not None:
+                            metrics.count('events_added', self.last_events_added, account=self.venue_name)
+                        print(f"📋 已與現有 {len(existing_events)} 個活動合併")
+                    except Exception as e:
+                        print(f"⚠️ 讀取現有檔案時出錯，將使用新資料: {e}")
             
-            # 按日期排序
-            final_events.sort(key=lambda x: x.get('date', ''))
+                # 按日期排序
+                final_events.sort(key=lambda x: x.date or '')
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(final_events, f, ensure_ascii=False, indent=4)
+                with self._phase(metrics, 'sb_write'):
+                    bytes_written = save_event_file(filepath, final_events)
+            if metrics is not None:
+                metrics.count('bytes_written', bytes_written, account=self.venue_name)
             
             print(f"✅ 活動已儲存至 {filepath} (共 {len(final_events)} 個活動)")
             return filepath
@@ -333,34 +355,30 @@ class SBCrawler:
         Returns:
             合併後的活動列表
         """
-        # 建立現有活動的唯一標識集合（日期 + 標題）
-        existing_keys = {
-            (event.get('date'), event.get('title'))
-            for event in existing_events
-            if event.get('date') and event.get('title')
-        }
+        # 建立現有活動的索引（日期 + 標題 -> 活動）
+        existing_by_key = {}
+        for event in existing_events:
+            if event.date and event.title:
+                existing_by_key.setdefault((event.date, event.title), event)
         
         # 合併活動
         merged = list(existing_events)
         
         for new_event in new_events:
-            key = (new_event.get('date'), new_event.get('title'))
-            if key not in existing_keys:
+            key = (new_event.date, new_event.title)
+            existing_event = existing_by_key.get(key)
+            if existing_event is None:
                 merged.append(new_event)
-                existing_keys.add(key)
-                print(f"  ➕ 新增活動: {new_event.get('date')} - {new_event.get('title')}")
+                existing_by_key[key] = new_event
+                print(f"  ➕ 新增活動: {new_event.date} - {new_event.title}")
             else:
                 # 如果活動已存在，但從網站抓的資料更完整，則更新
-                # 找到對應的現有活動並更新
-                for i, existing_event in enumerate(merged):
-                    if (existing_event.get('date'), existing_event.get('title')) == key:
-                        # 如果新活動有連結而舊活動沒有，則更新
-                        if new_event.get('link') and not existing_event.get('link'):
-                            merged[i]['link'] = new_event['link']
-                            print(f"  🔄 更新活動連結: {new_event.get('date')} - {new_event.get('title')}")
-                        # 確保 check 設為 True（從網站抓的都是已確認的）
-                        merged[i]['check'] = True
-                        break
+                # 如果新活動有連結而舊活動沒有，則更新
+                if new_event.link and not existing_event.link:
+                    existing_event.link = new_event.link
+                    print(f"  🔄 更新活動連結: {new_event.date} - {new_event.title}")
+                # 確保 check 設為 True（從網站抓的都是已確認的）
+                existing_event.check = True
         
         return merged
     
@@ -390,7 +408,7 @@ def main():
             # 顯示活動列表
             print("\n🔍 活動列表:")
             for event in events:
-                print(f"  - {event['date']} {event['title']} ({event['start_time']}~{event['end_time']})")
+                print(f"  - {event.date} {event.title} ({event.start_time}~{event.end_time})")
         else:
             print("⚠️ 沒有爬取到任何活動")
             
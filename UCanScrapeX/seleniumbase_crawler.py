@@ -1,5 +1,6 @@
 import os
 import signal
+import contextlib
 import sys
 import traceback
 from selenium.webdriver.common.by import By
@@ -15,8 +16,206 @@ import json
 import csv
 import re
 from datetime import datetime
+from urllib.parse import quote, urlsplit
 import pytz
-from typing import List, Dict, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BASE_URL = "https://x.com"
+# Account menu in the side navigation; X only renders it for logged-in sessions
+LOGGED_IN_SELECTOR = '[data-testid="SideNav_AccountSwitcher_Button"]'
+
+# Lines X renders around the tweet body (buttons, labels and warnings), compared after strip()
+_JUNK_LINES = frozenset([
+    # English
+    "Show this thread", "Show more", "Translate post", "View",
+    "The author labeled this post as containing sensitive content.",
+    "Content warning: Sensitive content", "Adult content",
+    "The following media includes potentially sensitive content.",
+    "X labeled this post as containing Adult Content.",
+    "This Post is from a suspended account. Learn more",
+    "Change settings", "Show", "More",
+    # Chinese
+    "顯示", "顯示更多", "內容警告：成人內容",
+    "以下的媒體可能包含敏感內容。變更設定", "查看",
+    "X 已將此貼文標示為包含成人內容。",
+    "此貼文來自遭停權的帳戶。了解更多",
+    # Common
+    "…",
+])
+# View counts, likes, etc. e.g., "1,234", "1.5K", "2M", "1.8萬"
+_STAT_PATTERN = re.compile(r'[,\d.]+[KMB萬千]?')
+# X rejects longer search queries, so combined searches are split into several queries
+SEARCH_QUERY_MAX_LENGTH = 480
+# Timelines of at least this many tweets are scraped in long-scroll mode: extracted articles
+# well above the viewport are removed from the page so Chrome's DOM and memory stay flat
+LONG_SCROLL_MIN_TWEETS = 200
+# Articles whose bottom edge is more than this many pixels above the viewport can be pruned
+PRUNE_MARGIN_PX = 2000
+# Most new articles read per extraction pass; the rest are read on the next pass
+EXTRACT_BATCH_LIMIT = 100
+_PINNED_LABELS = frozenset(["Pinned", "已釘選"])
+_REPOST_LABELS = ("reposted", "已轉發")
+
+# Reads the newly loaded tweets in one round trip instead of several WebDriver commands per tweet.
+# The body comes straight from the [data-testid="tweetText"] node (emoji are <img alt>, so
+# they are read from alt); the full article text is only returned when that node is missing.
+#
+# The seen-set lives in the page: read articles are marked with data-xcrawler-done and their
+# URLs kept in window.__xcrawlerSeen (X may re-render a tweet as a new node), so each pass
+# only touches new articles and Python does not keep its own set of links. The set is reset
+# by every page load. An article is only marked once its permalink has rendered, so ads and
+# articles that are still loading are checked again on the next pass.
+# Arguments: prune (bool), limit (max new articles per pass), margin (px).
+# Returns {tweets: [...], scanned: number of articles marked read, pruned: number of removed articles}.
+_EXTRACT_TWEETS_SCRIPT = """
+var prune = arguments[0], limit = arguments[1], margin = arguments[2];
+function textOf(node) {
+    if (!node.querySelector('img')) return node.innerText;
+    var parts = [];
+    (function walk(parent) {
+        for (var child = parent.firstChild; child; child = child.nextSibling) {
+            if (child.nodeType === 3) {
+                parts.push(child.nodeValue);
+            } else if (child.nodeName === 'IMG') {
+                parts.push(child.alt || '');
+            } else if (child.nodeName === 'BR') {
+                parts.push('\\n');
+            } else if (child.nodeType === 1) {
+                if (parts.length && getComputedStyle(child).display === 'block') parts.push('\\n');
+                walk(child);
+            }
+        }
+    })(node);
+    return parts.join('');
+}
+var seen = window.__xcrawlerSeen || (window.__xcrawlerSeen = new Set());
+var result = [], scanned = 0;
+var articles = document.querySelectorAll('article[data-testid="tweet"]:not([data-xcrawler-done])');
+for (var i = 0; i < articles.length && result.length < limit; i++) {
+    var article = articles[i];
+    var time = article.querySelector('a > time');
+    if (!time) continue;  // ads and articles still loading have no permalink (yet)
+    article.setAttribute('data-xcrawler-done', '1');
+    scanned++;
+    var url = time.parentElement.href;
+    if (seen.has(url)) continue;
+    seen.add(url);
+    var body = article.querySelector('[data-testid="tweetText"]');
+    var text = body ? textOf(body) : null;
+    var full = article.innerText;
+    result.push({
+        url: url,
+        time: time.getAttribute('datetime'),
+        header: full.split('\\n').filter(function (line) { return line.trim(); }).slice(0, 2),
+        text: text,
+        full: text && text.trim() ? null : full
+    });
+}
+var pruned = 0;
+if (prune) {
+    // Read articles are in document order, so stop at the first one that is still near the
+    // viewport; it anchors the scroll position while the ones above it are removed.
+    var done = document.querySelectorAll('article[data-xcrawler-done]');
+    var stale = [], anchor = null;
+    for (var j = 0; j < done.length; j++) {
+        var cell = done[j].closest('[data-testid="cellInnerDiv"]') || done[j];
+        if (cell.getBoundingClientRect().bottom < -margin) {
+            stale.push(cell);
+        } else {
+            anchor = cell;
+            break;
+        }
+    }
+    if (stale.length) {
+        var anchorTop = anchor ? anchor.getBoundingClientRect().top : 0;
+        for (var k = 0; k < stale.length; k++) stale[k].remove();
+        pruned = stale.length;
+        if (anchor) window.scrollBy(0, anchor.getBoundingClientRect().top - anchorTop);
+    }
+}
+return {tweets: result, scanned: scanned, pruned: pruned};
+"""
+
+
+def clean_tweet_text(full_text: str) -> str:
+    """
+    Cleans the full article text by removing author info and interaction buttons.
+
+    Fallback for tweets without a [data-testid="tweetText"] node (media-only posts or
+    layout changes); see tweet_text_from_item.
+
+    Args:
+        full_text: The original article text.
+
+    Returns:
+        str: The cleaned tweet text.
+    """
+    lines = full_text.split('\n')
+
+    # The content usually starts on the second line after the '·' symbol (the first being the date)
+    content_start_index = 0
+    for i in range(1, len(lines) - 2):
+        if lines[i].strip() == '·':
+            content_start_index = i + 2
+            break
+
+    if content_start_index == 0 and len(lines) > 4: # Fallback strategy
+        content_start_index = 4
+
+    # Check from the bottom up: the last few lines are usually stats, junk messages or empty lines
+    content_end_index = len(lines)
+    while content_end_index > 0:
+        line = lines[content_end_index - 1].strip()
+        if line and line not in _JUNK_LINES and _STAT_PATTERN.fullmatch(line) is None:
+            break
+        content_end_index -= 1
+
+    if content_start_index >= content_end_index:
+        # If positioning is confusing, return the original text
+        return full_text
+
+    return '\n'.join(lines[content_start_index:content_end_index]).strip()
+
+
+def tweet_author(tweet_url: str) -> str:
+    """Returns the author handle from a status URL (https://x.com/<handle>/status/<id>)."""
+    parts = urlsplit(tweet_url).path.split('/')
+    return parts[1] if len(parts) > 2 else ''
+
+
+def combined_search_queries(usernames: List[str], max_length: int = SEARCH_QUERY_MAX_LENGTH) -> List[str]:
+    """
+    Builds "(from:a OR from:b ...) -filter:replies" search queries covering all usernames.
+
+    Replies are excluded to match the profile page's Posts tab. Usernames are split
+    across several queries when one query would exceed max_length.
+    """
+    suffix = " -filter:replies"
+    queries = []
+    terms = []
+    for username in usernames:
+        term = f"from:{username}"
+        candidate = terms + [term]
+        if terms and len(f"({' OR '.join(candidate)}){suffix}") > max_length:
+            queries.append(f"({' OR '.join(terms)}){suffix}")
+            candidate = [term]
+        terms = candidate
+    if terms:
+        queries.append(f"({' OR '.join(terms)}){suffix}")
+    return queries
+
+
+def tweet_text_from_item(item: Dict) -> Tuple[str, bool]:
+    """
+    Returns (text, structured) for one result of the in-page extraction script.
+
+    structured is False when the tweetText node was missing or empty and the text was
+    recovered from the full article text with clean_tweet_text.
+    """
+    text = (item.get('text') or '').strip()
+    if text:
+        return text, True
+    return clean_tweet_text(item.get('full') or ''), False
 
 
 class XCrawler:
@@ -24,17 +223,20 @@ class XCrawler:
     X (Twitter) Crawler class for object-oriented tweet scraping.
     """
     
-    def __init__(self, user_data_dir: str = "profile1", locale_code: str = 'en-US'):
+    def __init__(self, user_data_dir: str = "profile1", locale_code: str = 'en-US', base_url: str = DEFAULT_BASE_URL):
         """
         Initializes the X Crawler.
         
         Args:
             user_data_dir: Browser user data directory.
             locale_code: Language code.
+            base_url: Site root used for profile and login pages. Point this at a local
+                fixture server to replay recorded timelines offline.
         """
         self.headless = False # Headless mode is often blocked by X, so it's forced to False.
         self.user_data_dir = os.path.abspath(user_data_dir)
         self.locale_code = locale_code
+        self.base_url = base_url.rstrip('/')
         self.driver = None
         self.taipei_tz = pytz.timezone('Asia/Taipei')
         
@@ -72,6 +274,29 @@ class XCrawler:
             print(f"❌ Crawler initialization failed: {e}")
             raise
 
+    def restart(self):
+        """
+        Quits the current driver (if any) and starts a new one with the same profile.
+
+        The logged-in session lives in user_data_dir, so it survives the restart. If the
+        previous Chrome crashed, its stale profile lock files are removed first so the new
+        instance can open the profile.
+        """
+        old_driver, self.driver = self.driver, None
+        if old_driver is not None:
+            try:
+                old_driver.quit()
+            except Exception as e:
+                print(f"⚠️ Error while quitting the old driver (ignored): {e}")
+        for lock_name in ("SingletonLock", "SingletonSocket", "SingletonCookie"):
+            lock_path = os.path.join(self.user_data_dir, lock_name)
+            if os.path.lexists(lock_path):
+                try:
+                    os.remove(lock_path)
+                except OSError:
+                    pass
+        self._initialize_driver()
+
     def wait_for_elements(self, by, value, waittime: int = 10) -> bool:
         """
         Waits for page elements to load.
@@ -166,122 +391,190 @@ class XCrawler:
 
     def login_to_x(self) -> bool:
         """
-        Logs in to X (Twitter).
-        
+        Logs in to X (Twitter) interactively: opens the login page and waits for Enter on stdin.
+
+        Only for console use. Processes without a usable stdin (e.g. a GUI worker) should call
+        open_login_page() and, once the user has confirmed, is_logged_in().
+
         Returns:
             bool: Whether the login was successful.
         """
-        print("🔐 First-time login to X (Twitter). Please log in manually in the browser.")
+        if not self.open_login_page():
+            return False
+        print("Please complete the login in the opened browser window. Press Enter to continue scraping after logging in.")
+        input("Press Enter when ready...")  # Wait for the user to complete manual login
+        print("✅ User has confirmed login is complete.")
+        return True
+
+    def open_login_page(self) -> bool:
+        """
+        Opens the X (Twitter) login page and returns without waiting; the user logs in manually in the browser.
+
+        Returns:
+            bool: Whether the login page was opened.
+        """
+        print("🔐 Opening the X (Twitter) login page. Please log in manually in the browser.")
         try:
-            self.driver.get("https://X.com/login")
-            print("Please complete the login in the opened browser window. Press Enter to continue scraping after logging in.")
-            input("Press Enter when ready...")  # Wait for the user to complete manual login
-            print("✅ User has confirmed login is complete.")
+            self.driver.get(f"{self.base_url}/login")
             return True
         except Exception as e:
             print(f"❌ Failed to open X (Twitter) login page: {e}")
             print(traceback.format_exc())
             return False
 
-    def scrape_x_tweets(self, username: str, num_tweets: int = 10, debug: bool = False, ignore_retweets: bool = True, ignore_pinned: bool = True) -> List[Dict]:
+    def is_logged_in(self, waittime: int = 10) -> bool:
+        """
+        Loads the home timeline and checks for the account menu, which only logged-in sessions have.
+
+        Args:
+            waittime: Seconds to wait for the account menu.
+
+        Returns:
+            bool: Whether the browser session is logged in.
+        """
+        try:
+            self.driver.get(f"{self.base_url}/home")
+        except Exception as e:
+            print(f"❌ Failed to open X (Twitter) home page: {e}")
+            return False
+        logged_in = self.wait_for_elements(By.CSS_SELECTOR, LOGGED_IN_SELECTOR, waittime)
+        print("✅ X (Twitter) session is logged in." if logged_in else "⚠️ X (Twitter) session is not logged in.")
+        return logged_in
+
+    @staticmethod
+    def _phase(metrics, name: str, account: Optional[str] = None):
+        """Returns metrics.phase(...) when a metrics collector is given, otherwise a no-op context."""
+        if metrics is None:
+            return contextlib.nullcontext()
+        return metrics.phase(name, account=account)
+
+    def scrape_x_tweets(self, username: str, num_tweets: int = 10, debug: bool = False, ignore_retweets: bool = True, ignore_pinned: bool = True, metrics=None, should_stop: Optional[Callable[[], bool]] = None) -> List[Dict]:
         """
         Scrapes tweets from a specified user.
-        
+
+        List version of iter_x_tweets; the arguments are the same.
+
+        Returns:
+            List[Dict]: A list of tweet data.
+        """
+        return list(self.iter_x_tweets(
+            username,
+            num_tweets=num_tweets,
+            debug=debug,
+            ignore_retweets=ignore_retweets,
+            ignore_pinned=ignore_pinned,
+            metrics=metrics,
+            should_stop=should_stop,
+        ))
+
+    def iter_x_tweets(self, username: str, num_tweets: int = 10, debug: bool = False, ignore_retweets: bool = True, ignore_pinned: bool = True, metrics=None, should_stop: Optional[Callable[[], bool]] = None) -> Iterator[Dict]:
+        """
+        Scrapes tweets from a specified user, yielding each tweet as soon as it is extracted.
+
+        Every batch of newly loaded tweets is yielded before the page is scrolled again, so
+        the consumer can process them without waiting for the whole account. Breaking out of
+        the loop (or closing the generator) ends scraping without scrolling again.
+
         Args:
             username: X (Twitter) username.
-            num_tweets: Number of tweets to scrape.
+            num_tweets: Number of tweets to scrape (at most this many are yielded).
             debug: Whether to enable debug mode to show original and cleaned text.
             ignore_retweets: Whether to ignore retweets.
             ignore_pinned: Whether to ignore pinned tweets.
-            
-        Returns:
-            List[Dict]: A list of tweet data.
+            metrics: Optional CrawlMetrics collector. Time spent loading the page, extracting
+                tweets and scrolling is recorded per account, along with tweets seen and kept.
+                Time the consumer spends between tweets is not counted.
+            should_stop: Optional callable checked before every scroll. When it returns True
+                scraping ends early.
+
+        Yields:
+            Dict: Tweet data with post_time, text, tweet_url and author.
         """
         print(f"🐦 Scraping tweets from user @{username}, targeting {num_tweets} tweets.")
-        tweets_data = []
-        processed_links = set()
+        yield from self._iter_timeline(
+            f"{self.base_url}/{username}", username, num_tweets, debug, ignore_retweets, ignore_pinned, metrics, should_stop
+        )
+
+    def iter_combined_tweets(self, usernames: List[str], num_tweets: int = 10, list_url: Optional[str] = None, debug: bool = False, ignore_retweets: bool = True, metrics=None, should_stop: Optional[Callable[[], bool]] = None, label: str = 'combined') -> Iterator[Dict]:
+        """
+        Scrapes tweets from several users through one combined timeline.
+
+        Reads either the given X List (which should contain the accounts) or a live search
+        for "from:a OR from:b ...". One page load and one scroll session replace one per
+        user. Each yielded tweet has an "author" handle for attributing it back to its
+        account; tweets from accounts that are not in usernames may appear in a List.
+
+        Args:
+            usernames: X (Twitter) usernames to cover.
+            num_tweets: Total number of tweets to scrape. When the search has to be split
+                into several queries, each query gets a share proportional to its users.
+            list_url: Optional X List URL to read instead of searching.
+            label: Name under which metrics are recorded.
+            Other arguments are the same as iter_x_tweets.
+
+        Yields:
+            Dict: Tweet data with post_time, text, tweet_url and author.
+        """
+        if list_url:
+            timelines = [(list_url, num_tweets)]
+        else:
+            queries = combined_search_queries(usernames)
+            timelines = []
+            for query in queries:
+                share = -(-num_tweets * query.count('from:') // max(len(usernames), 1))
+                timelines.append((f"{self.base_url}/search?q={quote(query)}&src=typed_query&f=live", share))
+        print(f"🐦 Scraping a combined timeline of {len(usernames)} users, targeting {num_tweets} tweets.")
+
+        for url, share in timelines:
+            # Search and List timelines have no pinned tweets
+            yield from self._iter_timeline(url, label, share, debug, ignore_retweets, False, metrics, should_stop)
+            if should_stop is not None and should_stop():
+                break
+
+    def _iter_timeline(self, url: str, label: str, num_tweets: int, debug: bool, ignore_retweets: bool, ignore_pinned: bool, metrics=None, should_stop: Optional[Callable[[], bool]] = None) -> Iterator[Dict]:
+        """Loads a timeline page and yields its tweets while scrolling (see iter_x_tweets)."""
+        scraped = 0
         bottom_check_count = 0  # Counter to track consecutive bottom detections
+        long_scroll = num_tweets >= LONG_SCROLL_MIN_TWEETS
+        if long_scroll:
+            print("🧹 Long-scroll mode: pruning extracted tweets above the viewport.")
 
         try:
-            self.driver.get(f"https://x.com/{username}")
-            time.sleep(5)
-            
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
-
-            while len(tweets_data) < num_tweets:
-                tweet_elements = self.driver.find_elements(By.XPATH, "//article[@data-testid='tweet']")
+            with self._phase(metrics, 'page_load', label):
+                self.driver.get(url)
+                time.sleep(5)
                 
-                for tweet in tweet_elements:
-                    try:
-                        # Get the tweet link
-                        link_element = tweet.find_element(By.XPATH, ".//a[time]")
-                        tweet_url = link_element.get_attribute('href')
-
-                        if tweet_url in processed_links:
-                            continue
-                        
-                        # Get the full text to check for retweets or pinned status
-                        full_text = tweet.text
-                        lines = full_text.split('\n')
-                        
-                        # Check if it's a pinned tweet
-                        if ignore_pinned and lines and (lines[0].strip() == "Pinned" or lines[0].strip() == "已釘選"):
-                            if debug:
-                                print(f"🚫 Ignoring pinned tweet: {tweet_url}\n")
-                            continue
-
-                        # Check if it's a retweet
-                        is_retweet = False
-                        for line in lines[:2]: # Usually in the first two lines
-                            if 'reposted' in line or '已轉發' in line:
-                                is_retweet = True
-                                break
-                        if ignore_retweets and is_retweet:
-                            if debug:
-                                print(f"🚫 Ignoring retweet: {tweet_url}\n")
-                            continue
-
-                        processed_links.add(tweet_url)
-
-                        # Get the post time
-                        time_element = link_element.find_element(By.TAG_NAME, "time")
-                        post_time = time_element.get_attribute('datetime')
-                        
-                        # Get and clean the tweet text
-                        cleaned_text = self._clean_tweet_text(full_text)
-                        
-                        if debug:
-                            print("------------- DEBUG START -------------")
-                            print(f"Original Text for tweet {tweet_url}:")
-                            print(full_text)
-                            print("---------------------------------------")
-                            print("Cleaned Text:")
-                            print(cleaned_text)
-                            print("-------------- DEBUG END --------------\n")
-                        
-                        tweet_data = {
-                            "post_time": post_time,
-                            "text": cleaned_text,
-                            "tweet_url": tweet_url
-                        }
-                        tweets_data.append(tweet_data)
-
-                    except Exception:
-                        # Skip tweet elements that can't be parsed (e.g., ads or layout changes)
-                        continue
-
-                print(f"📊 Scraped {len(tweets_data)} tweets.")
-                if len(tweets_data) >= num_tweets:
+                last_height = self.driver.execute_script("return document.body.scrollHeight")
+
+            while scraped < num_tweets:
+                with self._phase(metrics, 'extract', label):
+                    batch, found_new = self._extract_tweets(label, debug, ignore_retweets, ignore_pinned, metrics, prune=long_scroll)
+                batch = batch[:num_tweets - scraped]
+                if metrics is not None:
+                    metrics.count('tweets_kept', len(batch), account=label)
+
+                # Yield outside the extract phase so the consumer's time is not counted as extraction
+                for tweet_data in batch:
+                    scraped += 1
+                    yield tweet_data
+
+                print(f"📊 Scraped {scraped} tweets.")
+                if scraped >= num_tweets:
+                    break
+                if should_stop is not None and should_stop():
+                    print("⏹️ Stop requested, ending scrape early.")
                     break
                 
                 # Scroll the page to load more tweets
-                self.driver.execute_script("window.scrollBy(0, 800);")
-                time.sleep(2) # Wait for content to load
-                
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
+                with self._phase(metrics, 'scroll', label):
+                    self.driver.execute_script("window.scrollBy(0, 800);")
+                    time.sleep(2) # Wait for content to load
+                    
+                    new_height = self.driver.execute_script("return document.body.scrollHeight")
                 
-                # If the page height has not increased after scrolling, check multiple times to confirm bottom
-                if new_height == last_height:
+                # If the page height has not increased after scrolling and no new tweets appeared,
+                # check multiple times to confirm bottom (pruning can keep the height unchanged)
+                if new_height == last_height and not found_new:
                     bottom_check_count += 1
                     print(f"🔍 Potential bottom detected ({bottom_check_count}/5)")
                     
@@ -296,10 +589,8 @@ class XCrawler:
                     bottom_check_count = 0
                     last_height = new_height
 
-            if len(tweets_data) < num_tweets:
-                print(f"⚠️ Did not scrape enough tweets, only got {len(tweets_data)}.")
-            
-            return tweets_data
+            if scraped < num_tweets:
+                print(f"⚠️ Did not scrape enough tweets, only got {scraped}.")
 
         except TimeoutException:
             print("⏰ Timed out while scraping X (Twitter) tweets.")
@@ -307,77 +598,82 @@ class XCrawler:
         except Exception as e:
             print(f"❌ Failed to scrape X (Twitter) tweets: {e}")
             print(traceback.format_exc())
-        return tweets_data
 
-    def _clean_tweet_text(self, full_text: str) -> str:
+    def _extract_tweets(self, label: str, debug: bool, ignore_retweets: bool, ignore_pinned: bool, metrics=None, prune: bool = False) -> Tuple[List[Dict], bool]:
         """
-        Cleans the tweet text by removing author info and interaction buttons.
-        
+        Extracts the tweets loaded on the page since the previous call (the page keeps track
+        of what has been read, see _EXTRACT_TWEETS_SCRIPT).
+
         Args:
-            full_text: The original tweet text.
-            
+            prune: Whether to remove already extracted articles far above the viewport.
+
         Returns:
-            str: The cleaned tweet text.
+            Tuple[List[Dict], bool]: Tweet data in page order, and whether any new article was
+                read this pass (including pinned tweets, retweets and re-rendered tweets that
+                were skipped).
         """
-        lines = full_text.split('\n')
-        
-        # Find the start of the content (usually after username and timestamp)
-        content_start_index = 0
-        for i, line in enumerate(lines):
-            # The content usually starts on the second line after the '·' symbol (the first being the date)
-            if line.strip() == '·' and i > 0 and i + 2 < len(lines):
-                content_start_index = i + 2
-                break
-        
-        if content_start_index == 0 and len(lines) > 4: # Fallback strategy
-             content_start_index = 4
+        tweets_data = []
+        seen = 0
+        fallbacks = 0
+        extracted = self.driver.execute_script(_EXTRACT_TWEETS_SCRIPT, prune, EXTRACT_BATCH_LIMIT, PRUNE_MARGIN_PX) or {}
+        items = extracted.get('tweets') or []
 
-        # Find the end of the content (usually before interaction buttons)
-        content_end_index = len(lines)
-        
-        # Common junk phrases in the UI
-        junk_phrases = [
-            # English
-            "Show this thread", "Show more", "Translate post", "View",
-            "The author labeled this post as containing sensitive content.",
-            "Content warning: Sensitive content", "Adult content",
-            "The following media includes potentially sensitive content.",
-            "X labeled this post as containing Adult Content.",
-            "This Post is from a suspended account. Learn more",
-            "Change settings", "Show", "More",
-            # Chinese
-            "顯示", "顯示更多", "內容警告：成人內容",
-            "以下的媒體可能包含敏感內容。變更設定", "查看",
-            "X 已將此貼文標示為包含成人內容。",
-            "此貼文來自遭停權的帳戶。了解更多",
-            # Common
-            "…"
-        ]
-
-        # Regex to match view counts, likes, etc. e.g., "1,234", "1.5K", "2M", "1.8萬"
-        stat_pattern = re.compile(r'^[,\d.]+[KMB萬千]?$')
-        
-        # Check from the bottom up to find the end of the content
-        # The last few lines are usually stats or junk messages
-        for i in range(len(lines) - 1, -1, -1):
-            line = lines[i].strip()
-            
-            # Check if it's a statistic number or a junk phrase
-            if stat_pattern.fullmatch(line) or line in junk_phrases:
-                content_end_index = i
-            # Check for empty lines, which can also be mixed in at the bottom
-            elif not line:
-                content_end_index = i
-            else:
-                # Stop when the first non-junk line is found
-                break
-        
-        if content_start_index >= content_end_index:
-            # If positioning is confusing, return the original text
-            return full_text 
+        for item in items:
+            tweet_url = item.get('url')
+            if not tweet_url:
+                continue
+            seen += 1
+            header = [line.strip() for line in item.get('header') or []]
+
+            # Check if it's a pinned tweet
+            if ignore_pinned and header and header[0] in _PINNED_LABELS:
+                if debug:
+                    print(f"🚫 Ignoring pinned tweet: {tweet_url}\n")
+                continue
+
+            # Check if it's a retweet (the label is usually in the first two lines)
+            is_retweet = any(label in line for line in header for label in _REPOST_LABELS)
+            if ignore_retweets and is_retweet:
+                if debug:
+                    print(f"🚫 Ignoring retweet: {tweet_url}\n")
+                continue
+
+            cleaned_text, structured = tweet_text_from_item(item)
+            if not structured:
+                fallbacks += 1
+
+            if debug:
+                print("------------- DEBUG START -------------")
+                if structured:
+                    print(f"Text for tweet {tweet_url} (from tweetText):")
+                else:
+                    print(f"Original Text for tweet {tweet_url}:")
+                    print(item.get('full') or '')
+                    print("---------------------------------------")
+                    print("Cleaned Text:")
+                print(cleaned_text)
+                print("-------------- DEBUG END --------------\n")
+
+            tweets_data.append({
+                "post_time": item.get('time'),
+                "text": cleaned_text,
+                "tweet_url": tweet_url,
+                "author": tweet_author(tweet_url),
+            })
 
-        cleaned_text = '\n'.join(lines[content_start_index:content_end_index])
-        return cleaned_text.strip()
+        if metrics is not None:
+            metrics.count('tweets_seen', seen, account=label)
+            metrics.count('text_fallbacks', fallbacks, account=label)
+            if extracted.get('pruned'):
+                metrics.count('articles_pruned', extracted['pruned'], account=label)
+        return tweets_data, bool(extracted.get('scanned') or items)
+
+    def _clean_tweet_text(self, full_text: str) -> str:
+        """
+        Cleans the tweet text by removing author info and interaction buttons.
+        Kept for callers of the old method; see clean_tweet_text.
+        """
+        return clean_tweet_text(full_text)
 
     def save_tweets_data(self, tweets_data: List[Dict], filename: str) -> bool:
         """
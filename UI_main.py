@@ -1,6 +1,7 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox, filedialog, simpledialog
 import threading
+import queue
 import time
 import json
 import os
@@ -8,13 +9,41 @@ from datetime import datetime
 import asyncio
 import traceback
 import re
-import datefinder
 import pytz
 
-# 從 UCanScrapeX 目錄導入爬蟲類
-from UCanScrapeX import XCrawler
-# 導入 SB 爬蟲
-from SB_crawler import SBCrawler
+# 導入 SB 場地名稱（SB 日曆與 X 帳號一起排程）
+from SB_crawler import SB_VENUE_NAME
+from tweet_parser import parse_time_range
+from event_model import (
+    Event, EventFileConflict, EventValidationError, event_file_version, is_valid_date,
+    load_event_file, save_event_file, venue_from_filename,
+)
+from file_lock import file_lock
+from event_batch import BATCH_ACTIONS, apply_batch, apply_to_events
+from event_dedup import SIMILARITY_THRESHOLD, DuplicateIndex
+from event_archive import archive_versions, compact_outputs, load_archive, month_key
+from event_cache import DEFAULT_CACHE_DIR
+from event_index import EventIndex, load_outputs_index
+from event_search import EventSearchIndex
+from crawl_metrics import CrawlMetrics
+from crawl_scheduler import CrawlScheduler
+from crawl_worker import SB_SCHEDULE_ID, CrawlWorkerClient
+from config_service import ConfigValidationError, get_config_service
+
+# 排程器等待下一個帳號時最長的單次等待（秒）；帳號設定改變時會立即醒來
+SCHEDULER_POLL_SECONDS = 600
+# 檢查設定檔是否在外部被修改的間隔（毫秒）
+CONFIG_POLL_MS = 2000
+# 爬蟲子行程在取消後多久仍沒有回應就強制重新啟動（秒）
+WORKER_CANCEL_GRACE_SECONDS = 120
+# UI 事件佇列的輪詢間隔（毫秒）與訊息紀錄保留的行數
+UI_POLL_MS = 200
+LOG_MAX_LINES = 500
+# 搜尋框停止輸入多久後才查詢（毫秒）與最多顯示的結果數
+SEARCH_DEBOUNCE_MS = 150
+SEARCH_MAX_RESULTS = 500
+# 同步網站時除了熱資料外，另外讀取最近幾個月的封存分區，網站保留近期的歷史活動
+SYNC_ARCHIVE_MONTHS = 3
 
 class AsyncioThread(threading.Thread):
     def __init__(self):
@@ -41,157 +70,106 @@ class AsyncioThread(threading.Thread):
         return future.result()
 
 
-# 日期和時間解析函數（從 crawler_API.py 移植）
-def parse_date_with_year(text, today=None):
+def render_website_html(html_content, events, categories_config):
     """
-    嘗試從文字中解析日期，若無年份自動補今年或最近一次未來日期。
-    支援多種分隔符：/、／(全形)、-、－(全形)
-    """
-    if today is None:
-        taipei_tz = pytz.timezone('Asia/Taipei')
-        today = datetime.now(taipei_tz)
-    
-    # 支援 9/13、09/13、9-13、09-13、9／13（全形斜線）、9－13（全形減號）
-    m = re.search(r'(\d{1,2})[/／\-－](\d{1,2})', text)
-    if m:
-        month, day = int(m.group(1)), int(m.group(2))
-        year = today.year
-        
-        # 驗證月份和日期的有效性
-        if month < 1 or month > 12 or day < 1 or day > 31:
-            print(f"日期解析錯誤: 月份或日期超出有效範圍 (月:{month}, 日:{day}), 原始文字: {text}")
-            return None
-        
-        try:
-            # 確保 try_date 使用與 today 相同的時區
-            taipei_tz = pytz.timezone('Asia/Taipei')
-            try_date = taipei_tz.localize(datetime(year, month, day))
-        except ValueError as e:
-            print(f"日期解析錯誤: {e}, 月:{month}, 日:{day}, 原始文字前50字: {text[:50]}...")
-            traceback.print_exc()
-            return None
-        
-        # 若日期已過，則補下一年
-        if try_date < today:
-            try_date = taipei_tz.localize(datetime(year+1, month, day))
-        return try_date
-    return None
+    將已校正的活動與類別設定寫入網站 HTML 內容
 
-def parse_time_range(text):
+    Returns:
+        更新後的 HTML；找不到 // EVENT_DATA_START 和 // EVENT_DATA_END 標記時回傳 None
     """
-    支援多種時間範圍格式：19:00~22:00、19點-22點、7pm-10pm、晚上七點-十點
-    支援全形和半形字符
-    """
-    # 1. 19:00~22:00、19:00-22:00、19:00～22:00、19:00－22:00、19：00～22：00（全形冒號）
-    m = re.search(r'(\d{1,2})[:\：](\d{2})\s*[~\-～－]\s*(\d{1,2})[:\：](\d{2})', text)
-    if m:
-        start_time = f"{int(m.group(1)):02d}:{m.group(2)}"
-        end_time = f"{int(m.group(3)):02d}:{m.group(4)}"
-        return start_time, end_time
+    # 建立依日期排序的索引，按年份和月份查詢
+    checked_index = EventIndex(events)
+    month_names = ['january', 'february', 'march', 'april', 'may', 'june',
+                   'july', 'august', 'september', 'october', 'november', 'december']
+    sorted_year_months = checked_index.year_months() # 例如: ['2025-08', '2025-09']
+
+    # 將活動轉換為 index.html 中 event data 的 JavaScript 陣列格式
+    venue_to_class_map = {
+        '拘久屋': 'jukuya',
+        '玩具間': 'toyroom',
+        '更衣間': 'gengyiroom',
+        '思': 'think',
+        '動物方程式': 'zoo',
+        '其他': 'other'
+    }
+    js_event_data = {}        
+
+    for year_month in sorted_year_months:
+        year, month = int(year_month[:4]), int(year_month[5:7])
+        events_list = checked_index.month(year, month)
+        js_events = []
+        for event in events_list:
+            # 轉換為 HTML 格式所需的鍵名
+            js_events.append({
+                'date': int(event.date[8:10]),
+                'venue': event.venue,
+                'title': event.title,
+                'time': f"{event.start_time or ''}~{event.end_time or ''}",
+                'class': venue_to_class_map.get(event.venue, 'other'),
+                'category': event.category or 'or', # 確保 category 屬性被包含
+                'link': event.link
+            })
+        # 將月份名稱轉換為 JavaScript 變數名（例如 '2025-08' -> 'augustEvents'）
+        month_name_abbr = month_names[month - 1] # 'august'
+        js_event_data[f"{month_name_abbr}Events"] = json.dumps(js_events, ensure_ascii=False, indent=4)
+
+    # 更新 HTML
+    updated_html_content = html_content
     
-    # 2. 19點-22點、19點～22點
-    m = re.search(r'(\d{1,2})[點点时時]\s*[~\-～－]\s*(\d{1,2})[點点时時]', text)
-    if m:
-        return f"{int(m.group(1)):02d}:00", f"{int(m.group(2)):02d}:00"
+    # 首先，動態生成所有月份變數的宣告，確保涵蓋所有存在的月份
+    all_dynamic_month_vars_declarations = []
     
-    # 3. 7pm-10pm
-    m = re.search(r'(\d{1,2})\s*(am|pm|AM|PM)?\s*[~\-～－]\s*(\d{1,2})\s*(am|pm|AM|PM)', text)
-    if m:
-        def to24h(h, ap):
-            h = int(h)
-            if ap and ap.lower() == 'pm' and h != 12:
-                h += 12
-            if ap and ap.lower() == 'am' and h == 12:
-                h = 0
-            return f"{h:02d}:00"
-        return to24h(m.group(1), m.group(2)), to24h(m.group(3), m.group(4))
+    # 獲取所有有活動的月份
+    all_month_names = sorted(set(month_names[int(ym[5:7]) - 1] for ym in sorted_year_months))
     
-    # 4. 晚上七點-十點
-    m = re.search(r'(早上|上午|下午|晚上)?(\d{1,2})[點点时時][~\-～－](\d{1,2})[點点时時]', text)
-    if m:
-        def zh_to24h(prefix, h):
-            h = int(h)
-            if prefix in ['下午', '晚上'] and h < 12:
-                h += 12
-            return f"{h:02d}:00"
-        return zh_to24h(m.group(1), m.group(2)), zh_to24h(m.group(1), m.group(3))
+    # 確保 HTML 中硬編碼引用的月份都有變數聲明（即使沒有活動也要聲明為空陣列）
+    required_months = ['august', 'september', 'october', 'november', 'december']
+    all_months_to_generate = sorted(set(all_month_names + required_months), key=month_names.index)
     
-    return None, None
-
-def extract_links(text):
-    """
-    從文字中提取所有連結。
-    """
-    # 匹配 http(s):// 或 www. 開頭的連結
-    urls = re.findall(r'https?://[^\s<>\"\'{}|^`]+', text)
-    if not urls:
-        urls = re.findall(r'www\.[^\s<>\"\'{}|^`]+', text)
-    return urls
-
-def process_tweet_to_event(tweet_data, venue_name, today=None):
-    """
-    將推文資料處理成事件資料格式
-    """
-    if today is None:
-        taipei_tz = pytz.timezone('Asia/Taipei')
-        today = datetime.now(taipei_tz)
+    for month_abbr in all_months_to_generate:
+        month_var = f"{month_abbr}Events"
+        js_array_str = js_event_data.get(month_var, '[]')
+        # 確保這裡的年份是正確的，因為 HTML 中的 generateMonthData 預設為 2025
+        # 為了兼容性，這裡暫時不考慮動態年份的 JS 變數名，只處理數據
+        # 使用 var 而不是 const，讓變數成為 window 的屬性以便動態掃描
+        all_dynamic_month_vars_declarations.append(f"var {month_var} = {js_array_str};")
     
-    text = tweet_data.get('text', '').strip()
+    # 找到現有月份變數的宣告區塊，進行替換
+    # 這個正則表達式會匹配所有 "const [month]Events = [...];" 的行
+    # 並替換為動態生成的月份變數宣告
+    pattern_all_month_vars = r"// EVENT_DATA_START[\s\S]*?// EVENT_DATA_END"
+    replacement_block = "// EVENT_DATA_START\n        " + '\n        '.join(all_dynamic_month_vars_declarations) + "\n        // EVENT_DATA_END"
     
-    # 1. RT開頭直接跳過
-    if text.startswith('RT'):
+    if not re.search(pattern_all_month_vars, updated_html_content):
         return None
-
-    # 2. 解析日期
-    date_obj = None
-    date_matches = list(datefinder.find_dates(text, source=True))
-    if date_matches:
-        date_obj, _ = date_matches[0]
-        taipei_tz = pytz.timezone('Asia/Taipei')
-        if date_obj.tzinfo is None:
-            date_obj = taipei_tz.localize(date_obj)
-        else:
-            date_obj = date_obj.astimezone(taipei_tz)
-    else:
-        # 嘗試補年份
-        date_obj = parse_date_with_year(text, today)
-        # parse_date_with_year 已經返回 timezone-aware datetime，不需要再 localize
-    
-    if not date_obj:
-        return None  # 沒有日期就跳過
+    # 使用函數作為替換內容，避免活動文字中的反斜線被當成跳脫字元
+    updated_html_content = re.sub(pattern_all_month_vars, lambda m: replacement_block, updated_html_content, flags=re.DOTALL)
+
+    # 同步類別定義到 HTML
+    # 生成 categoryNames JavaScript 物件
+    category_names_js = "const categoryNames = {\n"
+    for code in sorted(categories_config.keys()):
+        info = categories_config[code]
+        category_names_js += f"            {code}: '{info['name']}',\n"
+    category_names_js += "        };"
     
-    # 避免錯誤日期格式
-    if date_obj.year < 2000 or date_obj.year > 2100:
-        return None
-    
-    date_found = date_obj.strftime('%Y-%m-%d')
-
-    # 3. 解析時間範圍
-    start_time, end_time = parse_time_range(text)
-
-    event_data = {
-        'date': date_found,
-        'text': text,
-        'check': False,
-        'venue': venue_name,
-        'title': '',
-        'brief_description': '',
-    }
+    # 生成 categoryColors JavaScript 物件
+    category_colors_js = "const categoryColors = {\n"
+    for code in sorted(categories_config.keys()):
+        info = categories_config[code]
+        category_colors_js += f"            {code}: '{info['color']}',\n"
+    category_colors_js += "        };"
     
-    if start_time:
-        event_data['start_time'] = start_time
-    if end_time:
-        event_data['end_time'] = end_time
+    # 替換 categoryNames
+    pattern_category_names = r"const categoryNames = \{[^\}]*\};"
+    if re.search(pattern_category_names, updated_html_content):
+        updated_html_content = re.sub(pattern_category_names, lambda m: category_names_js, updated_html_content, flags=re.DOTALL)
     
-    # 提取連結
-    links = extract_links(text)
-    if links:
-        event_data['link'] = links[0]
-    else:
-        # 如果文本中沒有連結，使用推文連結
-        event_data['link'] = tweet_data.get('tweet_url', '')
-    
-    return event_data
+    # 替換 categoryColors
+    pattern_category_colors = r"const categoryColors = \{[^\}]*\};"
+    if re.search(pattern_category_colors, updated_html_content):
+        updated_html_content = re.sub(pattern_category_colors, lambda m: category_colors_js, updated_html_content, flags=re.DOTALL)
+    return updated_html_content
 
 
 class EventCrawlerUI(tk.Tk):
@@ -202,16 +180,28 @@ class EventCrawlerUI(tk.Tk):
 
         self.crawler_interval_hours = tk.DoubleVar(value=6.0) # 預設每6小時執行一次
         self.running_crawler_thread = None
+        self.manual_crawl_thread = None
         self.stop_crawler_event = threading.Event()
         # self.client = crawler_API.Client('zh-TW') # 初始化 Twikit Client
         self.is_logged_in = True # 預設為已登入
+        self._logged_in_before_login = True
         
         self.num_tweets_to_scrape = tk.IntVar(value=10) # 預設抓取50篇
+        self.combined_timeline_var = tk.BooleanVar(value=False) # 以單一合併時間軸抓取所有帳號
+        self.timeline_list_url = tk.StringVar() # 合併時間軸使用的 X List 網址，留空時使用搜尋
 
         self.venues = [] # 在 __init__ 中初始化為空列表
         self.venue_frames = {}
         self.venue_treeviews = {}
-        self.venue_events_data = {}
+        self.event_index = EventIndex() # 目前顯示中（未刪除）的活動索引
+        self.search_index = EventSearchIndex() # 跨場地全文索引，重新載入時只更新有變動的活動
+        self.search_var = tk.StringVar()
+        self.search_archive_var = tk.BooleanVar(value=False)
+        self.archive_search_index = EventSearchIndex() # 封存活動的全文索引，勾選「包含封存活動」時才載入
+        self._archive_versions = None
+        self._search_after_id = None
+        self._search_results = []
+        self._archived_result_ids = set()
 
         # 啟動 asyncio 專用線程（暫時保留但不使用）
         self.asyncio_thread = AsyncioThread()
@@ -219,33 +209,138 @@ class EventCrawlerUI(tk.Tk):
         # 等待事件循環啟動
         self.asyncio_thread.running.wait()
         
-        # 初始化 XCrawler 實例
-        self.crawler = XCrawler(user_data_dir="profile1", locale_code='zh-TW')
-
-        self._load_or_create_user_config() # 確保使用者設定檔存在
+        # 所有背景執行緒與爬蟲子行程的訊息都放進這個佇列，由主執行緒統一輪詢更新 UI，
+        # 背景工作不直接呼叫 messagebox（定時爬蟲無人看管時會累積一堆對話框）
+        self.ui_events = queue.Queue()
+        self.crawl_active = False
+        self.crawl_worker = CrawlWorkerClient(user_data_dir="profile1", locale_code='zh-TW', on_event=self.ui_events.put)
+        self.crawl_worker.start()
+
+        # 設定檔只在修改時重新讀取；第一次讀取時會建立預設的 user_config.json / category_config.json
+        self.config_service = get_config_service()
+        self.config_service.users.get()
+        self.config_service.categories.get()
         self._create_widgets()
         self._load_events_and_display()
         
         # 綁定窗口關閉事件
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.after(UI_POLL_MS, self._poll_ui_events)
+        self.after(CONFIG_POLL_MS, self._poll_config)
 
-    def _load_or_create_user_config(self):
-        self.user_config_path = 'user_config.json'
-        if not os.path.exists(self.user_config_path):
-            print("user_config.json not found, creating a default one.")
-            default_user_configs = [
-                {'user_id': 'jukuya456', 'name': '拘久屋'},
-                {'user_id': 'studiobondage', 'name': '玩具間'},
-                {'user_id': 'gengyiroom', 'name': '更衣間'},
-                {'user_id': 's9808191779632', 'name': '思'},
-                {'user_id': '16fnzoo', 'name': '動物方程式'},
-            ]
-            try:
-                with open(self.user_config_path, 'w', encoding='utf-8') as f:
-                    json.dump(default_user_configs, f, ensure_ascii=False, indent=4)
-            except Exception as e:
-                print(f"Failed to create default user_config.json: {e}")
-                traceback.print_exc()
+    def _post_status(self, message, level='info'):
+        """從任何執行緒送出一則狀態訊息（顯示在狀態列與訊息紀錄，不會彈出對話框）"""
+        self.ui_events.put({'type': 'status', 'time': time.time(), 'message': message, 'level': level})
+
+    def _poll_ui_events(self):
+        """在 Tk 主執行緒中處理佇列中的狀態訊息與爬蟲子行程的進度事件"""
+        try:
+            while True:
+                event = self.ui_events.get_nowait()
+                try:
+                    self._handle_ui_event(event)
+                except Exception as e:
+                    print(f"處理 UI 事件時發生錯誤: {e}")
+                    traceback.print_exc()
+        except queue.Empty:
+            pass
+        self.after(UI_POLL_MS, self._poll_ui_events)
+
+    def _poll_config(self):
+        """定期檢查設定檔，外部修改過的設定會通知訂閱者"""
+        try:
+            self.config_service.refresh()
+        except Exception as e:
+            print(f"檢查設定檔時發生錯誤: {e}")
+            traceback.print_exc()
+        self.after(CONFIG_POLL_MS, self._poll_config)
+
+    def _subscribe_config(self, config, callback, widget=None):
+        """設定改變時在主執行緒呼叫 callback()；指定 widget 時在視窗關閉後自動取消訂閱"""
+        unsubscribe = config.subscribe(lambda value: self.ui_events.put({'type': 'config_changed', 'callback': callback, 'widget': widget}))
+        if widget is not None:
+            widget.bind('<Destroy>', lambda e: unsubscribe() if e.widget is widget else None, add='+')
+        return unsubscribe
+
+    def _handle_ui_event(self, event):
+        event_type = event.get('type')
+        if event_type == 'config_changed':
+            widget = event.get('widget')
+            if widget is None or widget.winfo_exists():
+                event['callback']()
+        elif event_type == 'status':
+            self._show_status(event['message'], event.get('level', 'info'), event.get('time'))
+        elif event_type == 'cycle_started':
+            self._set_crawl_active(True)
+            self.progress_bar.config(maximum=max(event['total'], 1), value=0)
+            message = f"爬蟲開始，共 {event['total']} 個來源"
+            if event.get('resumed'):
+                message += "（從上次中斷處繼續）"
+            self._show_status(message, time_=event.get('time'))
+        elif event_type == 'account_started':
+            self._show_status(f"({event['index'] + 1}/{event['total']}) 正在處理 {event['name']}...", time_=event.get('time'))
+        elif event_type == 'account_skipped':
+            self._advance_progress()
+            self._show_status(f"({event['index'] + 1}/{event['total']}) {event['name']} 已在上次中斷前完成，略過", time_=event.get('time'))
+        elif event_type == 'account_finished':
+            # SB 日曆與帳號同時進行，完成的順序不一定依照 index
+            self._advance_progress()
+            self._show_status(
+                f"({event['index'] + 1}/{event['total']}) {event['name']} 完成，新增 {event['events_added']} 個活動",
+                time_=event.get('time'),
+            )
+        elif event_type == 'error':
+            self._show_status(event['message'], 'error', event.get('time'))
+        elif event_type == 'cycle_finished':
+            self._set_crawl_active(False)
+            if event.get('error'):
+                self._show_status(f"執行爬蟲時發生錯誤: {event['error']}", 'error', event.get('time'))
+            elif event.get('cancelled'):
+                self._show_status("爬蟲已取消，未完成的帳號會在下次執行時繼續。", 'warning', event.get('time'))
+            else:
+                self.progress_bar.config(value=self.progress_bar.cget('maximum'))
+                self._show_status(f"爬蟲執行完成，新增 {event.get('events_added', 0)} 個活動，已更新活動列表。", time_=event.get('time'))
+            if event.get('summary'):
+                self._append_log(event['summary'], 'info', event.get('time'))
+        elif event_type == 'events_changed':
+            self._load_events_and_display()
+        elif event_type == 'login_step':
+            self._on_login_step(event)
+        elif event_type == 'worker_failed':
+            self._show_status(event['error'], 'error', event.get('time'))
+        elif event_type == 'worker_exited' and not event.get('expected'):
+            self._set_crawl_active(False)
+            self._show_status(
+                f"爬蟲子行程意外結束（exit code {event.get('exitcode')}），下次執行時會自動重新啟動。",
+                'warning', event.get('time'),
+            )
+
+    def _advance_progress(self):
+        maximum = float(self.progress_bar.cget('maximum'))
+        self.progress_bar.config(value=min(float(self.progress_bar.cget('value')) + 1, maximum))
+
+    def _show_status(self, message, level='info', time_=None):
+        """更新狀態列並附加到訊息紀錄（僅限主執行緒）"""
+        self.status_var.set(message.splitlines()[0] if message else '')
+        self.status_label.config(foreground={'error': 'red', 'warning': 'darkorange'}.get(level, ''))
+        self._append_log(message, level, time_)
+
+    def _append_log(self, message, level='info', time_=None):
+        timestamp = datetime.fromtimestamp(time_ or time.time()).strftime('%H:%M:%S')
+        self.log_text.config(state=tk.NORMAL)
+        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n", level)
+        # 只保留最後 LOG_MAX_LINES 行，長時間執行也不會無限成長
+        line_count = int(self.log_text.index('end-1c').split('.')[0])
+        if line_count > LOG_MAX_LINES:
+            self.log_text.delete('1.0', f"{line_count - LOG_MAX_LINES}.0")
+        self.log_text.see(tk.END)
+        self.log_text.config(state=tk.DISABLED)
+
+    def _set_crawl_active(self, active):
+        self.crawl_active = active
+        self.cancel_run_button.state(["!disabled"] if active else ["disabled"])
+        if not active:
+            self.progress_bar.config(value=0)
 
     def _create_widgets(self):
         # 登入區塊
@@ -270,9 +365,16 @@ class EventCrawlerUI(tk.Tk):
         self.num_tweets_spinbox = ttk.Spinbox(self.settings_frame, from_=10, to=500, increment=10, textvariable=self.num_tweets_to_scrape, width=5)
         self.num_tweets_spinbox.grid(row=1, column=1, sticky=tk.EW, padx=5, pady=5)
 
+        timeline_frame = ttk.Frame(self.settings_frame)
+        timeline_frame.grid(row=2, column=0, columnspan=2, sticky=tk.EW, padx=5, pady=5)
+        timeline_frame.columnconfigure(2, weight=1)
+        ttk.Checkbutton(timeline_frame, text="合併時間軸", variable=self.combined_timeline_var).grid(row=0, column=0, sticky=tk.W)
+        ttk.Label(timeline_frame, text="X List 網址 (選填，留空使用搜尋):").grid(row=0, column=1, sticky=tk.W, padx=(10, 5))
+        ttk.Entry(timeline_frame, textvariable=self.timeline_list_url).grid(row=0, column=2, sticky=tk.EW)
+
         # 按鈕放置在一個單獨的 frame 中，以便於管理和響應式佈局
         button_frame = ttk.Frame(self.settings_frame)
-        button_frame.grid(row=2, column=0, columnspan=2, sticky=tk.EW, pady=5)
+        button_frame.grid(row=3, column=0, columnspan=2, sticky=tk.EW, pady=5)
         button_frame.columnconfigure(0, weight=1) # 讓按鈕可以擴展
         button_frame.columnconfigure(1, weight=1)
         button_frame.columnconfigure(2, weight=1)
@@ -289,7 +391,10 @@ class EventCrawlerUI(tk.Tk):
         self.sync_website_button.grid(row=0, column=3, sticky=tk.EW, padx=2, pady=2)
         
         self.import_html_button = ttk.Button(button_frame, text="從 HTML 導入活動", command=self._import_events_from_html)
-        self.import_html_button.grid(row=1, column=0, columnspan=4, sticky=tk.EW, padx=2, pady=2) # 導入按鈕佔滿一行
+        self.import_html_button.grid(row=1, column=0, columnspan=2, sticky=tk.EW, padx=2, pady=2)
+
+        self.compact_button = ttk.Button(button_frame, text="封存舊活動", command=self._compact_events)
+        self.compact_button.grid(row=1, column=2, columnspan=2, sticky=tk.EW, padx=2, pady=2)
 
         self.add_manual_event_button = ttk.Button(button_frame, text="手動增加活動", command=self._add_new_event_popup)
         self.add_manual_event_button.grid(row=2, column=0, columnspan=2, sticky=tk.EW, padx=2, pady=2)
@@ -303,6 +408,61 @@ class EventCrawlerUI(tk.Tk):
         self.manage_styles_button = ttk.Button(button_frame, text="管理網站風格", command=self._manage_styles_popup)
         self.manage_styles_button.grid(row=3, column=2, columnspan=2, sticky=tk.EW, padx=2, pady=2)
 
+        self.duplicates_button = ttk.Button(button_frame, text="檢查重複活動", command=self._show_duplicates_popup)
+        self.duplicates_button.grid(row=4, column=0, columnspan=4, sticky=tk.EW, padx=2, pady=2)
+
+        # 狀態區塊：狀態列、進度條、取消按鈕與訊息紀錄（先放在底部，活動列表再填滿剩餘空間）
+        status_frame = ttk.LabelFrame(self, text="執行狀態", padding="5")
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=5)
+        status_frame.columnconfigure(0, weight=1)
+
+        self.status_var = tk.StringVar(value="就緒")
+        self.status_label = ttk.Label(status_frame, textvariable=self.status_var, anchor=tk.W)
+        self.status_label.grid(row=0, column=0, sticky=tk.EW, padx=5)
+        self.progress_bar = ttk.Progressbar(status_frame, mode='determinate', length=200)
+        self.progress_bar.grid(row=0, column=1, sticky=tk.E, padx=5)
+        self.cancel_run_button = ttk.Button(status_frame, text="取消本次執行", command=self.cancel_current_run)
+        self.cancel_run_button.grid(row=0, column=2, sticky=tk.E, padx=5)
+        self.cancel_run_button.state(["disabled"])
+
+        log_frame = ttk.Frame(status_frame)
+        log_frame.grid(row=1, column=0, columnspan=3, sticky=tk.EW, pady=(5, 0))
+        self.log_text = tk.Text(log_frame, height=6, wrap=tk.WORD, state=tk.DISABLED)
+        log_scrollbar = ttk.Scrollbar(log_frame, orient=tk.VERTICAL, command=self.log_text.yview)
+        self.log_text.configure(yscrollcommand=log_scrollbar.set)
+        log_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.log_text.tag_configure('error', foreground='red')
+        self.log_text.tag_configure('warning', foreground='darkorange')
+
+        # 搜尋區塊：輸入時即時篩選所有場地的活動
+        search_frame = ttk.Frame(self)
+        search_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=(5, 0))
+        ttk.Label(search_frame, text="搜尋活動:").pack(side=tk.LEFT, padx=5)
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.search_entry.bind("<Escape>", lambda event: self.search_var.set(""))
+        self.search_count_label = ttk.Label(search_frame, text="")
+        self.search_count_label.pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(search_frame, text="包含封存活動", variable=self.search_archive_var,
+                        command=self._schedule_search).pack(side=tk.LEFT, padx=5)
+        self.search_var.trace_add('write', lambda *args: self._schedule_search())
+
+        # 搜尋結果（有輸入時才顯示）
+        self.search_results_frame = ttk.Frame(self)
+        self.search_tree = ttk.Treeview(self.search_results_frame, columns=("日期", "場地", "標題"), show="headings", height=8)
+        self.search_tree.heading("日期", text="日期")
+        self.search_tree.heading("場地", text="場地")
+        self.search_tree.heading("標題", text="標題")
+        self.search_tree.column("日期", width=100, anchor="center")
+        self.search_tree.column("場地", width=100, anchor="center")
+        self.search_tree.column("標題", width=400, anchor="w")
+        search_scrollbar = ttk.Scrollbar(self.search_results_frame, orient=tk.VERTICAL, command=self.search_tree.yview)
+        self.search_tree.configure(yscrollcommand=search_scrollbar.set)
+        search_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.search_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.search_tree.bind("<Double-1>", self._on_search_result_select)
+
         # 事件列表區塊 - 改為 Notebook
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -326,33 +486,49 @@ class EventCrawlerUI(tk.Tk):
         # The manual login button state is managed independently
 
     def _start_manual_x_login(self):
+        self.manual_login_button.config(state=tk.DISABLED, text="開啟中...")
+        # 登入完成前不開始爬蟲（爬蟲會把瀏覽器從登入頁導走）；取消或失敗時恢復原本的狀態
+        self._logged_in_before_login = self.is_logged_in
+        self.is_logged_in = False
         # Run login in a thread to avoid blocking the UI
-        threading.Thread(target=self._manual_login_worker, daemon=True).start()
+        threading.Thread(target=self._manual_login_worker, args=('login',), daemon=True).start()
 
-    def _manual_login_worker(self):
-        try:
-            # Disable button while opening X
-            self.after(0, lambda: self.manual_login_button.config(state=tk.DISABLED, text="開啟中..."))
-            
-            # 使用 XCrawler 的登入方法（只會開啟 x.com）
-            if self.crawler.login_to_x():
-                # 登入成功後不再彈出提示，直接更新狀態
-                self.is_logged_in = True
-                
-                # Update UI on the main thread
-                self.after(0, lambda: self._set_crawler_and_edit_state(True))
-                self.after(0, lambda: self.manual_login_button.config(text="已登入"))
-            else:
-                raise Exception("開啟 X.com 失敗")
+    def _manual_login_worker(self, job_type):
+        """在背景執行緒中送出登入工作（'login' 或 'confirm_login'），結果交給主執行緒處理"""
+        job = self.crawl_worker.run(job_type)
+        if job is None or job['type'] == 'job_failed':
+            self.ui_events.put({'type': 'login_step', 'step': job_type, 'error': job['error'] if job else "爬蟲子行程沒有回應"})
+        else:
+            self.ui_events.put({'type': 'login_step', 'step': job_type, 'result': job['result']})
 
-        except Exception as e:
-            self.is_logged_in = False
-            error_message = f"開啟 X.com 時發生錯誤: {e}"
+    def _on_login_step(self, event):
+        """登入流程的下一步（僅限主執行緒）：開啟登入頁後詢問使用者，確認後再檢查登入狀態"""
+        if event.get('error') or (event['step'] == 'login' and not event['result']['opened']):
+            self.is_logged_in = self._logged_in_before_login
+            error_message = f"開啟 X.com 時發生錯誤: {event.get('error') or '無法開啟登入頁'}"
             print(f"登入失敗: {error_message}")
-            self.after(0, lambda: messagebox.showerror("登入失敗", error_message))
-            self.after(0, lambda: self.manual_login_button.config(state=tk.NORMAL, text="手動登入 X"))
-            print(f"登入錯誤: {e}")
-            traceback.print_exc()
+            self._show_status(f"登入失敗: {error_message}", 'error')
+            self.manual_login_button.config(state=tk.NORMAL, text="手動登入 X")
+            return
+
+        if event['step'] == 'login':
+            self.manual_login_button.config(text="等待登入...")
+            if not messagebox.askokcancel("手動登入 X", "已在瀏覽器中開啟 X 登入頁。\n請在瀏覽器視窗中完成登入後按「確定」。"):
+                self.is_logged_in = self._logged_in_before_login
+                self.manual_login_button.config(state=tk.NORMAL, text="已登入" if self.is_logged_in else "手動登入 X")
+                return
+            self.manual_login_button.config(text="確認中...")
+            threading.Thread(target=self._manual_login_worker, args=('confirm_login',), daemon=True).start()
+        elif event['result']['logged_in']:
+            # 登入成功後不再彈出提示，直接更新狀態
+            self.is_logged_in = True
+            self._set_crawler_and_edit_state(True)
+            self.manual_login_button.config(text="已登入")
+            self._show_status("已登入 X。")
+        else:
+            self.is_logged_in = False
+            self._show_status("瀏覽器中尚未登入 X，請重新點擊「手動登入 X」完成登入。", 'warning')
+            self.manual_login_button.config(state=tk.NORMAL, text="手動登入 X")
 
     def start_crawler(self):
         if not self.is_logged_in:
@@ -367,9 +543,9 @@ class EventCrawlerUI(tk.Tk):
         self.stop_crawler_event.clear()
         self.running_crawler_thread = threading.Thread(target=self._run_crawler_periodically, daemon=True)
         self.running_crawler_thread.start()
-        info_message = f"爬蟲已啟動，每 {self.crawler_interval_hours.get()} 小時執行一次。"
+        info_message = f"爬蟲已啟動，將依各帳號的活躍度調整頻率（基準間隔 {self.crawler_interval_hours.get()} 小時）。"
         print(f"爬蟲提示: {info_message}")
-        messagebox.showinfo("爬蟲", info_message)
+        self._post_status(info_message)
 
     def run_crawler_once(self):
         if not self.is_logged_in:
@@ -380,152 +556,160 @@ class EventCrawlerUI(tk.Tk):
             print("爬蟲警告: 爬蟲正在運行中，請先停止自動爬蟲或等待其完成。")
             messagebox.showwarning("爬蟲", "爬蟲正在運行中，請先停止自動爬蟲或等待其完成。")
             return
+        if self.manual_crawl_thread and self.manual_crawl_thread.is_alive():
+            print("爬蟲警告: 上一次手動執行尚未完成。")
+            messagebox.showwarning("爬蟲", "上一次手動執行尚未完成。")
+            return
         print("爬蟲提示: 手動執行請求已收到，即將在背景開始執行。")
-        messagebox.showinfo("爬蟲", "手動執行請求已收到，即將在背景開始執行。")
-        threading.Thread(target=self._fetch_and_process_events, daemon=True).start()
+        self._post_status("手動執行請求已收到，即將在背景開始執行。")
+        self.manual_crawl_thread = threading.Thread(target=self._fetch_and_process_events, daemon=True)
+        self.manual_crawl_thread.start()
 
     def stop_crawler(self):
         if self.running_crawler_thread and self.running_crawler_thread.is_alive():
             self.stop_crawler_event.set()
-            print("爬蟲提示: 爬蟲已發出停止訊號，將在當前週期結束後停止。")
-            messagebox.showinfo("爬蟲", "爬蟲已發出停止訊號，將在當前週期結束後停止。")
+            # 捲動中的帳號在下一次捲動前停止，子行程沒有回應時強制重新啟動
+            self.crawl_worker.cancel(force_after=WORKER_CANCEL_GRACE_SECONDS)
+            print("爬蟲提示: 爬蟲已發出停止訊號，將在目前的捲動完成後停止。")
+            self._post_status("爬蟲已發出停止訊號，將在目前的捲動完成後停止。", 'warning')
         else:
             print("爬蟲提示: 爬蟲未運行。")
             messagebox.showinfo("爬蟲", "爬蟲未運行。")
 
-    def _run_crawler_periodically(self):
-        while not self.stop_crawler_event.is_set():
-            self._fetch_and_process_events()
-            # 等待下一次執行
-            sleep_seconds = self.crawler_interval_hours.get() * 3600
-            self.stop_crawler_event.wait(sleep_seconds)
+    def cancel_current_run(self):
+        """取消目前這一次爬蟲執行（定時爬蟲會在下一個排程時間繼續）"""
+        if not self.crawl_active:
+            self._post_status("目前沒有執行中的爬蟲。")
+            return
+        self.cancel_run_button.state(["disabled"])
+        self.crawl_worker.cancel(force_after=WORKER_CANCEL_GRACE_SECONDS)
+        print("爬蟲提示: 正在取消本次執行...")
+        self._post_status("正在取消本次執行，將在目前的捲動完成後停止...", 'warning')
 
-    def _fetch_and_process_events(self):
-        print("爬蟲提示: 開始執行爬蟲...")
-        self.after(0, lambda: messagebox.showinfo("爬蟲", "開始執行爬蟲..."))
-        
-        # 從設定檔載入使用者列表
-        user_configs = []
+    def _run_crawler_periodically(self):
+        """依各帳號的排程執行爬蟲：只抓取已到期的帳號，其餘時間等待"""
+        scheduler = CrawlScheduler(
+            base_interval_hours=self.crawler_interval_hours.get(),
+            base_num_tweets=self.num_tweets_to_scrape.get(),
+        )
+        # 帳號設定改變時叫醒排程器，新增的帳號立即排入、刪除的帳號停止排程
+        users_changed = threading.Event()
+        unsubscribe = self.config_service.users.subscribe(lambda users: users_changed.set())
         try:
-            with open('user_config.json', 'r', encoding='utf-8') as f:
-                user_configs = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            error_message = f"無法載入 user_config.json: {e}\n請透過'管理爬取帳號'功能設定。"
+            while not self.stop_crawler_event.is_set():
+                # 每輪套用 UI 上調整的間隔/數量；帳號設定只在檔案改變時才重新讀取
+                scheduler.configure(self.crawler_interval_hours.get(), self.num_tweets_to_scrape.get())
+                user_configs = self._load_user_configs()
+                if user_configs is None:
+                    self._wait_scheduler(self.crawler_interval_hours.get() * 3600, users_changed)
+                    continue
+                scheduler.sync_accounts(user_configs + [{'user_id': SB_SCHEDULE_ID, 'name': SB_VENUE_NAME}])
+
+                due = scheduler.pop_due()
+                if due:
+                    cycle_start = time.time()
+                    due_configs = [config for config in user_configs if config['user_id'] in {a.user_id for a in due}]
+                    self._fetch_and_process_events(
+                        user_configs=due_configs,
+                        num_tweets={account.user_id: account.num_tweets for account in due},
+                        include_sb=any(account.user_id == SB_SCHEDULE_ID for account in due),
+                        scheduler=scheduler,
+                    )
+                    # 執行失敗而沒有記錄結果的帳號，稍後重試
+                    for account in due:
+                        if account.last_run is None or account.last_run < cycle_start:
+                            scheduler.retry_later(account.user_id)
+                    print(f"爬蟲提示: 下次排程\n{scheduler.describe()}")
+                    continue
+
+                # 等待下一個帳號到期
+                wait_seconds = scheduler.seconds_until_next()
+                if wait_seconds is None:
+                    wait_seconds = self.crawler_interval_hours.get() * 3600
+                self._wait_scheduler(min(wait_seconds, SCHEDULER_POLL_SECONDS), users_changed)
+        finally:
+            unsubscribe()
+
+    def _wait_scheduler(self, seconds, users_changed):
+        """等待 seconds 秒，停止爬蟲或帳號設定改變時提前結束"""
+        deadline = time.time() + seconds
+        while not self.stop_crawler_event.is_set() and not users_changed.is_set():
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            self.stop_crawler_event.wait(min(remaining, 1.0))
+        users_changed.clear()
+
+    def _load_user_configs(self):
+        """取得爬取帳號（由設定服務快取），設定錯誤或為空時提示並回傳 None"""
+        users_config = self.config_service.users
+        user_configs = users_config.get()
+        if users_config.error:
+            error_message = f"{users_config.error}\n請透過'管理爬取帳號'功能設定。"
             print(f"設定錯誤: {error_message}")
-            self.after(0, lambda: messagebox.showerror("設定錯誤", error_message))
-            print(f"Error loading user_config.json: {e}")
-            traceback.print_exc()
-            return
+            # 有上一次的有效設定時繼續使用，只提示錯誤
+            self._post_status(f"設定錯誤: {error_message}", 'error' if user_configs is None else 'warning')
+            if user_configs is None:
+                return None
 
         if not user_configs:
             print("設定錯誤: 爬取列表為空，請先新增帳號。")
-            self.after(0, lambda: messagebox.showwarning("設定錯誤", "爬取列表為空，請先新增帳號。"))
-            return
+            self._post_status("設定錯誤: 爬取列表為空，請先新增帳號。", 'warning')
+            return None
+        return user_configs
+
+    def _fetch_and_process_events(self, user_configs=None, num_tweets=None, include_sb=True, scheduler=None):
+        """抓取帳號推文並合併活動
 
-        num_tweets_to_get = self.num_tweets_to_scrape.get()
-        taipei_tz = pytz.timezone('Asia/Taipei')
-        today = datetime.now(taipei_tz)
+        Args:
+            user_configs: 要抓取的帳號（預設為 user_config.json 中的全部帳號）
+            num_tweets: {user_id: 抓取數量}，未指定的帳號使用 UI 上的抓取數量
+            include_sb: 是否一併爬取 SB 玩具間日曆
+            scheduler: CrawlScheduler（可選），每個帳號完成後回報結果以調整下次排程
+        """
+        print("爬蟲提示: 開始執行爬蟲...")
+        self._post_status("開始執行爬蟲...")
         
-        try:
-            for config in user_configs:
-                print(f"正在抓取 {config['name']} (@{config['user_id']}) 的推文...")
-                
-                # 1. 使用 XCrawler 抓取推文
-                tweets_data = self.crawler.scrape_x_tweets(
-                    username=config['user_id'],
-                    num_tweets=num_tweets_to_get,
-                    debug=False,
-                    ignore_retweets=True,
-                    ignore_pinned=True
-                )
-                
-                if not tweets_data:
-                    print(f"在 {config['name']} 的頁面沒有抓取到新的推文。")
-                    continue
-                
-                # 2. 將推文資料轉換為事件資料
-                new_events = []
-                for tweet in tweets_data:
-                    event = process_tweet_to_event(tweet, config['name'], today)
-                    if event:
-                        new_events.append(event)
-                
-                if not new_events:
-                    print(f"在 {config['name']} 的推文中沒有找到包含日期的事件。")
-                    continue
-                
-                print(f"從 {len(tweets_data)} 條推文中提取了 {len(new_events)} 個事件")
-                
-                output_dir = "outputs"
-                os.makedirs(output_dir, exist_ok=True)
-                json_filename = os.path.join(output_dir, f"{config['name']}_events.json")
-                
-                # 3. Load existing events
-                existing_events = []
-                existing_event_texts = set()
-                try:
-                    if os.path.exists(json_filename):
-                        with open(json_filename, 'r', encoding='utf-8') as f:
-                            existing_events = json.load(f)
-                        for event in existing_events:
-                            existing_event_texts.add(event['text'])
-                except (FileNotFoundError, json.JSONDecodeError) as e:
-                    print(f"載入現有事件時發生錯誤: {e}")
-                    traceback.print_exc()
-                    pass # File doesn't exist or is empty, will be created
+        # 從設定檔載入使用者列表
+        if user_configs is None:
+            user_configs = self._load_user_configs()
+            if user_configs is None:
+                return
 
-                # 4. Merge new events, avoiding duplicates
-                unique_new_events = []
-                for event in new_events:
-                    if event['text'] not in existing_event_texts:
-                        unique_new_events.append(event)
-                
-                print(f"新增 {len(unique_new_events)} 個新事件到 {config['name']}")
-                final_events = existing_events + unique_new_events
-                
-                # 5. Overwrite the file with the merged list
-                with open(json_filename, 'w', encoding='utf-8') as f:
-                    json.dump(final_events, f, ensure_ascii=False, indent=4)
+        # 在爬蟲子行程中執行，這個執行緒只等待結果
+        job = self.crawl_worker.run(
+            'crawl',
+            user_configs=user_configs,
+            num_tweets=num_tweets,
+            default_num_tweets=self.num_tweets_to_scrape.get(),
+            include_sb=include_sb,
+            combined=self.combined_timeline_var.get(),
+            list_url=self.timeline_list_url.get().strip() or None,
+        )
+        if job is None or job['type'] == 'job_failed':
+            error_message = f"執行爬蟲時發生錯誤: {job['error'] if job else '爬蟲子行程沒有回應'}"
+            print(f"爬蟲錯誤: {error_message}")
+            self._post_status(error_message, 'error')
+            return
 
-            # 爬取完 X 的推文後，接著爬取 SB 玩具間的活動
-            print("爬蟲提示: 開始爬取 SB 玩具間活動...")
-            self._fetch_sb_events()
-            
+        result = job['result']
+        if scheduler is not None:
+            for account in result['accounts']:
+                post_times = [{'post_time': post_time} for post_time in account['post_times']]
+                scheduler.record_run(account['user_id'], post_times, account['events_added'])
+            if result['sb_events_added'] is not None:
+                scheduler.record_run(SB_SCHEDULE_ID, None, result['sb_events_added'])
+
+        # 結果訊息由子行程的 cycle_finished 事件顯示在狀態列
+        if result['error']:
+            print(f"爬蟲錯誤: 執行爬蟲時發生錯誤: {result['error']}")
+        elif result['cancelled']:
+            print("爬蟲提示: 爬蟲已停止，更新活動列表。")
+        else:
             print("爬蟲提示: 爬蟲執行完成，更新活動列表。")
-            self.after(0, lambda: messagebox.showinfo("爬蟲", "爬蟲執行完成，更新活動列表。"))
-            self.after(0, self._load_events_and_display) # Refresh UI
-        except Exception as e:
-            error_message = f"執行爬蟲時發生錯誤: {e}"
-            print(f"爬蟲錯誤: {error_message}")
-            self.after(0, lambda: messagebox.showerror("爬蟲錯誤", error_message))
-            print(f"爬蟲執行錯誤: {e}")
-            traceback.print_exc()
-    
-    def _fetch_sb_events(self):
-        """爬取 SB 玩具間活動（使用當前 UI 的 driver）"""
-        try:
-            print("⏳ 正在爬取 SB 玩具間活動...")
-            
-            # 使用 UI 的 driver 創建 SB 爬蟲
-            sb_crawler = SBCrawler(driver=self.crawler.driver)
-            
-            # 爬取活動
-            events = sb_crawler.scrape_events()
-            
-            if events:
-                # 儲存活動（自動合併現有資料）
-                sb_crawler.save_events(events, merge_existing=True)
-                print(f"✅ 成功爬取 {len(events)} 個 SB 玩具間活動")
-            else:
-                print("⚠️ 沒有爬取到 SB 玩具間活動")
-            
-            # 不要關閉 driver（因為使用的是外部 driver）
-            
-        except Exception as e:
-            print(f"❌ 爬取 SB 玩具間活動時出錯: {e}")
-            traceback.print_exc()
-            # 不要中斷整個爬蟲流程，只是記錄錯誤
-            
+        # 這裡是背景執行緒，重新載入活動列表交給 Tk 主執行緒
+        self.ui_events.put({'type': 'events_changed'})
+
     def _load_events_and_display(self):
         outputs_dir = './outputs'
         if not os.path.exists(outputs_dir):
@@ -550,7 +734,6 @@ class EventCrawlerUI(tk.Tk):
                 self.notebook.forget(tab_id)
                 del self.venue_frames[tab_name]
                 del self.venue_treeviews[tab_name]
-                del self.venue_events_data[tab_name]
         
         for venue_name in self.venues:
             if venue_name not in current_tab_names:
@@ -558,84 +741,129 @@ class EventCrawlerUI(tk.Tk):
                 self.notebook.add(frame, text=venue_name)
                 self.venue_frames[venue_name] = frame
                 
-                tree = ttk.Treeview(frame, columns=("日期", "標題"), show="headings")
+                tree = ttk.Treeview(frame, columns=("日期", "標題"), show="headings", selectmode="extended")
                 tree.heading("日期", text="日期")
                 tree.heading("標題", text="標題")
                 tree.column("日期", width=100, anchor="center")
                 tree.column("標題", width=300, anchor="w")
                 tree.pack(fill=tk.BOTH, expand=True)
                 tree.bind("<Double-1>", lambda event, v=venue_name: self._on_venue_date_select(event, v))
+                # 多選（Ctrl/Shift + 點擊）後以右鍵選單批次操作，Delete 鍵批次標記刪除
+                tree.bind("<Button-3>", lambda event, v=venue_name: self._show_venue_menu(event, v))
+                tree.bind("<Delete>", lambda event, v=venue_name: self._bulk_action(v, 'delete'))
                 self.venue_treeviews[venue_name] = tree
 
+        event_index = load_outputs_index(outputs_dir, cache_dir=DEFAULT_CACHE_DIR)
+        # 全文索引沿用上一次的結果，只重新切詞新增或內容改變的活動
+        changed, removed = event_index.attach_search(self.search_index)
+        print(f"搜尋索引: {len(self.search_index)} 個活動（更新 {changed}，移除 {removed}）")
+        self.event_index = event_index
+        
+        # Display dates for each venue
         for venue_name in self.venues:
-            tree = self.venue_treeviews[venue_name]
-            for item in tree.get_children():
-                tree.delete(item)
-            self.venue_events_data[venue_name] = {}
+            self._refresh_venue_tree(venue_name)
 
-        all_events_by_venue_and_date = {venue: {} for venue in self.venues}
+    def _refresh_venue_tree(self, venue_name):
+        """依活動索引重新填入單一場地的日期列表"""
+        tree = self.venue_treeviews.get(venue_name)
+        if tree is None:
+            return
+        tree.delete(*tree.get_children())
+
+        for date_str, all_events_on_date in self.event_index.grouped_by_date(venue_name):
+            # 找到第一個有標題的活動
+            first_event_title = next((event.title for event in all_events_on_date if event.title), "")
+
+            # 判斷是否所有事件都已校正
+            all_checked = all(event.check for event in all_events_on_date)
+            tags = ('corrected_date',) if all_checked else ()
+
+            tree.insert("", "end", values=(date_str, first_event_title), iid=date_str, tags=tags)
+        # 活動有變動時，搜尋結果也一起更新
+        self._schedule_search()
+
+    def _schedule_search(self):
+        """輸入停頓 SEARCH_DEBOUNCE_MS 後才查詢，連續打字不會每個字都重新查詢"""
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(SEARCH_DEBOUNCE_MS, self._run_search)
+
+    def _run_search(self):
+        self._search_after_id = None
+        query = self.search_var.get().strip()
+        if not query:
+            self._search_results = []
+            self.search_count_label.config(text="")
+            self.search_results_frame.pack_forget()
+            return
 
-        for filename in os.listdir(outputs_dir):
-            if filename.endswith('_events.json'):
-                filepath = os.path.join(outputs_dir, filename)
-                current_file_venue_name = filename.replace('_events.json', '')
+        results = self.search_index.search(query)
+        self._archived_result_ids = set()
+        if self.search_archive_var.get():
+            archived_results = self._get_archive_search_index().search(query)
+            self._archived_result_ids = {id(event) for event in archived_results}
+            results = sorted(results + archived_results, key=lambda e: (e.date_key, e.venue))
+        self._search_results = results[:SEARCH_MAX_RESULTS]
+        self.search_tree.delete(*self.search_tree.get_children())
+        for i, event in enumerate(self._search_results):
+            venue_label = event.venue
+            if id(event) in self._archived_result_ids:
+                tags = ('corrected_date',)
+                venue_label = f"{event.venue}（封存）"
+            else:
+                tags = ('corrected_date',) if event.check else ()
+            self.search_tree.insert("", "end", iid=str(i), values=(event.date_key, venue_label, event.title or event.text[:50]), tags=tags)
+        if len(results) > SEARCH_MAX_RESULTS:
+            self.search_count_label.config(text=f"{len(results)} 筆（顯示前 {SEARCH_MAX_RESULTS} 筆）")
+        else:
+            self.search_count_label.config(text=f"{len(results)} 筆")
+        if not self.search_results_frame.winfo_ismapped():
+            self.search_results_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=5, before=self.notebook)
+
+    def _get_archive_search_index(self):
+        """封存活動的搜尋索引；只有分區檔案有變動時才重新讀取"""
+        versions = archive_versions('./outputs')
+        if versions != self._archive_versions:
+            changed, removed = self.archive_search_index.sync(load_archive('./outputs'))
+            self._archive_versions = versions
+            print(f"封存搜尋索引: {len(self.archive_search_index)} 個活動（更新 {changed}，移除 {removed}）")
+        return self.archive_search_index
+
+    def _compact_events(self):
+        """將過去月份與已刪除的活動移到封存分區（爬蟲每個週期結束時也會自動執行）"""
+        try:
+            moved = compact_outputs('./outputs')
+        except Exception as e:
+            error_message = f"封存活動時發生錯誤: {e}"
+            print(f"封存錯誤: {error_message}")
+            messagebox.showerror("封存錯誤", error_message)
+            traceback.print_exc()
+            return
+        if moved:
+            details = '、'.join(f"{venue} {count} 個" for venue, count in moved.items())
+            message = f"已封存 {sum(moved.values())} 個過去或已刪除的活動（{details}）"
+        else:
+            message = "沒有需要封存的活動。"
+        print(f"封存活動: {message}")
+        self._post_status(message)
+        self._load_events_and_display()
 
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        if not content.strip(): # 處理空檔案的情況
-                            events = []
-                        else:
-                            events = json.loads(content)
-                        
-                        for event in events:
-                            if event.get('delete', False):
-                                continue
-
-                            # Data is now pre-structured, so direct assignment is used
-                            event['venue'] = current_file_venue_name
-                            event['source_file'] = filepath
-
-                            # Fix for TypeError: handle both missing key and "date": null from old files
-                            date_str = event.get('date') or 'N/A'
-
-                            if date_str not in all_events_by_venue_and_date[current_file_venue_name]:
-                                all_events_by_venue_and_date[current_file_venue_name][date_str] = []
-                            all_events_by_venue_and_date[current_file_venue_name][date_str].append(event)
-                except json.JSONDecodeError as e:
-                    print(f"載入檔案 {filepath} 時發生 JSON 錯誤: {e}")
-                    traceback.print_exc()
-                except Exception as e:
-                    print(f"載入檔案 {filepath} 時發生錯誤: {e}")
-                    traceback.print_exc()
-        
-        # Display dates for each venue
-        for venue_name, dates_data in all_events_by_venue_and_date.items():
-            tree = self.venue_treeviews[venue_name]
-            sorted_dates = sorted(dates_data.keys())
-            for date_str in sorted_dates:
-                all_events_on_date = dates_data[date_str]
-                unchecked_events = [e for e in all_events_on_date if not e.get('check', False)]
-                num_unchecked = len(unchecked_events)
-
-                # 獲取該日期所有活動，並嘗試找到第一個有標題的活動
-                display_text = date_str
-                first_event_title = ""
-                if all_events_on_date:
-                    for event in all_events_on_date:
-                        if event.get('title') and event.get('title').strip() != '':  # 檢查title非空且不為'.'
-                            first_event_title = event.get('title')
-                            break # 找到第一個有標題的活動就停止
-
-                    if first_event_title:
-                        display_text += f" - {first_event_title}"
-
-                # 判斷是否所有事件都已校正
-                all_checked = all(event.get('check', False) for event in all_events_on_date)
-                tags = ('corrected_date',) if all_checked and all_events_on_date else ()
-
-                tree.insert("", "end", values=(date_str, first_event_title if first_event_title else ""), iid=date_str, tags=tags)
-                self.venue_events_data[venue_name][date_str] = dates_data[date_str]
+    def _on_search_result_select(self, event):
+        """雙擊搜尋結果：開啟該場地該日期的活動詳情"""
+        selected_items = self.search_tree.selection()
+        if not selected_items:
+            return
+        selected = self._search_results[int(selected_items[0])]
+        if id(selected) in self._archived_result_ids:
+            # 封存的活動只供查詢，不在目前的列表中編輯
+            details = f"{selected.date_key} {selected.venue}\n{selected.title}\n\n{selected.text}"
+            if selected.link:
+                details += f"\n\n{selected.link}"
+            messagebox.showinfo("封存活動", details)
+            return
+        events_on_date = self.event_index.events_on(selected.venue, selected.date_key)
+        if events_on_date:
+            self._show_event_details_popup(selected.venue, selected.date_key, events_on_date)
 
     def _on_venue_date_select(self, event, venue_name):
         print(f"觸發 _on_venue_date_select 函數, 場地: {venue_name}") # 加入print
@@ -644,11 +872,276 @@ class EventCrawlerUI(tk.Tk):
             return
         
         selected_date_str = selected_items[0] # item ID 就是日期字串
-        events_on_selected_date = self.venue_events_data[venue_name].get(selected_date_str)
+        events_on_selected_date = self.event_index.events_on(venue_name, selected_date_str)
 
         if events_on_selected_date:
             self._show_event_details_popup(venue_name, selected_date_str, events_on_selected_date)
 
+    def _show_venue_menu(self, event, venue_name):
+        """場地列表的右鍵選單：對所有選取日期上的活動執行批次操作"""
+        tree = self.venue_treeviews[venue_name]
+        row = tree.identify_row(event.y)
+        if row and row not in tree.selection():
+            tree.selection_set(row)
+        if not tree.selection():
+            return
+
+        menu = tk.Menu(self, tearoff=0)
+        menu.add_command(label=f"已選取 {len(tree.selection())} 個日期", state=tk.DISABLED)
+        menu.add_separator()
+        for action in ('check', 'delete'):
+            menu.add_command(label=BATCH_ACTIONS[action], command=lambda a=action: self._bulk_action(venue_name, a))
+        # 全部活動都已刪除的日期不在列表中，取消刪除改為從檔案列出有已刪除活動的日期
+        menu.add_command(label=f"{BATCH_ACTIONS['undelete']}...", command=lambda: self._ask_bulk_undelete(venue_name))
+        category_menu = tk.Menu(menu, tearoff=0)
+        for code, info in self._load_category_choices().items():
+            category_menu.add_command(
+                label=f"{code}（{info.get('name', code)}）",
+                command=lambda c=code: self._bulk_action(venue_name, 'category', c),
+            )
+        menu.add_cascade(label=BATCH_ACTIONS['category'], menu=category_menu)
+        menu.add_command(label=BATCH_ACTIONS['auto_category'], command=lambda: self._bulk_action(venue_name, 'auto_category'))
+        menu.add_command(label=f"{BATCH_ACTIONS['shift_date']}...", command=lambda: self._ask_bulk_shift_days(venue_name))
+        try:
+            menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            menu.grab_release()
+
+    def _load_category_choices(self):
+        """category_config.json 中的類別供選單使用，沒有任何類別時只提供 'or'"""
+        categories = self.config_service.categories.get()
+        if categories:
+            return dict(sorted(categories.items()))
+        return {'or': {'name': '其他'}}
+
+    def _ask_bulk_shift_days(self, venue_name):
+        days = simpledialog.askinteger("日期平移", "將選取日期的活動平移幾天（負數為提前）:", parent=self, minvalue=-366, maxvalue=366)
+        if days:
+            self._bulk_action(venue_name, 'shift_date', days)
+
+    def _ask_bulk_undelete(self, venue_name):
+        """列出場地檔案中有已刪除活動的日期（包括列表中看不到、整天都已刪除的日期），選取後取消刪除"""
+        filepath = os.path.join('./outputs', f"{venue_name}_events.json")
+        try:
+            events = load_event_file(filepath, venue=venue_name)
+        except Exception as e:
+            error_message = f"讀取 {venue_name} 的活動時發生錯誤: {e}"
+            print(f"批次操作錯誤: {error_message}")
+            messagebox.showerror("批次操作錯誤", error_message)
+            return
+        deleted_counts = {}
+        for event in events:
+            if event.delete:
+                deleted_counts[event.date_key] = deleted_counts.get(event.date_key, 0) + 1
+        if not deleted_counts:
+            messagebox.showinfo(BATCH_ACTIONS['undelete'], f"{venue_name} 沒有已刪除的活動（已封存的活動不會列出）。")
+            return
+
+        popup = tk.Toplevel(self)
+        popup.title(f"{venue_name} - {BATCH_ACTIONS['undelete']}")
+        main_frame = ttk.Frame(popup, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(main_frame, text="選擇要取消刪除的日期（可多選），這些日期上已刪除的活動都會恢復：").pack(anchor=tk.W, pady=5)
+        date_keys = sorted(deleted_counts)
+        listbox = tk.Listbox(main_frame, selectmode=tk.EXTENDED, height=min(len(date_keys), 15), exportselection=False)
+        listbox.pack(fill=tk.BOTH, expand=True)
+        # 預先選取列表中已選取的日期
+        tree = self.venue_treeviews.get(venue_name)
+        preselected = set(tree.selection()) if tree is not None else set()
+        for i, date_key in enumerate(date_keys):
+            listbox.insert(tk.END, f"{date_key}（{deleted_counts[date_key]} 個已刪除的活動）")
+            if date_key in preselected:
+                listbox.selection_set(i)
+
+        def confirm():
+            chosen = [date_keys[i] for i in listbox.curselection()]
+            if not chosen:
+                messagebox.showwarning("提示", "請選擇要取消刪除的日期！", parent=popup)
+                return
+            popup.destroy()
+            self._bulk_action(venue_name, 'undelete', date_keys=chosen)
+
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=10)
+        ttk.Button(button_frame, text=BATCH_ACTIONS['undelete'], command=confirm).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="關閉", command=popup.destroy).pack(side=tk.RIGHT, padx=5)
+
+    def _bulk_action(self, venue_name, action, value=None, date_keys=None):
+        """對選取日期上的活動套用批次操作：在記憶體中修改，每個檔案只寫入一次
+
+        date_keys 未指定時使用場地列表中選取的日期。
+        """
+        if date_keys is None:
+            tree = self.venue_treeviews.get(venue_name)
+            date_keys = tree.selection() if tree is not None else ()
+        if not date_keys:
+            return
+        label = BATCH_ACTIONS[action]
+        if action == 'delete' and not messagebox.askyesno(
+                "確認標記為刪除", f"您確定要將選取的 {len(date_keys)} 個日期上的所有活動標記為刪除嗎？這將不會從檔案中永久移除。"):
+            return
+
+        # 依活動所在的檔案分組（通常一個場地就是一個檔案）
+        selections = {}
+        if action == 'undelete':
+            # 已刪除的活動不在索引中，直接選取場地檔案中這些日期的活動
+            selections[os.path.join('./outputs', f"{venue_name}_events.json")] = set(date_keys)
+        for date_key in date_keys:
+            for event in self.event_index.events_on(venue_name, date_key):
+                filepath = event.source_file or os.path.join('./outputs', f"{venue_name}_events.json")
+                selections.setdefault(filepath, set()).add(date_key)
+        try:
+            # 檔案在畫面載入後被爬蟲修改過時，選取的範圍可能與看到的不同，改為重新載入
+            expected_versions = {filepath: self.event_index.file_versions.get(filepath) for filepath in selections}
+            result = apply_batch(selections, action, value, expected_versions)
+        except EventFileConflict as e:
+            self._handle_event_conflict(e)
+            return
+        except Exception as e:
+            error_message = f"批次{label}時發生錯誤: {e}"
+            print(f"批次操作錯誤: {error_message}")
+            messagebox.showerror("批次操作錯誤", error_message)
+            traceback.print_exc()
+            return
+
+        self._apply_batch_result(result)
+        message = f"{venue_name}: {label}，共更新 {result.changed} 個活動（寫入 {len(result.files)} 個檔案）"
+        print(f"批次操作: {message}")
+        self._post_status(message)
+
+    def _apply_batch_result(self, result):
+        """直接使用批次寫入的結果更新索引與列表，不需重新讀取檔案"""
+        self.event_index.file_versions.update(result.versions)
+        for filepath, events in result.files.items():
+            venue = venue_from_filename(filepath)
+            self.event_index.set_venue(venue, [event for event in events if not event.delete])
+            self._refresh_venue_tree(venue)
+
+    def _show_duplicates_popup(self):
+        """列出同一天內容相近的活動群組（預告、提醒、轉發），可保留一則並將其餘標記刪除"""
+        duplicate_index = DuplicateIndex(self.event_index)
+        clusters = duplicate_index.clusters()
+
+        popup = tk.Toplevel(self)
+        popup.title("檢查重複活動")
+        popup.geometry("900x600")
+
+        main_frame = ttk.Frame(popup, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        summary_var = tk.StringVar()
+        ttk.Label(main_frame, textvariable=summary_var).pack(anchor=tk.W, pady=5)
+
+        tree_frame = ttk.Frame(main_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        tree = ttk.Treeview(tree_frame, columns=("場地", "已校正", "內容"), show="tree headings")
+        tree.heading("#0", text="日期")
+        tree.heading("場地", text="場地")
+        tree.heading("已校正", text="已校正")
+        tree.heading("內容", text="內容")
+        tree.column("#0", width=130)
+        tree.column("場地", width=100)
+        tree.column("已校正", width=60, anchor="center")
+        tree.column("內容", width=550)
+        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        def update_summary():
+            summary_var.set(
+                f"找到 {len(tree.get_children())} 組同一天、文字相似度 {int(SIMILARITY_THRESHOLD * 100)}% 以上的活動。"
+                "雙擊活動開啟詳情，或選取要保留的活動後將同組其餘活動標記刪除。"
+            )
+
+        for cluster_index, cluster in enumerate(clusters):
+            parent = tree.insert("", "end", iid=f"c{cluster_index}", text=cluster[0].date_key,
+                                 values=("", "", f"{len(cluster)} 個相近的活動"), open=True)
+            for event_index, event in enumerate(cluster):
+                content = (event.title or event.text).replace('\n', ' ')[:100]
+                tree.insert(parent, "end", iid=f"c{cluster_index}-{event_index}",
+                            values=(event.venue, "✔" if event.check else "", content))
+        update_summary()
+
+        def selected_event():
+            selected = tree.selection()
+            if not selected or '-' not in selected[0]:
+                return None, None
+            cluster_index, event_index = (int(part) for part in selected[0][1:].split('-'))
+            return cluster_index, clusters[cluster_index][event_index]
+
+        def open_selected(event=None):
+            _, selected = selected_event()
+            if selected is None:
+                return
+            events_on_date = self.event_index.events_on(selected.venue, selected.date_key)
+            if events_on_date:
+                self._show_event_details_popup(selected.venue, selected.date_key, events_on_date)
+
+        def keep_selected():
+            cluster_index, keep = selected_event()
+            if keep is None:
+                messagebox.showwarning("提示", "請選擇要保留的活動！", parent=popup)
+                return
+            others = [event for event in clusters[cluster_index] if event is not keep]
+            if not messagebox.askyesno("確認標記為刪除", f"保留 {keep.venue} 的這則活動，並將同組其餘 {len(others)} 個活動標記為刪除？", parent=popup):
+                return
+            try:
+                expected_versions = {event.source_file: self.event_index.file_versions.get(event.source_file) for event in others}
+                result = apply_to_events(others, 'delete', expected_versions=expected_versions)
+            except EventFileConflict as e:
+                popup.destroy()
+                self._handle_event_conflict(e)
+                return
+            except Exception as e:
+                error_message = f"標記重複活動時發生錯誤: {e}"
+                print(f"批次操作錯誤: {error_message}")
+                messagebox.showerror("批次操作錯誤", error_message, parent=popup)
+                traceback.print_exc()
+                return
+            self._apply_batch_result(result)
+            tree.delete(f"c{cluster_index}")
+            update_summary()
+            message = f"重複活動: 保留 {keep.venue} {keep.date_key} 的活動，標記刪除 {result.changed} 個相近的活動"
+            print(message)
+            self._post_status(message)
+
+        tree.bind("<Double-1>", open_selected)
+
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=10)
+        ttk.Button(button_frame, text="保留選取的活動，其餘標記刪除", command=keep_selected).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="開啟詳情", command=open_selected).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="關閉", command=popup.destroy).pack(side=tk.RIGHT, padx=5)
+
+    def _find_event_in_file(self, events_in_file, event_data):
+        """在檔案的活動中找到畫面上的活動，找不到時回傳 None
+
+        固定舉辦的活動每次的 text 相同，不能只以 text 識別，因此找內容完全相同的活動。
+        樂觀並行檢查：找不到相同的活動、但檔案中有同 text 的活動時，視為這個活動在開啟後
+        被其他視窗或批次操作修改，拋出 EventFileConflict，不覆蓋別人的修改。
+        """
+        for i, event in enumerate(events_in_file):
+            if event == event_data:
+                return i
+        if any(event.text == event_data.text for event in events_in_file):
+            raise EventFileConflict("這個活動在開啟後已被修改，已重新載入，請確認後再編輯。")
+        return None
+
+    def _commit_event_file(self, filepath, events):
+        """在 file_lock(filepath) 內呼叫：寫回檔案；寫入前檔案與畫面一致時記錄新的版本"""
+        in_sync = event_file_version(filepath) == self.event_index.file_versions.get(filepath)
+        save_event_file(filepath, events)
+        if in_sync:
+            self.event_index.file_versions[filepath] = event_file_version(filepath)
+
+    def _handle_event_conflict(self, error, popup=None):
+        """檔案已被其他寫入者修改：提示後重新載入畫面"""
+        print(f"資料已變更: {error}")
+        messagebox.showwarning("資料已變更", str(error))
+        if popup is not None:
+            popup.destroy()
+        self._load_events_and_display()
+
     def _show_event_details_popup(self, venue_name, date_str, events):
         popup = tk.Toplevel(self)
         popup.title(f"{venue_name} - {date_str} 活動詳情")
@@ -680,14 +1173,14 @@ class EventCrawlerUI(tk.Tk):
             event_frame = ttk.LabelFrame(scrollable_frame, text=f"活動 {i+1}", padding="10")
             event_frame.pack(fill=tk.X, padx=5, pady=5)
 
-            is_deleted = event_data.get('delete', False)
+            is_deleted = event_data.delete
 
             if is_deleted:
                 ttk.Label(event_frame, text="此活動已標記為刪除，將不會顯示在主頁面。", foreground="red").grid(row=0, column=2, sticky=tk.W, padx=5, pady=2)
 
             ttk.Label(event_frame, text="活動日期:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
             date_entry = ttk.Entry(event_frame, width=50, state=tk.NORMAL)
-            date_entry.insert(0, event_data.get('date') or '')  # 處理 None 值
+            date_entry.insert(0, event_data.date_key)
             if is_deleted:
                 date_entry.config(foreground="gray")
                 date_entry.bind("<Key>", lambda e: "break")
@@ -695,7 +1188,7 @@ class EventCrawlerUI(tk.Tk):
 
             ttk.Label(event_frame, text="原始推文:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=2)
             original_text = tk.Text(event_frame, height=10, wrap=tk.WORD)
-            original_text.insert(tk.END, event_data.get('text', ''))
+            original_text.insert(tk.END, event_data.text)
             original_text.config(state=tk.NORMAL) # 將狀態改為 NORMAL 以允許選取和複製
             original_text.tag_configure("readonly", foreground="gray") # 新增一個 readonly tag
             original_text.tag_add("readonly", "1.0", tk.END) # 將整個文字區域應用 readonly tag
@@ -703,7 +1196,7 @@ class EventCrawlerUI(tk.Tk):
 
             ttk.Label(event_frame, text="活動名稱:").grid(row=2, column=0, sticky=tk.W, padx=5, pady=2)
             title_entry = ttk.Entry(event_frame, width=50, state=tk.NORMAL) # 始終保持 NORMAL 狀態
-            title_entry.insert(0, event_data.get('title') or '')  # 處理 None 值
+            title_entry.insert(0, event_data.title)
             if is_deleted: # 如果是刪除狀態，則設置為只讀模式
                 title_entry.config(foreground="gray")
                 title_entry.bind("<Key>", lambda e: "break") # 阻止鍵盤輸入
@@ -711,7 +1204,7 @@ class EventCrawlerUI(tk.Tk):
 
             ttk.Label(event_frame, text="簡短描述:").grid(row=3, column=0, sticky=tk.W, padx=5, pady=2)
             brief_description_entry = ttk.Entry(event_frame, width=50, state=tk.NORMAL) # 始終保持 NORMAL 狀態
-            brief_description_entry.insert(0, event_data.get('brief_description') or '')  # 處理 None 值
+            brief_description_entry.insert(0, event_data.brief_description)
             if is_deleted: # 如果是刪除狀態，則設置為只讀模式
                 brief_description_entry.config(foreground="gray")
                 brief_description_entry.bind("<Key>", lambda e: "break")
@@ -719,7 +1212,7 @@ class EventCrawlerUI(tk.Tk):
 
             ttk.Label(event_frame, text="開始時間:").grid(row=4, column=0, sticky=tk.W, padx=5, pady=2)
             start_time_entry = ttk.Entry(event_frame, width=50, state=tk.NORMAL) # 始終保持 NORMAL 狀態
-            start_time_entry.insert(0, event_data.get('start_time') or '')  # 處理 None 值
+            start_time_entry.insert(0, event_data.start_time or '')
             if is_deleted: # 如果是刪除狀態，則設置為只讀模式
                 start_time_entry.config(foreground="gray")
                 start_time_entry.bind("<Key>", lambda e: "break")
@@ -727,7 +1220,7 @@ class EventCrawlerUI(tk.Tk):
 
             ttk.Label(event_frame, text="結束時間:").grid(row=5, column=0, sticky=tk.W, padx=5, pady=2)
             end_time_entry = ttk.Entry(event_frame, width=50, state=tk.NORMAL) # 始終保持 NORMAL 狀態
-            end_time_entry.insert(0, event_data.get('end_time') or '')  # 處理 None 值
+            end_time_entry.insert(0, event_data.end_time or '')
             if is_deleted: # 如果是刪除狀態，則設置為只讀模式
                 end_time_entry.config(foreground="gray")
                 end_time_entry.bind("<Key>", lambda e: "break")
@@ -735,7 +1228,7 @@ class EventCrawlerUI(tk.Tk):
 
             ttk.Label(event_frame, text="連結:").grid(row=6, column=0, sticky=tk.W, padx=5, pady=2)
             link_entry = ttk.Entry(event_frame, width=50, state=tk.NORMAL) # 始終保持 NORMAL 狀態
-            link_entry.insert(0, event_data.get('link') or '')  # 處理 None 值
+            link_entry.insert(0, event_data.link or '')
             if is_deleted: # 如果是刪除狀態，則設置為只讀模式
                 link_entry.config(foreground="gray")
                 link_entry.bind("<Key>", lambda e: "break")
@@ -743,7 +1236,7 @@ class EventCrawlerUI(tk.Tk):
 
             ttk.Label(event_frame, text="分類:").grid(row=7, column=0, sticky=tk.W, padx=5, pady=2)
             category_entry = ttk.Entry(event_frame, width=50, state=tk.NORMAL)
-            category_entry.insert(0, event_data.get('category') or '')  # 處理 None 值
+            category_entry.insert(0, event_data.category or '')
             if is_deleted:
                 category_entry.config(foreground="gray")
                 category_entry.bind("<Key>", lambda e: "break")
@@ -834,48 +1327,55 @@ class EventCrawlerUI(tk.Tk):
         scrollable_frame.bind("<MouseWheel>", _on_mousewheel) # 確保在 frame 上滾動也有效
 
     def _save_correction_from_popup(self, popup, event_data, date_entry, title_entry, brief_description_entry, start_time_entry, end_time_entry, link_entry, category_entry):
+        # 更新活動資料（'N/A' 會被正規化為沒有日期）
+        corrected = Event(
+            date=date_entry.get(),
+            text=event_data.text,
+            check=True, # 標記為已校正
+            venue=event_data.venue,
+            start_time=start_time_entry.get(),
+            end_time=end_time_entry.get(),
+            link=link_entry.get(),
+            title=title_entry.get(),
+            brief_description=brief_description_entry.get(),
+            delete=event_data.delete,
+            category=category_entry.get(),
+            source_file=event_data.source_file,
+            extra=event_data.extra,
+        ).normalize()
+
         # Validate date format before saving
-        new_date = date_entry.get().strip()
         try:
-            # Allow 'N/A' as a valid value
-            if new_date.upper() != 'N/A':
-                datetime.strptime(new_date, '%Y-%m-%d')
-        except ValueError:
+            corrected.validate()
+        except EventValidationError:
             print("格式錯誤: 日期格式不正確。請使用 YYYY-MM-DD 格式，或填寫 'N/A'。")
             messagebox.showerror("格式錯誤", "日期格式不正確。請使用 YYYY-MM-DD 格式，或填寫 'N/A'。")
             return
 
-        # 更新活動資料
-        event_data['date'] = new_date
-        event_data['title'] = title_entry.get()
-        event_data['brief_description'] = brief_description_entry.get()
-        event_data['start_time'] = start_time_entry.get()
-        event_data['end_time'] = end_time_entry.get()
-        event_data['link'] = link_entry.get()
-        event_data['category'] = category_entry.get() # 保存 category
-        event_data['check'] = True # 標記為已校正
-
         # 寫回 JSON 檔案
-        filepath = event_data['source_file']
+        filepath = event_data.source_file
         try:
-            with open(filepath, 'r+', encoding='utf-8') as f:
-                all_events_in_file = json.load(f)
-                # 找到並更新對應的事件
-                for i, event in enumerate(all_events_in_file):
-                    # 使用 text 作為唯一識別，確保找到正確的事件
-                    if event.get('text') == event_data.get('text'): 
-                        # 保存時移除 source_file 字段（運行時字段）
-                        event_to_save = {k: v for k, v in event_data.items() if k != 'source_file'}
-                        all_events_in_file[i] = event_to_save
-                        break
-                
-                f.seek(0)
-                json.dump(all_events_in_file, f, ensure_ascii=False, indent=4)
-                f.truncate()
+            # 讀取到寫回之間持有檔案鎖，爬蟲同時合併新活動時不會互相覆蓋
+            with file_lock(filepath):
+                all_events_in_file = load_event_file(filepath, venue=event_data.venue)
+                # 找到內容與畫面上相同的活動（固定舉辦的活動 text 相同，不能只比 text）
+                index = self._find_event_in_file(all_events_in_file, event_data)
+                if index is not None:
+                    all_events_in_file[index] = corrected
+                    self._commit_event_file(filepath, all_events_in_file)
+            # 對話框在釋放檔案鎖之後才顯示，使用者關閉前爬蟲仍可寫入這個檔案
+            if index is None:
+                print("警告: 未能在檔案中找到要保存的活動。")
+                messagebox.showwarning("警告", "未能在檔案中找到要保存的活動。")
+                return
             print("保存成功: 活動校正已保存。")
             messagebox.showinfo("保存成功", "活動校正已保存。")
             popup.destroy() # 關閉彈出視窗
-            self.after(0, self._load_events_and_display) # 重新載入並顯示列表
+            # 只更新索引與該場地的列表，不需要重新載入所有檔案
+            self.event_index.replace(event_data, corrected)
+            self._refresh_venue_tree(corrected.venue)
+        except EventFileConflict as e:
+            self._handle_event_conflict(e, popup)
         except Exception as e:
             error_message = f"保存活動時發生錯誤: {e}"
             print(f"保存錯誤: {error_message}")
@@ -883,36 +1383,30 @@ class EventCrawlerUI(tk.Tk):
             traceback.print_exc()
 
     def _delete_event(self, popup, venue_name, date_str, event_data):
-        if messagebox.askyesno("確認標記為刪除", f"您確定要將 {event_data.get('title', 'N/A')} 的活動標記為刪除嗎？這將不會從檔案中永久移除。"):
-            # 在 event_data 中新增或更新 'delete' 標記為 True
-            event_data['delete'] = True
-
+        if messagebox.askyesno("確認標記為刪除", f"您確定要將 {event_data.title or 'N/A'} 的活動標記為刪除嗎？這將不會從檔案中永久移除。"):
             # 從 JSON 檔案中更新
-            filepath = event_data['source_file']
+            filepath = event_data.source_file
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    all_events_in_file = json.load(f)
-
-                # 找到要更新的活動並更新其 'delete' 狀態
-                found = False
-                for i, existing_event in enumerate(all_events_in_file):
-                    # 假設 'text' 屬性可以唯一識別一個活動
-                    if existing_event.get('text') == event_data.get('text'):
-                        all_events_in_file[i]['delete'] = True
-                        found = True
-                        break
-
-                if not found:
+                with file_lock(filepath):
+                    all_events_in_file = load_event_file(filepath, venue=venue_name)
+
+                    # 找到要更新的活動並更新其 delete 狀態
+                    index = self._find_event_in_file(all_events_in_file, event_data)
+                    if index is not None:
+                        all_events_in_file[index].delete = True
+                        self._commit_event_file(filepath, all_events_in_file)
+                if index is None:
                     print("警告: 未能在檔案中找到要標記為刪除的活動。")
                     messagebox.showwarning("警告", "未能在檔案中找到要標記為刪除的活動。")
                     return
-                
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(all_events_in_file, f, ensure_ascii=False, indent=4)
+                event_data.delete = True
                 print("標記成功: 活動已標記為刪除。")
                 messagebox.showinfo("標記成功", "活動已標記為刪除。")
                 popup.destroy()
-                self.after(0, self._load_events_and_display)
+                self.event_index.remove(event_data)
+                self._refresh_venue_tree(venue_name)
+            except EventFileConflict as e:
+                self._handle_event_conflict(e, popup)
             except Exception as e:
                 error_message = f"標記活動為刪除時發生錯誤: {e}"
                 print(f"標記錯誤: {error_message}")
@@ -922,37 +1416,37 @@ class EventCrawlerUI(tk.Tk):
     def _toggle_delete_event(self, popup, venue_name, date_str, event_data, current_is_deleted):
         new_delete_status = not current_is_deleted
         action_text = "取消刪除" if new_delete_status else "刪除"
-        confirm_message = f"您確定要將 {event_data.get('title', 'N/A')} 的活動{action_text}嗎？"
+        confirm_message = f"您確定要將 {event_data.title or 'N/A'} 的活動{action_text}嗎？"
         success_message = f"活動已成功{action_text}。"
         error_message = f"在{action_text}活動時發生錯誤: "
 
         print(f"確認{action_text}: {confirm_message}")
         if messagebox.askyesno(f"確認{action_text}", confirm_message):
-            event_data['delete'] = new_delete_status
-
-            filepath = event_data['source_file']
+            filepath = event_data.source_file
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    all_events_in_file = json.load(f)
-
-                found = False
-                for i, existing_event in enumerate(all_events_in_file):
-                    if existing_event.get('text') == event_data.get('text'):
-                        all_events_in_file[i]['delete'] = new_delete_status
-                        found = True
-                        break
-
-                if not found:
+                with file_lock(filepath):
+                    all_events_in_file = load_event_file(filepath, venue=venue_name)
+
+                    index = self._find_event_in_file(all_events_in_file, event_data)
+                    if index is not None:
+                        all_events_in_file[index].delete = new_delete_status
+                        self._commit_event_file(filepath, all_events_in_file)
+                if index is None:
                     print("警告: 未能在檔案中找到要更新的活動。")
                     messagebox.showwarning("警告", "未能在檔案中找到要更新的活動。")
                     return
-                
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(all_events_in_file, f, ensure_ascii=False, indent=4)
+                event_data.delete = new_delete_status
                 print(f"操作成功: {success_message}")
                 messagebox.showinfo("操作成功", success_message)
                 popup.destroy()
-                self.after(0, self._load_events_and_display)
+                # 主頁面只顯示未刪除的活動
+                if new_delete_status:
+                    self.event_index.remove(event_data)
+                else:
+                    self.event_index.add(event_data)
+                self._refresh_venue_tree(venue_name)
+            except EventFileConflict as e:
+                self._handle_event_conflict(e, popup)
             except Exception as e:
                 full_error_message = f"{error_message}{e}"
                 print(f"{action_text}錯誤: {full_error_message}")
@@ -969,57 +1463,40 @@ class EventCrawlerUI(tk.Tk):
         if not html_filepath:
             return # 用戶取消選擇
 
-        # 載入類別配置
-        config_file = './category_config.json'
-        default_categories = {
-            'sp': {'name': 'SP', 'color': 'linear-gradient(135deg, #e74c3c, #c0392b)'},
-            'bd': {'name': '束縛', 'color': 'linear-gradient(135deg, #8e44ad, #9b59b6)'},
-            'bds': {'name': '繩縛', 'color': 'linear-gradient(135deg, #d2b48c, #a67c52)'},
-            'so': {'name': '交流', 'color': 'linear-gradient(135deg, #2ecc71, #27ae60)'},
-            'wk': {'name': '工作坊', 'color': 'linear-gradient(135deg, #f39c12, #e67e22)'},
-            'ss': {'name': '特殊主題', 'color': 'linear-gradient(135deg, #34495e, #2c3e50)'},
-            'hy': {'name': '催眠', 'color': 'linear-gradient(135deg, #ff8ab8, #ff5fa2)'},
-            'or': {'name': '其他', 'color': 'linear-gradient(135deg, #7f8c8d, #95a5a6)'}
-        }
-        
-        if os.path.exists(config_file):
-            try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    categories_config = json.load(f)
-            except Exception as e:
-                print(f"載入類別配置時發生錯誤: {e}")
-                traceback.print_exc()
-                categories_config = default_categories
-        else:
-            categories_config = default_categories
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(default_categories, f, ensure_ascii=False, indent=4)
+        # 載入類別配置（不存在時由設定服務建立預設類別）
+        categories_config = self.config_service.categories.get() or {}
 
         # 1. 讀取所有 JSON 檔案，並檢查未知類別
         outputs_dir = './outputs'
         all_checked_events = []
         unknown_categories = set()
 
-        for filename in os.listdir(outputs_dir):
-            if filename.endswith('_events.json'):
-                filepath = os.path.join(outputs_dir, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        events = json.load(f)
-                        for event in events:
-                            # 2. 篩選活動：check=True 且 title 非空 且未被刪除
-                            if (event.get('check', False) and 
-                                event.get('title') and 
-                                event.get('title').strip() != '.' and
-                                not event.get('delete', False)):  # 排除已刪除的活動
-                                # 檢查類別是否存在
-                                category = event.get('category', 'or')
-                                if category and category not in categories_config:
-                                    unknown_categories.add(category)
-                                all_checked_events.append(event)
-                except Exception as e:
-                    print(f"讀取檔案 {filepath} 時發生錯誤: {e}")
-                    traceback.print_exc()
+        metrics = CrawlMetrics('sync')
+        with metrics.phase('load'):
+            candidate_events = []
+            for filename in os.listdir(outputs_dir):
+                if filename.endswith('_events.json'):
+                    filepath = os.path.join(outputs_dir, filename)
+                    try:
+                        candidate_events.extend(load_event_file(filepath))
+                    except Exception as e:
+                        print(f"讀取檔案 {filepath} 時發生錯誤: {e}")
+                        traceback.print_exc()
+            # 熱資料只有本月起的活動；網站另外保留最近幾個月的歷史，只讀取這幾個月的封存分區
+            today = datetime.now(pytz.timezone('Asia/Taipei'))
+            candidate_events.extend(load_archive(outputs_dir, start=month_key(today, -SYNC_ARCHIVE_MONTHS)))
+
+            for event in candidate_events:
+                # 2. 篩選活動：check=True 且 title 非空 且未被刪除 且有日期
+                if not (event.check and event.has_title and not event.delete and event.date):
+                    continue
+                if not is_valid_date(event.date):
+                    print(f"處理日期時發生錯誤: {event.date} - 日期格式不正確")
+                    continue
+                # 檢查類別是否存在
+                if event.category and event.category not in categories_config:
+                    unknown_categories.add(event.category)
+                all_checked_events.append(event)
 
         # 處理未知類別
         if unknown_categories:
@@ -1034,8 +1511,7 @@ class EventCrawlerUI(tk.Tk):
                         'name': cat_code.upper(),
                         'color': 'linear-gradient(135deg, #95a5a6, #7f8c8d)'
                     }
-                with open(config_file, 'w', encoding='utf-8') as f:
-                    json.dump(categories_config, f, ensure_ascii=False, indent=4)
+                self.config_service.categories.save(categories_config)
                 print(f"自動生成完成: 已自動生成 {len(unknown_categories)} 個類別：{unknown_list}")
                 messagebox.showinfo("自動生成完成", f"已自動生成 {len(unknown_categories)} 個類別：{unknown_list}")
 
@@ -1044,121 +1520,28 @@ class EventCrawlerUI(tk.Tk):
             messagebox.showinfo("同步網站", "沒有找到已校正且有標題的活動。")
             return
 
-        # 3. 按年份和月份分組
-        events_by_month = {}
-        for event in all_checked_events:
-            try:
-                date_obj = datetime.strptime(event['date'], '%Y-%m-%d')
-                year_month = date_obj.strftime('%Y-%m') # 例如: '2025-08'
-                if year_month not in events_by_month:
-                    events_by_month[year_month] = []
-                events_by_month[year_month].append(event)
-            except ValueError as e:
-                print(f"處理日期時發生錯誤: {event.get('date')} - {e}")
-                traceback.print_exc()
-                continue
-
-        # 4. 將活動轉換為 index.html 中 event data 的 JavaScript 陣列格式
-        venue_to_class_map = {
-            '拘久屋': 'jukuya',
-            '玩具間': 'toyroom',
-            '更衣間': 'gengyiroom',
-            '思': 'think',
-            '動物方程式': 'zoo',
-            '其他': 'other'
-        }
-        js_event_data = {}        
-        sorted_year_months = sorted(events_by_month.keys())
-
-        for year_month in sorted_year_months:
-            events_list = events_by_month[year_month]
-            js_events = []
-            for event in events_list:
-                venue = event.get('venue', '')
-                venue_class = venue_to_class_map.get(venue, 'other')
-                # 轉換為 HTML 格式所需的鍵名
-                js_events.append({
-                    'date': datetime.strptime(event['date'], '%Y-%m-%d').day,
-                    'venue': venue,
-                    'title': event.get('title', ''),
-                    'time': f"{event.get('start_time', '')}~{event.get('end_time', '')}",
-                    'class': venue_class,
-                    'category': event.get('category', 'or'), # 確保 category 屬性被包含
-                    'link': event.get('link', None)
-                })
-            # 將月份名稱轉換為 JavaScript 變數名（例如 '2025-08' -> 'augustEvents'）
-            month_name_abbr = datetime.strptime(year_month, '%Y-%m').strftime('%B').lower() # 'august'
-            js_event_data[f"{month_name_abbr}Events"] = json.dumps(js_events, ensure_ascii=False, indent=4)
-
-        # 5. 更新 index.html
+        # 3. 依年份和月份產生 HTML 中的活動資料
         # html_filepath 已由 filedialog 獲取
         try:
             with open(html_filepath, 'r', encoding='utf-8') as f:
                 html_content = f.read()
 
-            updated_html_content = html_content
-            
-            # 首先，動態生成所有月份變數的宣告，確保涵蓋所有存在的月份
-            all_dynamic_month_vars_declarations = []
-            
-            # 獲取所有有活動的月份
-            all_month_names = sorted(list(set(datetime.strptime(ym, '%Y-%m').strftime('%B').lower() for ym in events_by_month.keys()))) if events_by_month else []
-            
-            # 確保 HTML 中硬編碼引用的月份都有變數聲明（即使沒有活動也要聲明為空陣列）
-            required_months = ['august', 'september', 'october', 'november', 'december']
-            all_months_to_generate = sorted(list(set(all_month_names + required_months)), 
-                                           key=lambda m: ['january', 'february', 'march', 'april', 'may', 'june', 
-                                                         'july', 'august', 'september', 'october', 'november', 'december'].index(m))
-            
-            for month_abbr in all_months_to_generate:
-                month_var = f"{month_abbr}Events"
-                js_array_str = js_event_data.get(month_var, '[]')
-                # 確保這裡的年份是正確的，因為 HTML 中的 generateMonthData 預設為 2025
-                # 為了兼容性，這裡暫時不考慮動態年份的 JS 變數名，只處理數據
-                # 使用 var 而不是 const，讓變數成為 window 的屬性以便動態掃描
-                all_dynamic_month_vars_declarations.append(f"var {month_var} = {js_array_str};")
-            
-            # 找到現有月份變數的宣告區塊，進行替換
-            # 這個正則表達式會匹配所有 "const [month]Events = [...];" 的行
-            # 並替換為動態生成的月份變數宣告
-            pattern_all_month_vars = r"// EVENT_DATA_START[\s\S]*?// EVENT_DATA_END"
-            replacement_block = "// EVENT_DATA_START\n        " + '\n        '.join(all_dynamic_month_vars_declarations) + "\n        // EVENT_DATA_END"
-            
-            if re.search(pattern_all_month_vars, updated_html_content):
-                updated_html_content = re.sub(pattern_all_month_vars, replacement_block, updated_html_content, flags=re.DOTALL)
-            else:
+            with metrics.phase('render'):
+                updated_html_content = render_website_html(html_content, all_checked_events, categories_config)
+            if updated_html_content is None:
                 # 如果找不到標記，可以考慮報錯或使用舊的替換邏輯作為備用
                 print("同步警告: 在 HTML 檔案中找不到 // EVENT_DATA_START 和 // EVENT_DATA_END 標記。")
                 messagebox.showwarning("同步警告", "在 HTML 檔案中找不到 // EVENT_DATA_START 和 // EVENT_DATA_END 標記。")
                 return
-
-            # 同步類別定義到 HTML
-            # 生成 categoryNames JavaScript 物件
-            category_names_js = "const categoryNames = {\n"
-            for code in sorted(categories_config.keys()):
-                info = categories_config[code]
-                category_names_js += f"            {code}: '{info['name']}',\n"
-            category_names_js += "        };"
-            
-            # 生成 categoryColors JavaScript 物件
-            category_colors_js = "const categoryColors = {\n"
-            for code in sorted(categories_config.keys()):
-                info = categories_config[code]
-                category_colors_js += f"            {code}: '{info['color']}',\n"
-            category_colors_js += "        };"
-            
-            # 替換 categoryNames
-            pattern_category_names = r"const categoryNames = \{[^\}]*\};"
-            if re.search(pattern_category_names, updated_html_content):
-                updated_html_content = re.sub(pattern_category_names, category_names_js, updated_html_content, flags=re.DOTALL)
             
-            # 替換 categoryColors
-            pattern_category_colors = r"const categoryColors = \{[^\}]*\};"
-            if re.search(pattern_category_colors, updated_html_content):
-                updated_html_content = re.sub(pattern_category_colors, category_colors_js, updated_html_content, flags=re.DOTALL)
-            
-            with open(html_filepath, 'w', encoding='utf-8') as f:
-                f.write(updated_html_content)
+            with metrics.phase('write'):
+                with open(html_filepath, 'w', encoding='utf-8') as f:
+                    f.write(updated_html_content)
+                    bytes_written = f.tell()
+            metrics.count('events_synced', len(all_checked_events))
+            metrics.count('bytes_written', bytes_written)
+            metrics.finish()
+            print(metrics.summary())
 
             success_message = f"✅ 同步完成！\n\n• 活動數量：{len(all_checked_events)}\n• 類別數量：{len(categories_config)}"
             print(f"同步網站成功: {success_message.replace('✅ ', '').replace('\\n', ' ')}")
@@ -1166,6 +1549,7 @@ class EventCrawlerUI(tk.Tk):
 
         except Exception as e:
             error_message = f"更新 {html_filepath} 時發生錯誤: {e}"
+            metrics.finish(e)
             print(f"同步網站錯誤: {error_message}")
             messagebox.showerror("同步網站錯誤", error_message)
             print(f"更新 {html_filepath} 錯誤: {e}")
@@ -1246,45 +1630,34 @@ class EventCrawlerUI(tk.Tk):
                         print(f"事件缺少日期，跳過記錄: {event}")
                         continue
 
-                    formatted_date = f"{year}-{month_num:02d}-{date_day:02d}"
-
+                    event_obj = Event(
+                        date=f"{year}-{month_num:02d}-{date_day:02d}",
+                        check=True, # 從 HTML 導入的活動直接設為 True，視為已校正
+                        venue=venue,
+                        start_time=start_time,
+                        end_time=end_time,
+                        link=link,
+                        title=title,
+                        delete=False,
+                        category=category
+                    ).normalize()
                     # 構造 text 字段，用於保持與現有 json 格式的兼容性
-                    text = f"{venue} - {title}"
-                    if start_time and end_time:
-                        text += f" {start_time}~{end_time}"
-                    
-                    all_html_events.append({
-                        'date': formatted_date,
-                        'text': text,
-                        'check': True, # 從 HTML 導入的活動直接設為 True，視為已校正
-                        'venue': venue,
-                        'start_time': start_time,
-                        'end_time': end_time,
-                        'link': link,
-                        'title': title,
-                        'brief_description': '', # HTML 中沒有此字段，預設為空
-                        'delete': False,
-                        'category': category # 新增 category 屬性
-                    })
+                    event_obj.text = event_obj.build_text()
+                    all_html_events.append(event_obj)
 
             # 按場地分組事件
             events_by_venue = {}
             for event in all_html_events:
-                venue = event.get('venue')
-                if venue:
-                    if venue not in events_by_venue:
-                        events_by_venue[venue] = []
-                    events_by_venue[venue].append(event)
+                if event.venue:
+                    events_by_venue.setdefault(event.venue, []).append(event)
             
             # 將每個場地的活動寫入各自的檔案，覆蓋原有內容
             output_dir = './outputs'
-            os.makedirs(output_dir, exist_ok=True)
             venues_imported_count = 0
             for venue, events_list in events_by_venue.items():
                 output_filepath = os.path.join(output_dir, f"{venue}_events.json")
                 try:
-                    with open(output_filepath, 'w', encoding='utf-8') as f:
-                        json.dump(events_list, f, ensure_ascii=False, indent=4)
+                    save_event_file(output_filepath, events_list)
                     venues_imported_count += 1
                 except Exception as e:
                     print(f"寫入檔案 {output_filepath} 時發生錯誤: {e}")
@@ -1365,63 +1738,51 @@ class EventCrawlerUI(tk.Tk):
         main_frame.grid_columnconfigure(1, weight=1)
 
     def _save_new_event(self, popup, form_widgets):
-        new_event_data = {
-            'date': form_widgets['date'].get().strip(),
-            'venue': form_widgets['venue'].get().strip(),
-            'title': form_widgets['title'].get().strip(),
-            'start_time': form_widgets['start_time'].get().strip(),
-            'end_time': form_widgets['end_time'].get().strip(),
-            'link': form_widgets['link'].get().strip() or None,
-            'category': form_widgets['category'].get().strip() or 'or',
-            'check': True, # 手動增加的預設為已校正
-            'brief_description': '',
-            'delete': False
-        }
-
-        # 驗證日期格式
-        if not new_event_data['date']:
+        new_event = Event(
+            date=form_widgets['date'].get(),
+            venue=form_widgets['venue'].get(),
+            title=form_widgets['title'].get(),
+            start_time=form_widgets['start_time'].get(),
+            end_time=form_widgets['end_time'].get(),
+            link=form_widgets['link'].get(),
+            category=form_widgets['category'].get() or 'or',
+            check=True, # 手動增加的預設為已校正
+            delete=False
+        ).normalize()
+
+        # 驗證日期格式與場地
+        if not new_event.date:
             print("輸入錯誤: 日期不能為空。")
             messagebox.showwarning("輸入錯誤", "日期不能為空。")
             return
         try:
-            datetime.strptime(new_event_data['date'], '%Y-%m-%d')
-        except ValueError:
-            print("輸入錯誤: 日期格式不正確。請使用 YYYY-MM-DD 格式。")
-            messagebox.showwarning("輸入錯誤", "日期格式不正確。請使用 YYYY-MM-DD 格式。")
-            return
-
-        # 驗證場地
-        if not new_event_data['venue']:
-            print("輸入錯誤: 場地不能為空。")
-            messagebox.showwarning("輸入錯誤", "場地不能為空。")
+            new_event.validate()
+        except EventValidationError as e:
+            print(f"輸入錯誤: {e}")
+            messagebox.showwarning("輸入錯誤", str(e))
             return
 
         # 構造 text 字段，用於保持與現有 json 格式的兼容性
-        text = f"{new_event_data['venue']} - {new_event_data['title']}"
-        if new_event_data['start_time'] and new_event_data['end_time']:
-            text += f" {new_event_data['start_time']}~{new_event_data['end_time']}"
-        new_event_data['text'] = text
+        new_event.text = new_event.build_text()
 
-        filepath = os.path.join('./outputs', f"{new_event_data['venue']}_events.json")
+        filepath = os.path.join('./outputs', f"{new_event.venue}_events.json")
+        new_event.source_file = filepath
         
         try:
-            existing_events = []
-            if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    existing_events = json.load(f)
+            with file_lock(filepath):
+                existing_events = load_event_file(filepath, venue=new_event.venue)
+                existing_events.append(new_event)
+                self._commit_event_file(filepath, existing_events)
             
-            # 保存到文件时不包含 source_file（这是运行时字段）
-            event_to_save = {k: v for k, v in new_event_data.items() if k != 'source_file'}
-            existing_events.append(event_to_save)
-
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(existing_events, f, ensure_ascii=False, indent=4)
-            
-            info_message = f"活動已成功添加到 {new_event_data['venue']}。"
+            info_message = f"活動已成功添加到 {new_event.venue}。"
             print(f"保存成功: {info_message}")
             messagebox.showinfo("保存成功", info_message)
             popup.destroy()
-            self._load_events_and_display() # 重新整理 UI
+            if new_event.venue in self.venue_treeviews:
+                self.event_index.add(new_event)
+                self._refresh_venue_tree(new_event.venue)
+            else:
+                self._load_events_and_display() # 新場地需要建立分頁
 
         except Exception as e:
             error_message = f"保存活動時發生錯誤: {e}"
@@ -1462,37 +1823,19 @@ class EventCrawlerUI(tk.Tk):
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # 載入類別定義
+        # 類別定義由設定服務快取，只在檔案改變時重新讀取
         def load_categories():
-            config_file = './category_config.json'
-            default_categories = {
-                'sp': {'name': 'SP', 'color': 'linear-gradient(135deg, #e74c3c, #c0392b)'},
-                'bd': {'name': '束縛', 'color': 'linear-gradient(135deg, #8e44ad, #9b59b6)'},
-                'bds': {'name': '繩縛', 'color': 'linear-gradient(135deg, #d2b48c, #a67c52)'},
-                'so': {'name': '交流', 'color': 'linear-gradient(135deg, #2ecc71, #27ae60)'},
-                'wk': {'name': '工作坊', 'color': 'linear-gradient(135deg, #f39c12, #e67e22)'},
-                'ss': {'name': '特殊主題', 'color': 'linear-gradient(135deg, #34495e, #2c3e50)'},
-                'hy': {'name': '催眠', 'color': 'linear-gradient(135deg, #ff8ab8, #ff5fa2)'},
-                'or': {'name': '其他', 'color': 'linear-gradient(135deg, #7f8c8d, #95a5a6)'}
-            }
-            
-            if os.path.exists(config_file):
-                try:
-                    with open(config_file, 'r', encoding='utf-8') as f:
-                        return json.load(f)
-                except Exception as e:
-                    print(f"載入類別配置時發生錯誤: {e}")
-                    traceback.print_exc()
-            
-            # 創建預設配置
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(default_categories, f, ensure_ascii=False, indent=4)
-            return default_categories
+            return self.config_service.categories.get() or {}
         
         def save_categories(categories):
-            config_file = './category_config.json'
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(categories, f, ensure_ascii=False, indent=4)
+            """驗證並寫入類別，格式不正確時提示並回傳 False"""
+            try:
+                self.config_service.categories.save(categories)
+            except ConfigValidationError as e:
+                print(f"輸入錯誤: {e}")
+                messagebox.showwarning("輸入錯誤", str(e), parent=popup)
+                return False
+            return True
         
         def refresh_tree():
             for item in tree.get_children():
@@ -1551,7 +1894,8 @@ class EventCrawlerUI(tk.Tk):
                 # 組合成漸變色
                 color_gradient = f"linear-gradient(135deg, {color1}, {color2})"
                 categories[code] = {'name': name, 'color': color_gradient}
-                save_categories(categories)
+                if not save_categories(categories):
+                    return
                 refresh_tree()
                 add_popup.destroy()
                 print(f"成功: 已新增類別 '{code}'")
@@ -1626,7 +1970,8 @@ class EventCrawlerUI(tk.Tk):
                 # 組合成漸變色
                 color_gradient = f"linear-gradient(135deg, {color1}, {color2})"
                 categories[code] = {'name': name, 'color': color_gradient}
-                save_categories(categories)
+                if not save_categories(categories):
+                    return
                 refresh_tree()
                 edit_popup.destroy()
                 print(f"成功: 已更新類別 '{code}'")
@@ -1649,7 +1994,8 @@ class EventCrawlerUI(tk.Tk):
                 categories = load_categories()
                 if code in categories:
                     del categories[code]
-                    save_categories(categories)
+                    if not save_categories(categories):
+                        return
                     refresh_tree()
                     print(f"成功: 已刪除類別 '{code}'")
                     messagebox.showinfo("成功", f"已刪除類別 '{code}'")
@@ -1658,6 +2004,8 @@ class EventCrawlerUI(tk.Tk):
         tree.bind('<Double-1>', lambda e: edit_category())
         
         refresh_tree()
+        # 類別在其他地方被修改（例如同步網站時自動生成、外部編輯檔案）時更新清單
+        self._subscribe_config(self.config_service.categories, refresh_tree, widget=popup)
         
         # 按鈕區
         button_frame = ttk.Frame(main_frame)
@@ -1698,22 +2046,18 @@ class EventCrawlerUI(tk.Tk):
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-        config_path = 'user_config.json'
-
         def load_users():
-            if not os.path.exists(config_path):
-                return []
-            try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError) as e:
-                print(f"Error loading user config: {e}")
-                traceback.print_exc()
-                return []
+            return self.config_service.users.get() or []
 
         def save_users(users):
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(users, f, ensure_ascii=False, indent=4)
+            """驗證並寫入帳號，格式不正確時提示並回傳 False"""
+            try:
+                self.config_service.users.save(users)
+            except ConfigValidationError as e:
+                print(f"輸入錯誤: {e}")
+                messagebox.showwarning("輸入錯誤", str(e), parent=popup)
+                return False
+            return True
 
         def refresh_tree():
             for item in tree.get_children():
@@ -1757,7 +2101,8 @@ class EventCrawlerUI(tk.Tk):
                     return
                 
                 users.append({'user_id': user_id, 'name': name})
-                save_users(users)
+                if not save_users(users):
+                    return
                 refresh_tree()
                 add_popup.destroy()
                 print(f"成功: 已新增帳號 '{user_id}'")
@@ -1815,7 +2160,8 @@ class EventCrawlerUI(tk.Tk):
                         users[i] = {'user_id': new_user_id, 'name': new_name}
                         break
                 
-                save_users(users)
+                if not save_users(users):
+                    return
                 refresh_tree()
                 edit_popup.destroy()
                 print(f"成功: 已更新帳號 '{new_user_id}'")
@@ -1837,7 +2183,8 @@ class EventCrawlerUI(tk.Tk):
             if messagebox.askyesno("確認刪除", confirm_message):
                 users = load_users()
                 users = [user for user in users if user['user_id'] != user_id]
-                save_users(users)
+                if not save_users(users):
+                    return
                 refresh_tree()
                 print(f"成功: 已刪除帳號 '{user_id}'")
                 messagebox.showinfo("成功", f"已刪除帳號 '{user_id}'")
@@ -1845,6 +2192,7 @@ class EventCrawlerUI(tk.Tk):
         tree.bind('<Double-1>', lambda e: edit_user())
         
         refresh_tree()
+        self._subscribe_config(self.config_service.users, refresh_tree, widget=popup)
         
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill=tk.X, pady=10)
@@ -1864,21 +2212,8 @@ class EventCrawlerUI(tk.Tk):
 
         ttk.Label(main_frame, text="選擇風格主題", font=('Arial', 14, 'bold')).pack(pady=10)
 
-        # 掃描 style_config 目錄
-        style_dir = './style_config'
-        styles = {}
-        if os.path.isdir(style_dir):
-            for filename in os.listdir(style_dir):
-                if filename.endswith('.json'):
-                    filepath = os.path.join(style_dir, filename)
-                    try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            style_data = json.load(f)
-                            if 'name' in style_data:
-                                styles[style_data['name']] = filepath
-                    except Exception as e:
-                        print(f"無法載入風格檔案 {filename}: {e}")
-                        traceback.print_exc()
+        # style_config 目錄由設定服務快取，只重新讀取有變動的目錄內容
+        styles = self.config_service.styles.get() or {}
         
         if not styles:
             ttk.Label(main_frame, text="在 style_config 資料夾中找不到任何風格設定檔。").pack(pady=20)
@@ -1897,6 +2232,15 @@ class EventCrawlerUI(tk.Tk):
         if styles:
             style_menu.set(list(styles.keys())[0])
 
+        def refresh_styles():
+            # style_config 中新增或修改了風格檔案時更新選單，已選的風格仍存在就保留
+            names = list((self.config_service.styles.get() or {}).keys())
+            style_menu.config(values=names)
+            if selected_style.get() not in names:
+                style_menu.set(names[0] if names else '')
+
+        self._subscribe_config(self.config_service.styles, refresh_styles, widget=popup)
+
         def _generate_css_from_style_data(style_data):
             """從風格資料產生 CSS 字串"""
             css_map = {
@@ -1947,9 +2291,10 @@ class EventCrawlerUI(tk.Tk):
                 return
 
             try:
-                style_filepath = styles[style_name]
-                with open(style_filepath, 'r', encoding='utf-8') as f:
-                    style_data = json.load(f)
+                current_styles = self.config_service.styles.get() or {}
+                if style_name not in current_styles:
+                    raise ValueError(f"找不到風格 '{style_name}'，風格檔案可能已被移除。")
+                style_data = current_styles[style_name][1]
 
                 # 在終端機中印出風格資料以供除錯
                 print("--- [DEBUG] Style Data ---")
@@ -2024,9 +2369,9 @@ class EventCrawlerUI(tk.Tk):
     def on_closing(self):
         self.stop_crawler()
         self.asyncio_thread.stop()
-        # 關閉 XCrawler 實例
-        if hasattr(self, 'crawler') and self.crawler:
-            self.crawler.close()
+        # 關閉爬蟲子行程（連同瀏覽器）
+        if hasattr(self, 'crawl_worker'):
+            self.crawl_worker.stop()
         self.destroy()
 
 if __name__ == "__main__":
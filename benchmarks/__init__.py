@@ -0,0 +1,3 @@
+"""
+效能測試套件，執行方式請見 run_benchmarks.py
+"""
@@ -0,0 +1,89 @@
+"""
+批次操作的選取範圍檢查
+
+以暫存目錄中的合成活動檔確認 apply_to_events 只修改指定的活動：固定舉辦的活動每次的
+text 相同，處理近似重複時保留一場、刪除另一場，不可連其他日期的同名活動一起修改。
+另外確認 DuplicateIndex 不會把不同日期的同名活動併成一筆或放進同一個群組。
+
+用法（在專案根目錄執行）:
+    python -m benchmarks.check_batch_selection
+
+有任何檢查不符合時以非零狀態碼結束。
+"""
+
+import os
+import sys
+import tempfile
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_batch import apply_to_events
+from event_dedup import DuplicateIndex, event_key
+from event_model import Event, load_event_file, save_event_files
+
+RECURRING_TEXT = '拘久屋 - 玩耍家常日 19:00~22:00'
+
+
+def _event(date, text=RECURRING_TEXT):
+    return Event(date=date, text=text, venue='拘久屋', title='玩耍家常日',
+                 start_time='19:00', end_time='22:00')
+
+
+def check_same_text_different_dates():
+    """兩場同 text、不同日期的活動，只刪除指定的那一場"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, '拘久屋_events.json')
+        save_event_files({path: [_event('2025-09-05'), _event('2025-09-12'), _event('2025-09-12', '拘久屋 - 其他活動')]})
+        target = next(event for event in load_event_file(path) if event.date == '2025-09-12' and event.text == RECURRING_TEXT)
+
+        result = apply_to_events([target], 'delete')
+        deleted = [(event.date, event.text) for event in load_event_file(path) if event.delete]
+
+    errors = []
+    if result.changed != 1:
+        errors.append(f"修改了 {result.changed} 個活動，預期 1 個")
+    if deleted != [('2025-09-12', RECURRING_TEXT)]:
+        errors.append(f"被刪除的活動 {deleted}，預期只有 2025-09-12 的 {RECURRING_TEXT}")
+    return errors
+
+
+def check_recurring_not_clustered():
+    """每週同名的活動各自收錄，只有同一天的近似活動才成為重複群組"""
+    events = [_event('2025-09-01'), _event('2025-09-08'), _event('2025-09-08', '拘久屋 - 玩耍家常日 19:00~22:00 最後名額')]
+    index = DuplicateIndex(events)
+
+    errors = []
+    if len(index) != len(events):
+        errors.append(f"收錄了 {len(index)} 個活動，預期 {len(events)} 個")
+    clusters = [sorted(event.date for event in cluster) for cluster in index.clusters()]
+    if clusters != [['2025-09-08', '2025-09-08']]:
+        errors.append(f"重複群組的日期 {clusters}，預期只有 2025-09-08 的一組")
+    if event_key(events[0]) == event_key(events[1]):
+        errors.append("不同日期的同名活動 event_key 相同")
+    return errors
+
+
+def main():
+    checks = [
+        ('同 text、不同日期的活動只修改指定的一場', check_same_text_different_dates),
+        ('不同日期的同名活動不會被當成重複', check_recurring_not_clustered),
+    ]
+
+    failed = 0
+    for name, check in checks:
+        errors = check()
+        if errors:
+            failed += 1
+            print(f"❌ {name}")
+            for error in errors:
+                print(f"  {error}")
+        else:
+            print(f"✅ {name}")
+
+    print(f"\n{len(checks) - failed}/{len(checks)} 項通過")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
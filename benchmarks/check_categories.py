@@ -0,0 +1,74 @@
+"""
+自動分類的回歸檢查
+
+golden_categories.json 中每筆案例為 {"title", "previous", "expected", "note"}：
+    title     outputs/ 中出現過的活動標題（另有少數手動加入的案例）
+    previous  改用 category_rules.json 之前、SB 爬蟲內建的 if/elif 分類結果
+    expected  目前應得到的類別；與 previous 不同時以 note 說明是刻意的修正
+
+以 SB 爬蟲相同的方式分類（沒有符合的規則時為 'so'），分別檢查 config_service 的
+DEFAULT_CATEGORY_RULES 與專案中的 category_rules.json，兩者的結果都必須符合 expected。
+
+用法（在專案根目錄執行）:
+    python -m benchmarks.check_categories
+    python -m benchmarks.check_categories --rules path/to/category_rules.json
+
+有任何案例不符合時以非零狀態碼結束。
+"""
+
+import argparse
+import json
+import os
+import sys
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_service import CATEGORY_RULES_FILE, DEFAULT_CATEGORY_RULES, validate_category_rules
+from event_categorizer import CategoryMatcher
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden_categories.json')
+# 與 SBCrawler._categorize_event 相同：沒有符合的規則時歸為交流
+DEFAULT_CATEGORY = 'so'
+
+
+def check_rules(name, rules, cases):
+    """回傳不符合的案例數"""
+    matcher = CategoryMatcher(rules)
+    failed = 0
+    for case in cases:
+        actual = matcher.match(case['title'], DEFAULT_CATEGORY)
+        if actual != case['expected']:
+            failed += 1
+            print(f"❌ [{name}] {case['title']!r}: {actual}，預期 {case['expected']}（舊版 {case['previous']}）")
+    print(f"{'✅' if not failed else '❌'} {name}: {len(cases) - failed}/{len(cases)} 筆符合")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='自動分類的回歸檢查')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='語料檔路徑')
+    parser.add_argument('--rules', default=CATEGORY_RULES_FILE, help='要一併檢查的 category_rules.json')
+    args = parser.parse_args()
+
+    with open(args.corpus, 'r', encoding='utf-8') as f:
+        cases = json.load(f)
+
+    changed = [case for case in cases if case['expected'] != case['previous']]
+    print(f"共 {len(cases)} 筆，其中 {len(changed)} 筆刻意與舊版分類不同：")
+    for case in changed:
+        print(f"  {case['title']!r}: {case['previous']} → {case['expected']}（{case.get('note', '')}）")
+    print()
+
+    failed = check_rules('DEFAULT_CATEGORY_RULES', DEFAULT_CATEGORY_RULES, cases)
+    if os.path.exists(args.rules):
+        with open(args.rules, 'r', encoding='utf-8') as f:
+            failed += check_rules(args.rules, validate_category_rules(json.load(f)), cases)
+    else:
+        print(f"⚠️ 找不到 {args.rules}，只檢查 DEFAULT_CATEGORY_RULES")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
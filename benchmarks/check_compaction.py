@@ -0,0 +1,112 @@
+"""
+活動封存的筆數檢查
+
+將 outputs/ 複製到暫存目錄後執行 compact_outputs，比較整理前後「熱資料 + 冷資料分區」
+的活動總數：整理只會搬移活動，任何活動遺失或重複都算失敗。另外以一組合成資料檢查
+固定舉辦、text 相同但日期不同的活動，以及重新爬到已封存活動時的取代行為。
+
+用法（在專案根目錄執行）:
+    python -m benchmarks.check_compaction
+    python -m benchmarks.check_compaction --outputs path/to/outputs
+
+有任何檢查不符合時以非零狀態碼結束。
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_archive import compact_outputs, load_archive
+from event_model import Event, load_event_file, save_event_files
+
+# 合成資料的「今天」：2025-09 之前的活動都會被封存
+SYNTHETIC_TODAY = datetime(2025, 9, 15)
+
+
+def count_events(outputs_dir):
+    """回傳 (熱資料活動數, 冷資料活動數)"""
+    hot = 0
+    for filename in os.listdir(outputs_dir):
+        if filename.endswith('_events.json'):
+            hot += len(load_event_file(os.path.join(outputs_dir, filename)))
+    return hot, len(load_archive(outputs_dir, include_deleted=True))
+
+
+def check_outputs(outputs_dir):
+    """整理 outputs 的複本，回傳錯誤訊息列表"""
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = os.path.join(tmp, 'outputs')
+        shutil.copytree(outputs_dir, copy)
+        before = count_events(copy)
+        moved = compact_outputs(copy)
+        after = count_events(copy)
+    print(f"  整理前 熱資料 {before[0]} / 冷資料 {before[1]}，"
+          f"移動 {sum(moved.values())} 筆，整理後 熱資料 {after[0]} / 冷資料 {after[1]}")
+    if sum(after) != sum(before):
+        return [f"活動總數 {sum(before)} → {sum(after)}"]
+    return []
+
+
+def _event(date, text='拘久屋 - 玩耍家常日 19:00~22:00', **kwargs):
+    return Event(date=date, text=text, venue='拘久屋', title='玩耍家常日',
+                 start_time='19:00', end_time='22:00', **kwargs)
+
+
+def check_recurring_events():
+    """同月份多次舉辦的同名活動都要保留；已封存的同一場活動以熱資料版本取代"""
+    errors = []
+    with tempfile.TemporaryDirectory() as tmp:
+        hot_path = os.path.join(tmp, '拘久屋_events.json')
+        save_event_files({hot_path: [
+            _event('2025-08-01'), _event('2025-08-08'), _event('2025-08-15'),
+        ]})
+        compact_outputs(tmp, today=SYNTHETIC_TODAY)
+
+        # 封存後同一場活動被重新爬到並勾選，再整理一次
+        save_event_files({hot_path: [_event('2025-08-08', check=True), _event('2025-08-22')]})
+        compact_outputs(tmp, today=SYNTHETIC_TODAY)
+
+        archived = load_archive(tmp, include_deleted=True)
+        dates = sorted(event.date for event in archived)
+        expected = ['2025-08-01', '2025-08-08', '2025-08-15', '2025-08-22']
+        if dates != expected:
+            errors.append(f"封存的日期 {dates}，預期 {expected}")
+        if not any(event.date == '2025-08-08' and event.check for event in archived):
+            errors.append("重新爬到的 2025-08-08 沒有取代分區中的舊版本")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='活動封存的筆數檢查')
+    parser.add_argument('--outputs', default='./outputs', help='outputs 目錄（只讀取，整理在複本上進行）')
+    args = parser.parse_args()
+
+    checks = [('同名的固定活動', check_recurring_events)]
+    if os.path.isdir(args.outputs):
+        checks.append((f'整理 {args.outputs} 前後的活動數', lambda: check_outputs(args.outputs)))
+    else:
+        print(f"⚠️ 找不到 {args.outputs}，只執行合成資料的檢查")
+
+    failed = 0
+    for name, check in checks:
+        errors = check()
+        if errors:
+            failed += 1
+            print(f"❌ {name}")
+            for error in errors:
+                print(f"  {error}")
+        else:
+            print(f"✅ {name}")
+
+    print(f"\n{len(checks) - failed}/{len(checks)} 項通過")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+推文文字擷取與日期解析的黃金語料檢查
+
+golden_tweets.json 中每筆案例為下列其中一種：
+    {"name", "item": {"header", "text", "full"}, "expected", "structured"}
+        頁內擷取腳本的一筆結果，以 tweet_text_from_item 取得文字（tweetText 節點或備援清理）
+    {"name", "full_text", "expected"}
+        <article> 的整段文字，以備援的 clean_tweet_text 清理
+    {"name", "tweet_text", "today", "expected_date"}
+        清理後的推文內文，以 process_tweet_to_event 轉為活動；today 為 YYYY-MM-DD，
+        expected_date 為活動日期，沒有有效日期（例如 2/30）時為 null，且不可拋出例外
+
+用法（在專案根目錄執行，不需要瀏覽器）:
+    python -m benchmarks.check_tweet_text
+    python -m benchmarks.check_tweet_text --corpus path/to/recorded_cases.json
+
+有任何案例不符合時以非零狀態碼結束。
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+import pytz
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tweet_parser import process_tweet_to_event
+from UCanScrapeX.seleniumbase_crawler import clean_tweet_text, tweet_text_from_item
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden_tweets.json')
+
+
+def check_case(case):
+    """回傳錯誤訊息列表，符合時為空列表"""
+    errors = []
+    if 'tweet_text' in case:
+        today = pytz.timezone('Asia/Taipei').localize(datetime.strptime(case['today'], '%Y-%m-%d'))
+        try:
+            event = process_tweet_to_event({'text': case['tweet_text'], 'tweet_url': None}, 'check', today)
+        except Exception as e:
+            return [f"拋出例外 {type(e).__name__}: {e}"]
+        date = event.date if event else None
+        if date != case['expected_date']:
+            errors.append(f"日期 {date!r}，預期 {case['expected_date']!r}")
+        return errors
+    if 'item' in case:
+        text, structured = tweet_text_from_item(case['item'])
+        if structured != case.get('structured', True):
+            errors.append(f"structured={structured}，預期 {case.get('structured', True)}")
+    else:
+        text = clean_tweet_text(case['full_text'])
+    if text != case['expected']:
+        errors.append(f"文字不符\n  實際: {text!r}\n  預期: {case['expected']!r}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='推文文字擷取與日期解析的黃金語料檢查')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='語料檔路徑')
+    args = parser.parse_args()
+
+    with open(args.corpus, 'r', encoding='utf-8') as f:
+        cases = json.load(f)
+
+    failed = 0
+    for case in cases:
+        errors = check_case(case)
+        if errors:
+            failed += 1
+            print(f"❌ {case['name']}")
+            for error in errors:
+                print(f"  {error}")
+        else:
+            print(f"✅ {case['name']}")
+
+    print(f"\n{len(cases) - failed}/{len(cases)} 筆通過")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+爬蟲子行程取消要求的檢查
+
+「停止爬蟲」在定時爬蟲等待下一個排程時也會呼叫 CrawlWorkerClient.cancel()；子行程閒置時
+留下的取消要求會讓下一次手動執行在第一次檢查時就被取消。這裡確認：
+
+- 子行程閒置時 cancel() 不設定取消事件
+- 沒有進行中的工作時，submit() 會清除之前留下的取消事件
+- 有工作進行中時 cancel() 照常設定取消事件，之後排隊的工作不會清除它
+
+不需要瀏覽器：以一個只會等待的子行程代替爬蟲子行程，工作只放進指令佇列、不會被執行。
+
+用法（在專案根目錄執行）:
+    python -m benchmarks.check_worker_cancel
+
+有任何檢查不符合時以非零狀態碼結束。
+"""
+
+import os
+import sys
+import time
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawl_worker import CrawlWorkerClient
+
+
+def _idle_client():
+    """子行程只等待、不讀取指令佇列的 CrawlWorkerClient"""
+    client = CrawlWorkerClient()
+    client.command_queue = client._ctx.Queue()
+    client.cancel_event = client._ctx.Event()
+    client.process = client._ctx.Process(target=time.sleep, args=(60,), daemon=True)
+    client.process.start()
+    return client
+
+
+def check_cancel_while_idle():
+    errors = []
+    client = _idle_client()
+    try:
+        client.cancel()
+        if client.cancel_event.is_set():
+            errors.append("子行程閒置時 cancel() 設定了取消事件")
+
+        # 工作剛結束時送出的取消要求（cancel() 檢查完之後工作才結束）
+        client.cancel_event.set()
+        first = client.submit('crawl')
+        if client.cancel_event.is_set():
+            errors.append("submit() 沒有清除閒置時留下的取消事件")
+
+        client.cancel()
+        if not client.cancel_event.is_set():
+            errors.append("有工作進行中時 cancel() 沒有設定取消事件")
+        client.submit('crawl')
+        if not client.cancel_event.is_set():
+            errors.append("工作進行中時 submit() 清除了取消事件")
+
+        client._finish_job(first, {'type': 'job_finished', 'job_id': first})
+        if not client._pending_jobs():
+            errors.append("排隊中的工作沒有被視為進行中")
+    finally:
+        client.process.terminate()
+        client.process.join(10)
+    return errors
+
+
+def main():
+    checks = [('閒置時取消後再送出工作', check_cancel_while_idle)]
+
+    failed = 0
+    for name, check in checks:
+        errors = check()
+        if errors:
+            failed += 1
+            print(f"❌ {name}")
+            for error in errors:
+                print(f"  {error}")
+        else:
+            print(f"✅ {name}")
+
+    print(f"\n{len(checks) - failed}/{len(checks)} 項通過")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""
+離線重播用的本機 fixture 伺服器
+
+模擬兩種頁面，讓 XCrawler 與 SBCrawler 不連網也能執行完整的抓取流程：
+
+- `/<username>`：個人頁時間軸。第一批推文直接輸出，往下捲動到接近底部時，
+  頁面 JS 會向 `/<username>/batch/<n>` 取得下一批並附加，模擬無限捲動。
+- `/sb/calendar`：SB玩具間活動日曆（手機版排版）。
+
+fixture 目錄格式:
+    x/<username>/batch_000.json   推文列表，每筆為
+                                   {"id", "datetime", "author", "handle", "lines", "pinned", "retweet", "stats"}
+    sb/calendar.html              日曆頁面（可直接存下真實頁面）
+
+沒有錄製的資料時，可用 write_synthetic_fixtures() 以合成資料建立。
+"""
+
+import glob
+import html
+import json
+import os
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks import synthetic
+
+_TIMELINE_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{username} / X</title>
+<style>article {{ display: block; min-height: 320px; border-bottom: 1px solid #ccc; }}</style>
+</head><body>
+<main id="timeline">{articles}</main>
+<script>
+(function () {{
+    var nextBatch = 1, loading = false, done = false;
+    window.addEventListener('scroll', function () {{
+        if (loading || done) return;
+        if (window.innerHeight + window.scrollY < document.body.scrollHeight - 1200) return;
+        loading = true;
+        fetch('/{username}/batch/' + nextBatch).then(function (resp) {{
+            if (resp.status !== 200) {{ done = true; return ''; }}
+            return resp.text();
+        }}).then(function (fragment) {{
+            if (fragment) {{
+                document.getElementById('timeline').insertAdjacentHTML('beforeend', fragment);
+                nextBatch += 1;
+            }}
+            loading = false;
+        }});
+    }});
+}})();
+</script>
+</body></html>
+"""
+
+_SIMPLE_PAGE = '<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title></head><body>{body}</body></html>'
+
+
+def render_article(username, tweet):
+    """將一筆推文 fixture 轉為 <article data-testid="tweet">，.text 的行序與 X 相同"""
+    lines = []
+    if tweet.get('pinned'):
+        lines.append('<div>Pinned</div>')
+    if tweet.get('retweet'):
+        lines.append(f"<div>{html.escape(tweet.get('author', username))} reposted</div>")
+    status_url = f"/{username}/status/{tweet['id']}"
+    lines.append(f"<div>{html.escape(tweet.get('author', username))}</div>")
+    lines.append(f"<div>@{html.escape(tweet.get('handle', username))}</div>")
+    lines.append('<div>·</div>')
+    lines.append(f'<div><a href="{status_url}"><time datetime="{tweet["datetime"]}">{tweet["datetime"][:10]}</time></a></div>')
+    text_lines = ''.join(f"<div>{html.escape(line)}</div>" for line in tweet['lines'])
+    lines.append(f'<div data-testid="tweetText">{text_lines}</div>')
+    lines.extend(f"<div>{html.escape(stat)}</div>" for stat in tweet.get('stats', []))
+    return f'<article data-testid="tweet">{"".join(lines)}</article>'
+
+
+class FixtureStore:
+    """讀取 fixture 目錄並快取每一批推文"""
+
+    def __init__(self, fixture_dir):
+        self.fixture_dir = fixture_dir
+        self._batches = {}
+        self._lock = threading.Lock()
+
+    def batches(self, username):
+        with self._lock:
+            if username not in self._batches:
+                batches = []
+                for path in sorted(glob.glob(os.path.join(self.fixture_dir, 'x', username, 'batch_*.json'))):
+                    with open(path, 'r', encoding='utf-8') as f:
+                        batches.append(json.load(f))
+                self._batches[username] = batches
+            return self._batches[username]
+
+    def batch_html(self, username, index):
+        batches = self.batches(username)
+        if index >= len(batches):
+            return None
+        return ''.join(render_article(username, tweet) for tweet in batches[index])
+
+    def sb_calendar(self):
+        path = os.path.join(self.fixture_dir, 'sb', 'calendar.html')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+
+def _make_handler(store, stats, stats_lock):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass  # 不輸出每個請求的 log
+
+        def _send(self, status, body):
+            data = body.encode('utf-8')
+            with stats_lock:
+                stats['requests'] += 1
+                stats['bytes'] += len(data)
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            parts = [p for p in self.path.split('?')[0].split('/') if p]
+            if parts == ['sb', 'calendar']:
+                page = store.sb_calendar()
+                return self._send(200, page) if page else self._send(404, 'no sb fixture')
+            if parts == ['login']:
+                return self._send(200, _SIMPLE_PAGE.format(title='Login', body='<p>fixture login</p>'))
+            if len(parts) == 1:
+                username = parts[0]
+                first = store.batch_html(username, 0)
+                if first is None:
+                    return self._send(404, f'no fixture for {username}')
+                return self._send(200, _TIMELINE_PAGE.format(username=username, articles=first))
+            if len(parts) == 3 and parts[1] == 'batch' and parts[2].isdigit():
+                fragment = store.batch_html(parts[0], int(parts[2]))
+                return self._send(200, fragment) if fragment is not None else self._send(404, '')
+            if len(parts) == 3 and parts[1] == 'status':
+                return self._send(200, _SIMPLE_PAGE.format(title='Status', body=html.escape(parts[2])))
+            return self._send(404, 'not found')
+
+    return FixtureHandler
+
+
+class FixtureServer:
+    """在背景執行緒中啟動的 fixture 伺服器
+
+    用法:
+        with FixtureServer(fixture_dir) as server:
+            crawler = XCrawler(base_url=server.base_url)
+    """
+
+    def __init__(self, fixture_dir, host='127.0.0.1', port=0):
+        self.stats = {'requests': 0, 'bytes': 0}
+        handler = _make_handler(FixtureStore(fixture_dir), self.stats, threading.Lock())
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def sb_calendar_url(self):
+        return f"{self.base_url}/sb/calendar"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def _sb_calendar_html(event_dicts, year, month):
+    """以 ICS Calendar 外掛的排版產生 SB 日曆頁面"""
+    by_day = {}
+    for event in event_dicts:
+        by_day.setdefault(random.Random(event['text']).randint(1, 28), []).append(event)
+    cells = []
+    for day in range(1, 29):
+        items = ''
+        for event in by_day.get(day, []):
+            time_html = f'<span class="time">{event["start_time"]} – {event["end_time"]}</span>' if event['start_time'] else ''
+            link = event['link'] or '#'
+            items += f'<li class="event">{time_html}<span class="title"><a href="{html.escape(link)}">{html.escape(event["title"])}</a></span></li>'
+        css = f'd_{day:02d}' + (' has_events' if items else '')
+        cells.append(f'<td class="{css}"><ul class="events">{items}</ul></td>')
+    rows = ''.join(f"<tr>{''.join(cells[i:i + 7])}</tr>" for i in range(0, len(cells), 7))
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>SB</title></head><body>'
+        f'<h3 class="ics-calendar-label">{month} 月 {year}</h3>'
+        f'<table class="ics-calendar-month-grid">{rows}</table></body></html>'
+    )
+
+
+def write_synthetic_fixtures(fixture_dir, username='bench_user', num_tweets=200, batch_size=20, sb_events=40, seed=0):
+    """以合成資料建立 fixture 目錄，回傳 fixture_dir"""
+    rng = random.Random(seed)
+    user_dir = os.path.join(fixture_dir, 'x', username)
+    os.makedirs(user_dir, exist_ok=True)
+    tweets = synthetic.generate_tweets(num_tweets, seed=seed)
+    records = []
+    for i, tweet in enumerate(tweets):
+        records.append({
+            'id': str(10**18 + i),
+            'datetime': tweet['post_time'],
+            'author': '場地帳號',
+            'handle': username,
+            'lines': tweet['text'].split('\n'),
+            'pinned': i == 0,
+            'retweet': rng.random() < 0.05,
+            'stats': [str(rng.randint(1, 50)), str(rng.randint(0, 9)), f"{rng.randint(1, 9)}.{rng.randint(0, 9)}K"],
+        })
+    for n, start in enumerate(range(0, len(records), batch_size)):
+        with open(os.path.join(user_dir, f'batch_{n:03d}.json'), 'w', encoding='utf-8') as f:
+            json.dump(records[start:start + batch_size], f, ensure_ascii=False, indent=4)
+
+    os.makedirs(os.path.join(fixture_dir, 'sb'), exist_ok=True)
+    with open(os.path.join(fixture_dir, 'sb', 'calendar.html'), 'w', encoding='utf-8') as f:
+        f.write(_sb_calendar_html(synthetic.generate_event_dicts(sb_events, seed=seed), 2025, 10))
+    return fixture_dir
@@ -0,0 +1,172 @@
+"""
+以本機 fixture 伺服器離線重播 XCrawler 與 SBCrawler 並量測吞吐量
+
+用法（在專案根目錄執行，需要 Chrome）:
+    python -m benchmarks.replay_crawlers --tweets 200 --output replay_results.json
+    python -m benchmarks.replay_crawlers --fixtures path/to/recorded --username some_user
+
+量測項目：每秒推文數、每則推文的 WebDriver 指令數、呼叫 time.sleep 的總時間，
+以及抓取結束時頁面上的 <article> 數與 JS heap 用量（長捲動模式應與推文數無關）。
+結果格式與 run_benchmarks 相同，可用 --baseline 做回歸檢查。
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixture_server import FixtureServer, write_synthetic_fixtures
+from benchmarks.run_benchmarks import compare_with_baseline
+
+
+class CrawlProbe:
+    """計算 WebDriver 指令數與 sleep 時間
+
+    Selenium 的 WebDriver 與 WebElement 指令最後都會經過 driver.execute，
+    因此只要包裝該實例方法即可取得所有瀏覽器往返次數。
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.webdriver_calls = 0
+        self.sleep_s = 0.0
+        self._original_execute = None
+        self._original_sleep = None
+
+    def __enter__(self):
+        self._original_execute = self.driver.execute
+        self._original_sleep = time.sleep
+
+        def counting_execute(*args, **kwargs):
+            self.webdriver_calls += 1
+            return self._original_execute(*args, **kwargs)
+
+        def timed_sleep(seconds):
+            start = time.perf_counter()
+            self._original_sleep(seconds)
+            self.sleep_s += time.perf_counter() - start
+
+        self.driver.execute = counting_execute
+        time.sleep = timed_sleep
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.driver.execute = self._original_execute
+        time.sleep = self._original_sleep
+
+
+def _result(name, items, wall_s, probe):
+    return {
+        'name': name,
+        'size': items,
+        'repeat': 1,
+        'best_s': wall_s,
+        'mean_s': wall_s,
+        'per_item_us': wall_s / items * 1e6 if items else None,
+        'items_per_s': items / wall_s if wall_s else None,
+        'webdriver_calls': probe.webdriver_calls,
+        'webdriver_calls_per_item': probe.webdriver_calls / items if items else None,
+        'sleep_s': probe.sleep_s,
+        'sleep_ratio': probe.sleep_s / wall_s if wall_s else None,
+    }
+
+
+def replay_x(crawler, username, num_tweets):
+    with CrawlProbe(crawler.driver) as probe:
+        start = time.perf_counter()
+        tweets = crawler.scrape_x_tweets(username, num_tweets=num_tweets)
+        wall_s = time.perf_counter() - start
+    result = _result('x_scrape_tweets', len(tweets), wall_s, probe)
+    result.update(crawler.driver.execute_script(
+        "return {dom_articles: document.querySelectorAll('article').length,"
+        " js_heap_bytes: performance.memory ? performance.memory.usedJSHeapSize : null};"
+    ))
+    return result
+
+
+def replay_sb(driver, calendar_url):
+    from SB_crawler import SBCrawler
+    sb_crawler = SBCrawler(driver=driver, calendar_url=calendar_url)
+    with CrawlProbe(driver) as probe:
+        start = time.perf_counter()
+        events = sb_crawler.scrape_events()
+        wall_s = time.perf_counter() - start
+    return _result('sb_scrape_events', len(events), wall_s, probe)
+
+
+def _print_result(result):
+    print(
+        f"⏱️ {result['name']:<18} items={result['size']:<5} wall={result['best_s']:.2f}s "
+        f"rate={result['items_per_s'] or 0:.2f}/s "
+        f"webdriver/item={result['webdriver_calls_per_item'] or 0:.1f} "
+        f"sleep={result['sleep_s']:.2f}s ({(result['sleep_ratio'] or 0):.0%})"
+    )
+    if 'dom_articles' in result:
+        print(f"   DOM articles={result['dom_articles']} JS heap={(result['js_heap_bytes'] or 0) / 1e6:.1f}MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="以本機 fixture 伺服器離線量測爬蟲吞吐量")
+    parser.add_argument('--fixtures', help="fixture 目錄（預設以合成資料建立暫存目錄）")
+    parser.add_argument('--username', default='bench_user', help="要重播的帳號")
+    parser.add_argument('--tweets', type=int, default=100, help="目標抓取的推文數")
+    parser.add_argument('--profile', default=None, help="瀏覽器配置目錄（預設使用暫存目錄，不影響 profile1）")
+    parser.add_argument('--skip-sb', action='store_true', help="不重播 SB 日曆")
+    parser.add_argument('--output', default='replay_results.json', help="結果 JSON 路徑")
+    parser.add_argument('--baseline', help="作為比較基準的結果 JSON")
+    parser.add_argument('--max-regression', type=float, default=0.25, help="允許的退步比例")
+    args = parser.parse_args(argv)
+
+    fixture_dir = args.fixtures
+    if fixture_dir is None:
+        fixture_dir = write_synthetic_fixtures(
+            tempfile.mkdtemp(prefix='replay_fixtures_'), username=args.username, num_tweets=max(args.tweets * 2, 40)
+        )
+        print(f"📁 已建立合成 fixture: {fixture_dir}")
+
+    from UCanScrapeX import XCrawler
+
+    results = []
+    with FixtureServer(fixture_dir) as server:
+        print(f"🌐 fixture 伺服器: {server.base_url}")
+        profile_dir = args.profile or tempfile.mkdtemp(prefix='replay_profile_')
+        with XCrawler(user_data_dir=profile_dir, base_url=server.base_url) as crawler:
+            results.append(replay_x(crawler, args.username, args.tweets))
+            _print_result(results[-1])
+            if not args.skip_sb:
+                results.append(replay_sb(crawler.driver, server.sb_calendar_url))
+                _print_result(results[-1])
+        print(f"📦 伺服器共回應 {server.stats['requests']} 個請求，{server.stats['bytes']} bytes")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'fixtures': fixture_dir,
+            'username': args.username,
+            'tweets': args.tweets,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(f"✅ 結果已寫入 {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline_report = json.load(f)
+        if compare_with_baseline(results, baseline_report.get('results', []), args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
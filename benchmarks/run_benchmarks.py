@@ -0,0 +1,263 @@
+"""
+熱路徑效能測試
+
+用法（在專案根目錄執行）:
+    python -m benchmarks.run_benchmarks --output bench_results.json
+    python -m benchmarks.run_benchmarks --baseline bench_baseline.json --max-regression 0.25
+
+結果以 JSON 輸出，指定 --baseline 時會與先前的結果比較，任何項目變慢超過
+--max-regression 的比例就以非零狀態碼結束，可作為回歸檢查。
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import synthetic
+
+DEFAULT_EVENT_SIZES = [1000, 10000, 100000]
+DEFAULT_TWEET_COUNT = 10000
+
+BENCHMARKS = {}
+
+
+def benchmark(name, scale):
+    """註冊效能測試
+
+    被裝飾的函數接收資料量，回傳 (要計時的函數, 清理函數或 None)。
+
+    Args:
+        name: 測試名稱
+        scale: 'tweets' 以推文數量為規模，'events' 以活動數量為規模
+    """
+    def decorator(func):
+        BENCHMARKS[name] = (scale, func)
+        return func
+    return decorator
+
+
+def _quiet(func):
+    """執行時隱藏被測函數的 print 輸出"""
+    def wrapper():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return wrapper
+
+
+@benchmark('parse_time_range', 'tweets')
+def bench_parse_time_range(size):
+    from tweet_parser import parse_time_range
+    texts = [tweet['text'] for tweet in synthetic.generate_tweets(size)]
+
+    def run():
+        for text in texts:
+            parse_time_range(text)
+    return run, None
+
+
+@benchmark('clean_tweet_text', 'tweets')
+def bench_clean_tweet_text(size):
+    from UCanScrapeX import XCrawler
+    crawler = XCrawler.__new__(XCrawler)  # 不啟動瀏覽器
+    texts = synthetic.generate_article_texts(size)
+
+    def run():
+        for text in texts:
+            crawler._clean_tweet_text(text)
+    return run, None
+
+
+@benchmark('process_tweet_to_event', 'tweets')
+def bench_process_tweet_to_event(size):
+    import pytz
+    from tweet_parser import process_tweet_to_event
+    tweets = synthetic.generate_tweets(size)
+    today = datetime(2025, 1, 1, tzinfo=pytz.timezone('Asia/Taipei'))
+
+    def run():
+        for tweet in tweets:
+            process_tweet_to_event(tweet, '思', today)
+    return _quiet(run), None
+
+
+@benchmark('categorize_tweets', 'tweets')
+def bench_categorize_tweets(size):
+    from config_service import DEFAULT_CATEGORY_RULES
+    from event_categorizer import CategoryMatcher
+    matcher = CategoryMatcher(DEFAULT_CATEGORY_RULES)
+    texts = [tweet['text'] for tweet in synthetic.generate_tweets(size)]
+
+    def run():
+        for text in texts:
+            matcher.match(text)
+    return run, None
+
+
+@benchmark('merge_events', 'events')
+def bench_merge_events(size):
+    from SB_crawler import SBCrawler
+    from event_model import events_from_json
+    sb_crawler = SBCrawler.__new__(SBCrawler)  # 不啟動瀏覽器
+    raw = synthetic.generate_event_dicts(size)
+    # 一次網站抓取約 60 筆，其中一半已存在於檔案中
+    incoming_raw = raw[:30] + synthetic.generate_event_dicts(30, seed=1)
+
+    def run():
+        existing = events_from_json(raw)
+        incoming = events_from_json(incoming_raw)
+        sb_crawler._merge_events(existing, incoming)
+    return _quiet(run), None
+
+
+@benchmark('load_and_group', 'events')
+def bench_load_and_group(size):
+    from event_index import load_outputs_index
+    tmpdir = tempfile.mkdtemp(prefix='bench_outputs_')
+    synthetic.write_outputs(tmpdir, synthetic.generate_event_dicts(size))
+
+    def run():
+        event_index = load_outputs_index(tmpdir)
+        for venue in event_index.venues():
+            for _ in event_index.grouped_by_date(venue):
+                pass
+    return _quiet(run), lambda: shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+@benchmark('load_and_group_snapshot', 'events')
+def bench_load_and_group_snapshot(size):
+    from event_index import load_outputs_index
+    tmpdir = tempfile.mkdtemp(prefix='bench_outputs_')
+    outputs_dir = os.path.join(tmpdir, 'outputs')
+    cache_dir = os.path.join(tmpdir, 'cache')
+    synthetic.write_outputs(outputs_dir, synthetic.generate_event_dicts(size))
+    with contextlib.redirect_stdout(io.StringIO()):
+        load_outputs_index(outputs_dir, cache_dir=cache_dir)  # 建立快照，計時的是之後的啟動
+
+    def run():
+        event_index = load_outputs_index(outputs_dir, cache_dir=cache_dir)
+        for venue in event_index.venues():
+            for _ in event_index.grouped_by_date(venue):
+                pass
+    return _quiet(run), lambda: shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+@benchmark('sync_render_html', 'events')
+def bench_sync_render_html(size):
+    from UI_main import render_website_html
+    from event_model import events_from_json, is_valid_date
+    html_content = synthetic.load_html_template()
+    categories_config = synthetic.load_category_config()
+    events = [
+        event for event in events_from_json(synthetic.generate_event_dicts(size))
+        if event.check and event.has_title and not event.delete and is_valid_date(event.date)
+    ]
+
+    def run():
+        render_website_html(html_content, events, categories_config)
+    return run, None
+
+
+def time_callable(func, repeat):
+    """執行 repeat 次，回傳每次的秒數"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_all(event_sizes, tweet_count, repeat, only=None):
+    results = []
+    for name, (scale, setup) in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        sizes = [tweet_count] if scale == 'tweets' else event_sizes
+        for size in sizes:
+            func, cleanup = setup(size)
+            try:
+                timings = time_callable(func, repeat)
+            finally:
+                if cleanup:
+                    cleanup()
+            best = min(timings)
+            result = {
+                'name': name,
+                'size': size,
+                'repeat': repeat,
+                'best_s': best,
+                'mean_s': sum(timings) / len(timings),
+                'per_item_us': best / size * 1e6,
+            }
+            results.append(result)
+            print(f"⏱️ {name:<24} n={size:<7} best={best:.4f}s  ({result['per_item_us']:.2f} µs/item)")
+    return results
+
+
+def compare_with_baseline(results, baseline_results, max_regression):
+    """回傳超過允許退步比例的項目"""
+    baseline = {(r['name'], r['size']): r for r in baseline_results}
+    regressions = []
+    for result in results:
+        base = baseline.get((result['name'], result['size']))
+        if not base or base['best_s'] <= 0:
+            continue
+        ratio = result['best_s'] / base['best_s']
+        marker = '❌' if ratio > 1 + max_regression else '✅'
+        print(f"{marker} {result['name']:<24} n={result['size']:<7} {ratio:.2f}x baseline")
+        if ratio > 1 + max_regression:
+            regressions.append({**result, 'baseline_s': base['best_s'], 'ratio': ratio})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="解析、合併、載入與網站同步的效能測試")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_EVENT_SIZES, help="活動數量規模")
+    parser.add_argument('--tweets', type=int, default=DEFAULT_TWEET_COUNT, help="推文數量")
+    parser.add_argument('--repeat', type=int, default=3, help="每項重複次數（取最佳值）")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="只執行指定的項目")
+    parser.add_argument('--output', default='bench_results.json', help="結果 JSON 路徑")
+    parser.add_argument('--baseline', help="作為比較基準的結果 JSON")
+    parser.add_argument('--max-regression', type=float, default=0.25, help="允許的退步比例（0.25 = 慢 25%%）")
+    args = parser.parse_args(argv)
+
+    results = run_all(args.sizes, args.tweets, args.repeat, args.only)
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': args.sizes,
+            'tweets': args.tweets,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(f"✅ 結果已寫入 {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline_report = json.load(f)
+        regressions = compare_with_baseline(results, baseline_report.get('results', []), args.max_regression)
+        if regressions:
+            print(f"❌ {len(regressions)} 個項目退步超過 {args.max_regression:.0%}")
+            return 1
+        print("✅ 沒有超過門檻的效能退步")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+效能測試用的合成資料產生器
+
+標題、場地、時間與連結取自 outputs/*_events.json 的真實資料，推文文字則模仿
+X 上活動公告常見的日期/時間寫法（全形與半形混用），固定亂數種子以便比較不同次的結果。
+"""
+
+import glob
+import json
+import os
+import random
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HTML_TEMPLATE = os.path.join(REPO_ROOT, 'index (1).html')
+
+# outputs 目錄不存在時使用的備用資料
+_FALLBACK_VENUES = ['拘久屋', '玩具間', '更衣間', '思', '動物方程式', '其他']
+_FALLBACK_TITLES = ['SP拍打交流會', 'BD玩法及體驗Lv1', '練習日 🌙', '踩踏日 (平日場)', '劇本殺之夜', '觸動市集']
+_FALLBACK_TIMES = [('13:30', '16:30'), ('14:00', '17:00'), ('19:00', '22:00'), (None, None)]
+_CATEGORIES = ['sp', 'bd', 'bds', 'so', 'wk', 'ss', 'hy', 'or']
+
+_DATE_FORMATS = [
+    '{m}/{d}', '{m:02d}/{d:02d}', '{m}／{d}', '{m}-{d}', '{m}－{d}', '{m}月{d}日',
+]
+_TIME_FORMATS = [
+    '{sh}:00~{eh}:00', '{sh}:30-{eh}:30', '{sh}：00～{eh}：00', '{sh}點-{eh}點',
+    '{sh12}pm-{eh12}pm', '晚上{sh12}點-{eh12}點', '',
+]
+_FILLER_LINES = [
+    '報名請填表單', '名額有限，額滿為止', '新手友善，歡迎第一次來的朋友',
+    '當天請攜帶身分證件', '有任何問題歡迎私訊', '本次預設主題：24/7',
+    '大家可以先填，我審核後會放人進來。', '沒消息不要緊張，我可能在忙。',
+]
+_STAT_TAILS = ['12', '3', '1.5K', '2萬', '845', '1,234']
+_JUNK_TAILS = ['Show more', '顯示更多', 'Translate post', '…']
+
+
+def load_real_patterns():
+    """從 outputs/*_events.json 收集真實的場地、標題、時間與連結"""
+    venues, titles, times, links = set(), set(), set(), set()
+    for filepath in glob.glob(os.path.join(REPO_ROOT, 'outputs', '*_events.json')):
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                events = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        venues.add(os.path.basename(filepath).replace('_events.json', ''))
+        for event in events:
+            if event.get('title'):
+                titles.add(event['title'])
+            times.add((event.get('start_time'), event.get('end_time')))
+            if event.get('link'):
+                links.add(event['link'])
+    return {
+        'venues': sorted(venues) or _FALLBACK_VENUES,
+        'titles': sorted(titles) or _FALLBACK_TITLES,
+        'times': sorted(times, key=str) or _FALLBACK_TIMES,
+        'links': sorted(links) or ['https://forms.gle/example'],
+    }
+
+
+def _tweet_text(rng, patterns, year=2025):
+    month, day = rng.randint(1, 12), rng.randint(1, 28)
+    start = rng.randint(13, 19)
+    end = min(start + rng.randint(2, 4), 23)
+    date_part = rng.choice(_DATE_FORMATS).format(m=month, d=day)
+    time_part = rng.choice(_TIME_FORMATS).format(sh=start, eh=end, sh12=start - 12 or 12, eh12=end - 12 or 12)
+    lines = [f"{date_part} {time_part} {rng.choice(patterns['titles'])}".strip()]
+    lines.extend(rng.sample(_FILLER_LINES, rng.randint(1, 4)))
+    if rng.random() < 0.6:
+        lines.append(rng.choice(patterns['links']))
+    if rng.random() < 0.05:
+        lines[0] = 'RT ' + lines[0]
+    return '\n'.join(lines)
+
+
+def generate_tweets(count, seed=0):
+    """產生推文資料（與 XCrawler.scrape_x_tweets 回傳格式相同）"""
+    rng = random.Random(seed)
+    patterns = load_real_patterns()
+    tweets = []
+    for i in range(count):
+        tweets.append({
+            'post_time': f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00.000Z",
+            'text': _tweet_text(rng, patterns),
+            'tweet_url': f"https://x.com/bench_user/status/{10**18 + i}",
+        })
+    return tweets
+
+
+def generate_article_texts(count, seed=0):
+    """產生模擬 <article> 元素 .text 的原始推文文字（作者、時間、內容、統計數字）"""
+    rng = random.Random(seed)
+    patterns = load_real_patterns()
+    texts = []
+    for _ in range(count):
+        header = ['場地帳號', '@bench_user', '·', f"{rng.randint(1, 12)}月{rng.randint(1, 28)}日"]
+        body = _tweet_text(rng, patterns).split('\n')
+        tail = rng.sample(_JUNK_TAILS, rng.randint(0, 2)) + rng.sample(_STAT_TAILS, rng.randint(2, 4))
+        texts.append('\n'.join(header + body + tail))
+    return texts
+
+
+def generate_event_dicts(count, seed=0, start_year=2024, years=3):
+    """產生活動 dict（與 outputs/*_events.json 內的格式相同）"""
+    rng = random.Random(seed)
+    patterns = load_real_patterns()
+    events = []
+    for i in range(count):
+        venue = rng.choice(patterns['venues'])
+        title = rng.choice(patterns['titles'])
+        start_time, end_time = rng.choice(patterns['times'])
+        date = f"{start_year + rng.randrange(years)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        text = f"{venue} - {title} #{i}"
+        if start_time and end_time:
+            text += f" {start_time}~{end_time}"
+        events.append({
+            'date': date if rng.random() > 0.01 else None,
+            'text': text,
+            'check': rng.random() < 0.7,
+            'venue': venue,
+            'start_time': start_time,
+            'end_time': end_time,
+            'link': rng.choice(patterns['links']) if rng.random() < 0.8 else '',
+            'title': title if rng.random() < 0.9 else '',
+            'brief_description': '',
+            'delete': rng.random() < 0.05,
+            'category': rng.choice(_CATEGORIES),
+        })
+    return events
+
+
+def write_outputs(dirpath, event_dicts):
+    """依場地將活動寫成 `<venue>_events.json`，回傳寫入的檔案數"""
+    os.makedirs(dirpath, exist_ok=True)
+    by_venue = {}
+    for event in event_dicts:
+        by_venue.setdefault(event['venue'], []).append(event)
+    for venue, events in by_venue.items():
+        with open(os.path.join(dirpath, f"{venue}_events.json"), 'w', encoding='utf-8') as f:
+            json.dump(events, f, ensure_ascii=False, indent=4)
+    return len(by_venue)
+
+
+def load_html_template():
+    """讀取網站 HTML 範本（index (1).html）"""
+    with open(HTML_TEMPLATE, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def load_category_config():
+    with open(os.path.join(REPO_ROOT, 'category_config.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,250 @@
+"""
+瀏覽器生命週期管理
+
+定時爬蟲會連續數天重複使用同一個 XCrawler.driver。無限捲動讓 Chrome 的記憶體
+持續成長，而 driver 一旦失效，之後每個週期都會失敗直到重新啟動程式。
+
+BrowserManager 在每個帳號開始前呼叫 ensure_ready()：
+- 健康檢查：對瀏覽器執行一個簡單的腳本，失敗就重新啟動
+- 回收：頁面載入次數超過 max_page_loads，或 Chrome 行程的記憶體（RSS 總和）
+  超過 max_rss_mb 時重新啟動
+
+重新啟動沿用同一個 user_data_dir（profile1），因此登入狀態不會遺失。
+記憶體量測使用 psutil（seleniumbase 的相依套件），無法載入時只依頁面載入次數回收。
+
+登入、爬蟲（手動或定時）與 SB 日曆抓取在不同執行緒中使用瀏覽器，需先透過
+DriverPool.lease() 取得使用權：同一時間只有一個工作持有一個瀏覽器，其他請求
+依先來後到排隊，等待超過 timeout 則拋出 DriverLeaseTimeout。
+"""
+
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - seleniumbase 會安裝 psutil
+    psutil = None
+
+DEFAULT_MAX_PAGE_LOADS = 300
+DEFAULT_MAX_RSS_MB = 2048
+
+
+class BrowserManager:
+    """管理 XCrawler 的 driver：健康檢查、記憶體上限回收與當掉後重新啟動"""
+
+    def __init__(self, crawler, max_page_loads=DEFAULT_MAX_PAGE_LOADS, max_rss_mb=DEFAULT_MAX_RSS_MB):
+        """
+        Args:
+            crawler: XCrawler 實例（重新啟動後 crawler.driver 會換成新的 driver）
+            max_page_loads: 累計多少次 driver.get 後回收，None 表示不限制
+            max_rss_mb: Chrome 行程 RSS 總和的上限（MB），None 表示不限制
+        """
+        self.crawler = crawler
+        self.max_page_loads = max_page_loads
+        self.max_rss_mb = max_rss_mb
+        self.page_loads = 0
+        self.restarts = 0
+        self.last_rss_mb = None
+        self._lock = threading.Lock()
+        self._attached_driver = None
+        self._attach()
+
+    @property
+    def driver(self):
+        return self.crawler.driver
+
+    def _attach(self):
+        """包裝目前 driver 的 get()，計算頁面載入次數"""
+        driver = self.crawler.driver
+        if driver is None or driver is self._attached_driver:
+            return
+        original_get = driver.get
+        manager = self
+
+        def counting_get(*args, **kwargs):
+            manager.page_loads += 1
+            return original_get(*args, **kwargs)
+
+        driver.get = counting_get
+        self._attached_driver = driver
+        self.page_loads = 0
+
+    # ---- 檢查 ----
+
+    def is_healthy(self):
+        """driver 是否仍可回應指令"""
+        driver = self.crawler.driver
+        if driver is None:
+            return False
+        try:
+            driver.execute_script("return 1;")
+            # 確認目前分頁仍存在（分頁當掉時 execute_script 有時仍會回傳）
+            driver.current_window_handle
+            return True
+        except Exception as e:
+            print(f"⚠️ 瀏覽器健康檢查失敗: {e}")
+            return False
+
+    def _browser_processes(self):
+        """chromedriver 及其所有子行程（Chrome 主行程、renderer、GPU 等）"""
+        if psutil is None or self.crawler.driver is None:
+            return []
+        try:
+            pid = self.crawler.driver.service.process.pid
+            root = psutil.Process(pid)
+            return [root] + root.children(recursive=True)
+        except Exception:
+            return []
+
+    def chrome_rss_mb(self):
+        """Chrome 相關行程的 RSS 總和（MB），無法量測時回傳 None"""
+        processes = self._browser_processes()
+        if not processes:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except Exception:
+                continue  # 行程可能在列舉後結束
+        self.last_rss_mb = total / (1024 * 1024)
+        return self.last_rss_mb
+
+    def recycle_reason(self):
+        """需要回收時回傳原因，否則回傳 None"""
+        if self.max_page_loads and self.page_loads >= self.max_page_loads:
+            return f"已載入 {self.page_loads} 個頁面"
+        if self.max_rss_mb:
+            rss_mb = self.chrome_rss_mb()
+            if rss_mb is not None and rss_mb >= self.max_rss_mb:
+                return f"記憶體 {rss_mb:.0f} MB 超過上限 {self.max_rss_mb} MB"
+        return None
+
+    # ---- 重新啟動 ----
+
+    def restart(self, reason):
+        """關閉目前的瀏覽器（必要時強制結束殘留行程）並以同一個 profile 重新啟動"""
+        with self._lock:
+            print(f"🔄 重新啟動瀏覽器: {reason}")
+            processes = self._browser_processes()
+            driver, self.crawler.driver = self.crawler.driver, None
+            if driver is not None:
+                try:
+                    driver.quit()
+                except Exception as e:
+                    print(f"⚠️ 關閉瀏覽器時出錯（將強制結束）: {e}")
+            for process in processes:
+                try:
+                    if process.is_running():
+                        process.kill()
+                except Exception:
+                    continue
+            if psutil is not None and processes:
+                psutil.wait_procs(processes, timeout=10)
+            self.crawler.restart()
+            self.restarts += 1
+            self._attach()
+
+    def ensure_ready(self, metrics=None):
+        """在每個帳號開始前呼叫：driver 失效就重新啟動，超過上限就回收
+
+        Returns:
+            bool: 是否重新啟動了瀏覽器
+        """
+        try:
+            if not self.is_healthy():
+                reason = "瀏覽器沒有回應"
+            else:
+                reason = self.recycle_reason()
+            if reason is None:
+                return False
+            self.restart(reason)
+            if metrics is not None:
+                metrics.count('browser_restarts')
+            return True
+        except Exception as e:
+            print(f"❌ 重新啟動瀏覽器失敗: {e}")
+            traceback.print_exc()
+            raise
+
+
+class DriverLeaseTimeout(TimeoutError):
+    """等待瀏覽器使用權逾時"""
+
+
+class DriverPool:
+    """瀏覽器使用權管理：獨占、先來後到、可設定逾時
+
+    用法:
+        with pool.lease('爬蟲:拘久屋', timeout=600) as browser:
+            browser.crawler.scrape_x_tweets(...)
+
+    目前程式只有一個瀏覽器，但 pool 可以放入多個 BrowserManager，
+    之後要同時執行多個瀏覽器工作時，排隊的請求會拿到任一個空閒的瀏覽器。
+    """
+
+    def __init__(self, browsers):
+        self.browsers = list(browsers)
+        self._cond = threading.Condition()
+        self._free = deque(self.browsers)
+        self._waiters = deque()
+        self._holders = {}
+
+    def holders(self):
+        """目前持有瀏覽器的工作名稱"""
+        with self._cond:
+            return list(self._holders.values())
+
+    def queue_length(self):
+        with self._cond:
+            return len(self._waiters)
+
+    def _acquire(self, owner, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        ticket = object()
+        with self._cond:
+            self._waiters.append(ticket)
+            try:
+                # 只有排在最前面的請求可以拿走空閒的瀏覽器，確保先來後到
+                while not (self._waiters[0] is ticket and self._free):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        busy = '、'.join(self._holders.values()) or '其他工作'
+                        raise DriverLeaseTimeout(f"等待瀏覽器逾時（{timeout:g} 秒），目前由 {busy} 使用中")
+                    self._cond.wait(remaining)
+            except BaseException:
+                self._waiters.remove(ticket)
+                self._cond.notify_all()
+                raise
+            self._waiters.popleft()
+            browser = self._free.popleft()
+            self._holders[id(browser)] = owner
+            # 還有空閒的瀏覽器時，讓下一個排隊的請求也能繼續
+            self._cond.notify_all()
+            return browser
+
+    def _release(self, browser):
+        with self._cond:
+            self._holders.pop(id(browser), None)
+            self._free.append(browser)
+            self._cond.notify_all()
+
+    @contextmanager
+    def lease(self, owner, timeout=None, metrics=None):
+        """取得一個瀏覽器的獨占使用權，取得後先做健康檢查
+
+        Args:
+            owner: 工作名稱（逾時訊息與 holders() 使用）
+            timeout: 最多等待秒數，None 表示一直等待
+            metrics: CrawlMetrics（可選），記錄等待時間與重新啟動次數
+        """
+        with metrics.phase('driver_wait') if metrics is not None else nullcontext():
+            browser = self._acquire(owner, timeout)
+        try:
+            browser.ensure_ready(metrics)
+            yield browser
+        finally:
+            self._release(browser)
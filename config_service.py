@@ -0,0 +1,315 @@
+"""
+設定檔服務
+
+user_config.json（爬取帳號）、category_config.json（活動類別）、category_rules.json
+（自動分類規則）與 style_config/*.json（網站風格）統一由 ConfigService 讀取：
+
+- 每個檔案只在修改時間或大小改變時才重新讀取與驗證，其餘時間直接回傳快取
+- 驗證失敗時保留上一次的有效內容，錯誤訊息放在 error 屬性，不會讓呼叫端拿到壞掉的設定
+- 內容改變（不論是本程式寫入或在外部被編輯）時通知訂閱者，畫面、排程器與分類器
+  不需要自己重新讀檔或重新啟動
+
+寫入一律驗證後以暫存檔 + os.replace 替換。get() 回傳的是副本，呼叫端修改後
+以 save() 寫回即可。
+"""
+
+import copy
+import json
+import os
+import re
+import threading
+import traceback
+from abc import ABC, abstractmethod
+
+USER_CONFIG_FILE = 'user_config.json'
+CATEGORY_CONFIG_FILE = 'category_config.json'
+CATEGORY_RULES_FILE = 'category_rules.json'
+STYLE_CONFIG_DIR = 'style_config'
+
+DEFAULT_USER_CONFIGS = [
+    {'user_id': 'jukuya456', 'name': '拘久屋'},
+    {'user_id': 'studiobondage', 'name': '玩具間'},
+    {'user_id': 'gengyiroom', 'name': '更衣間'},
+    {'user_id': 's9808191779632', 'name': '思'},
+    {'user_id': '16fnzoo', 'name': '動物方程式'},
+]
+
+DEFAULT_CATEGORIES = {
+    'sp': {'name': 'SP', 'color': 'linear-gradient(135deg, #e74c3c, #c0392b)'},
+    'bd': {'name': '束縛', 'color': 'linear-gradient(135deg, #8e44ad, #9b59b6)'},
+    'bds': {'name': '繩縛', 'color': 'linear-gradient(135deg, #d2b48c, #a67c52)'},
+    'so': {'name': '交流', 'color': 'linear-gradient(135deg, #2ecc71, #27ae60)'},
+    'wk': {'name': '工作坊', 'color': 'linear-gradient(135deg, #f39c12, #e67e22)'},
+    'ss': {'name': '特殊主題', 'color': 'linear-gradient(135deg, #34495e, #2c3e50)'},
+    'hy': {'name': '催眠', 'color': 'linear-gradient(135deg, #ff8ab8, #ff5fa2)'},
+    'or': {'name': '其他', 'color': 'linear-gradient(135deg, #7f8c8d, #95a5a6)'}
+}
+
+# 自動分類規則（見 event_categorizer）：priority 高的規則優先，同分時以列表中較前面的為準。
+# keywords 為不分大小寫的子字串；words 為英數字的完整單字（前後不能緊接英數字），
+# 避免 'sp'、'sm' 這類短代碼在推文網址或英文單字中誤判；patterns 為正規表示式。
+DEFAULT_CATEGORY_RULES = [
+    {'category': 'bds', 'priority': 60, 'keywords': ['繩縛']},
+    {'category': 'bd', 'priority': 50, 'keywords': ['綁縛', 'bdsm'], 'words': ['bd']},
+    {'category': 'sp', 'priority': 40, 'keywords': ['拍打', 'spank'], 'words': ['sp', 'spa']},
+    {'category': 'ss', 'priority': 30, 'keywords': ['v.i.p', '別館'], 'words': ['vip']},
+    {'category': 'hy', 'priority': 25, 'keywords': ['催眠']},
+    {'category': 'so', 'priority': 20, 'keywords': ['放飛', '聊天'], 'words': ['ds', 'sm']},
+    {'category': 'wk', 'priority': 10, 'keywords': ['工作坊', '體驗']},
+]
+RULE_MATCH_FIELDS = ('keywords', 'words', 'patterns')
+
+
+class ConfigValidationError(ValueError):
+    """設定檔內容格式不正確"""
+
+
+def _require_str(value, what):
+    if not isinstance(value, str) or not value.strip():
+        raise ConfigValidationError(f"{what}必須是非空白的字串")
+    return value.strip()
+
+
+def validate_user_configs(data):
+    """爬取帳號：[{'user_id', 'name'}]，user_id 不可重複"""
+    if not isinstance(data, list):
+        raise ConfigValidationError("user_config.json 必須是帳號列表")
+    users = []
+    seen = set()
+    for i, item in enumerate(data):
+        if not isinstance(item, dict):
+            raise ConfigValidationError(f"第 {i + 1} 個帳號格式不正確")
+        user_id = _require_str(item.get('user_id'), f"第 {i + 1} 個帳號的 user_id ")
+        if user_id in seen:
+            raise ConfigValidationError(f"使用者 ID '{user_id}' 重複")
+        seen.add(user_id)
+        users.append({**item, 'user_id': user_id, 'name': _require_str(item.get('name'), f"帳號 {user_id} 的名稱")})
+    return users
+
+
+def validate_categories(data):
+    """活動類別：{代碼: {'name', 'color', ...}}"""
+    if not isinstance(data, dict):
+        raise ConfigValidationError("category_config.json 必須是 {代碼: 類別} 的物件")
+    categories = {}
+    for code, info in data.items():
+        code = _require_str(code, "類別代碼")
+        if not isinstance(info, dict):
+            raise ConfigValidationError(f"類別 '{code}' 格式不正確")
+        categories[code] = {
+            **info,
+            'name': _require_str(info.get('name'), f"類別 '{code}' 的名稱"),
+            'color': _require_str(info.get('color'), f"類別 '{code}' 的顏色"),
+        }
+    return categories
+
+
+def validate_category_rules(data):
+    """自動分類規則：[{'category', 'priority', 'keywords' / 'words' / 'patterns'}]"""
+    if not isinstance(data, list):
+        raise ConfigValidationError("category_rules.json 必須是規則列表")
+    rules = []
+    for i, item in enumerate(data):
+        if not isinstance(item, dict):
+            raise ConfigValidationError(f"第 {i + 1} 條分類規則格式不正確")
+        rule = {**item, 'category': _require_str(item.get('category'), f"第 {i + 1} 條分類規則的類別")}
+        priority = item.get('priority', 0)
+        if not isinstance(priority, (int, float)) or isinstance(priority, bool):
+            raise ConfigValidationError(f"分類規則 '{rule['category']}' 的 priority 必須是數字")
+        rule['priority'] = priority
+        for name in RULE_MATCH_FIELDS:
+            values = item.get(name, [])
+            if not isinstance(values, list) or not all(isinstance(v, str) and v.strip() for v in values):
+                raise ConfigValidationError(f"分類規則 '{rule['category']}' 的 {name} 必須是非空白字串的列表")
+            rule[name] = [v.strip() for v in values]
+        for pattern in rule['patterns']:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ConfigValidationError(f"分類規則 '{rule['category']}' 的正規表示式 {pattern!r} 不正確: {e}")
+        if not any(rule[name] for name in RULE_MATCH_FIELDS):
+            raise ConfigValidationError(f"分類規則 '{rule['category']}' 沒有任何關鍵字")
+        rules.append(rule)
+    return rules
+
+
+def validate_style(data):
+    """網站風格：必須有 name"""
+    if not isinstance(data, dict):
+        raise ConfigValidationError("風格設定必須是物件")
+    _require_str(data.get('name'), "風格名稱")
+    return data
+
+
+class _Watched(ABC):
+    """依檔案指紋快取內容並通知訂閱者的共用邏輯"""
+
+    def __init__(self, name):
+        self.name = name
+        self.error = None
+        self._value = None
+        self._fingerprint = None
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        """內容改變時呼叫 callback(value)，回傳取消訂閱的函數
+
+        callback 在偵測到變動的執行緒中執行；需要更新 Tk 畫面的訂閱者請自行轉回主執行緒。
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def _notify(self, value):
+        for callback in list(self._subscribers):
+            try:
+                callback(copy.deepcopy(value))
+            except Exception as e:
+                print(f"⚠️ 通知設定變更（{self.name}）時發生錯誤: {e}")
+                traceback.print_exc()
+
+    @abstractmethod
+    def _current_fingerprint(self):
+        """目前檔案的指紋（可比較相等），與上次相同時不重新讀取"""
+
+    @abstractmethod
+    def _read(self):
+        """讀取並驗證內容，格式錯誤時拋出 OSError、JSONDecodeError 或 ConfigValidationError"""
+
+    def refresh(self):
+        """檔案有變動時重新讀取，回傳內容是否改變"""
+        with self._lock:
+            fingerprint = self._current_fingerprint()
+            if self._loaded and fingerprint == self._fingerprint:
+                return False
+            self._fingerprint = fingerprint
+            self._loaded = True
+            try:
+                value = self._read()
+            except (OSError, json.JSONDecodeError, ConfigValidationError) as e:
+                self.error = f"{self.name} 載入失敗: {e}"
+                print(f"⚠️ {self.error}（沿用上一次的有效設定）")
+                return False
+            self.error = None
+            if value == self._value:
+                return False
+            self._value = value
+        self._notify(value)
+        return True
+
+    def get(self):
+        """目前的內容（副本）；只有檔案改變時才會重新讀取"""
+        self.refresh()
+        with self._lock:
+            return copy.deepcopy(self._value)
+
+
+class ConfigFile(_Watched):
+    """單一 JSON 設定檔"""
+
+    def __init__(self, path, validate, default=None):
+        super().__init__(os.path.basename(path))
+        self.path = path
+        self.validate = validate
+        self.default = default
+
+    def _current_fingerprint(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            if self.default is None:
+                raise FileNotFoundError(f"找不到 {self.path}")
+            print(f"{self.name} not found, creating a default one.")
+            self.save(self.default)
+            return self._value
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return self.validate(json.load(f))
+
+    def save(self, value):
+        """驗證後寫入檔案並通知訂閱者；格式不正確時拋出 ConfigValidationError"""
+        value = self.validate(copy.deepcopy(value))
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, self.path)
+            self._fingerprint = self._current_fingerprint()
+            self._loaded = True
+            self.error = None
+            changed = value != self._value
+            self._value = value
+        if changed:
+            self._notify(value)
+
+
+class ConfigDirectory(_Watched):
+    """目錄下的多個 JSON 設定檔（網站風格），內容為 {風格名稱: (檔案路徑, 資料)}"""
+
+    def __init__(self, path, validate):
+        super().__init__(os.path.basename(path))
+        self.path = path
+        self.validate = validate
+
+    def _current_fingerprint(self):
+        if not os.path.isdir(self.path):
+            return None
+        return tuple(sorted(
+            (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+            for entry in os.scandir(self.path)
+            if entry.name.endswith('.json') and entry.is_file()
+        ))
+
+    def _read(self):
+        styles = {}
+        for filename, _, _ in self._fingerprint or ():
+            filepath = os.path.join(self.path, filename)
+            # 單一檔案格式錯誤時只略過該檔案，其他風格仍可使用
+            try:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    data = self.validate(json.load(f))
+            except (OSError, json.JSONDecodeError, ConfigValidationError) as e:
+                print(f"無法載入風格檔案 {filename}: {e}")
+                continue
+            styles[data['name']] = (filepath, data)
+        return styles
+
+
+class ConfigService:
+    """所有設定檔的入口"""
+
+    def __init__(self, base_dir='.'):
+        self.users = ConfigFile(os.path.join(base_dir, USER_CONFIG_FILE), validate_user_configs, DEFAULT_USER_CONFIGS)
+        self.categories = ConfigFile(os.path.join(base_dir, CATEGORY_CONFIG_FILE), validate_categories, DEFAULT_CATEGORIES)
+        self.styles = ConfigDirectory(os.path.join(base_dir, STYLE_CONFIG_DIR), validate_style)
+        self.category_rules = ConfigFile(os.path.join(base_dir, CATEGORY_RULES_FILE), validate_category_rules, DEFAULT_CATEGORY_RULES)
+
+    def refresh(self):
+        """檢查所有設定檔，回傳內容有改變的設定名稱列表（UI 定期呼叫以套用外部修改）"""
+        configs = (self.users, self.categories, self.styles, self.category_rules)
+        return [config.name for config in configs if config.refresh()]
+
+
+_default_service = None
+_default_service_lock = threading.Lock()
+
+
+def get_config_service():
+    """同一個行程共用的 ConfigService（以目前工作目錄為基準）"""
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            _default_service = ConfigService()
+        return _default_service
@@ -0,0 +1,114 @@
+"""
+爬蟲週期的檢查點
+
+每個帳號抓到推文後先寫入檢查點，合併寫檔完成後再標記為完成。若 Chrome
+當掉或程式在週期中途被關閉，下一次執行時會跳過已完成的帳號，並直接使用
+已抓到但尚未合併的推文，從第一個未完成的帳號繼續。
+
+合併時以活動文字去重，因此重複合併同一批推文不會產生重複活動。
+週期完成後檢查點檔案會被刪除；超過 max_age_hours 的舊檢查點視為無效。
+爬蟲管線的解析與寫檔階段在不同執行緒中更新檢查點，修改與寫檔都在鎖內進行。
+"""
+
+import json
+import os
+import threading
+import time
+
+from crawl_metrics import METRICS_DIR
+
+CHECKPOINT_FILE = os.path.join(METRICS_DIR, 'crawl_checkpoint.json')
+DEFAULT_MAX_AGE_HOURS = 12
+
+
+class CrawlCheckpoint:
+    """一次爬蟲週期的進度紀錄"""
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self.started_at = time.time()
+        self.accounts = []
+        self.completed = set()
+        self.pending = {}
+        self.resumed = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, accounts, path=CHECKPOINT_FILE, max_age_hours=DEFAULT_MAX_AGE_HOURS):
+        """開始一個週期；若有未完成且未過期的檢查點則接續
+
+        Args:
+            accounts: 本週期要處理的帳號 ID 列表（依處理順序）
+        """
+        checkpoint = cls(path)
+        previous = cls._read(path)
+        if previous and time.time() - previous.get('started_at', 0) <= max_age_hours * 3600:
+            checkpoint.started_at = previous['started_at']
+            checkpoint.completed = set(previous.get('completed', [])) & set(accounts)
+            checkpoint.pending = {
+                user_id: tweets for user_id, tweets in previous.get('pending', {}).items()
+                if user_id in accounts and user_id not in checkpoint.completed
+            }
+            checkpoint.resumed = bool(checkpoint.completed or checkpoint.pending)
+        checkpoint.accounts = list(accounts)
+        checkpoint._write()
+        return checkpoint
+
+    @staticmethod
+    def _read(path):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ 讀取爬蟲檢查點失敗，將重新開始: {e}")
+            return None
+
+    def _write(self):
+        data = {
+            'started_at': self.started_at,
+            'accounts': self.accounts,
+            'completed': [user_id for user_id in self.accounts if user_id in self.completed],
+            'pending': self.pending,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            # 先寫暫存檔再替換，當掉時不會留下寫到一半的檢查點
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ 寫入爬蟲檢查點失敗: {e}")
+
+    def is_done(self, user_id):
+        return user_id in self.completed
+
+    def pending_tweets(self, user_id):
+        """已抓到但尚未合併的推文，沒有時回傳 None"""
+        return self.pending.get(user_id)
+
+    def save_tweets(self, user_id, tweets_data):
+        """抓取完成、合併之前呼叫"""
+        with self._lock:
+            self.pending[user_id] = tweets_data
+            self._write()
+
+    def mark_done(self, user_id):
+        """合併寫檔完成後呼叫"""
+        with self._lock:
+            self.pending.pop(user_id, None)
+            self.completed.add(user_id)
+            self._write()
+
+    def remaining(self):
+        return [user_id for user_id in self.accounts if user_id not in self.completed]
+
+    def finish(self):
+        """週期完成，刪除檢查點"""
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        except OSError as e:
+            print(f"⚠️ 刪除爬蟲檢查點失敗: {e}")
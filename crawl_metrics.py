@@ -0,0 +1,193 @@
+"""
+爬蟲執行的分段計時與計數
+
+每次爬蟲週期建立一個 CrawlMetrics，以 phase() 計時各階段（頁面載入、捲動、擷取、
+解析、合併、寫檔），以 count() 累計推文數、新增活動數、寫入位元組等。
+結束時 finish() 會將紀錄附加到 metrics/crawl_history.jsonl；設定環境變數
+CRAWLER_METRICS_PROM 時另外輸出 Prometheus 文字格式的指標檔，供 node_exporter
+textfile collector 之類的工具讀取。
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytz
+
+METRICS_DIR = 'metrics'
+HISTORY_FILE = os.path.join(METRICS_DIR, 'crawl_history.jsonl')
+PROMETHEUS_ENV = 'CRAWLER_METRICS_PROM'
+
+
+class CrawlMetrics:
+    """一次爬蟲週期的計時與計數"""
+
+    def __init__(self, run_type='crawl'):
+        self.run_type = run_type
+        self.started_at = datetime.now(pytz.timezone('Asia/Taipei'))
+        self._start = time.perf_counter()
+        self.duration_s = None
+        self.phases = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.accounts = {}
+        self.error = None
+        self._lock = threading.Lock()
+
+    def _account(self, account):
+        entry = self.accounts.get(account)
+        if entry is None:
+            entry = self.accounts[account] = {'duration_s': 0.0, 'phases': defaultdict(float), 'counters': defaultdict(int)}
+        return entry
+
+    @contextmanager
+    def account_run(self, account):
+        """計時處理單一帳號的總時間（內部各階段另以 phase() 記錄）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._account(account)['duration_s'] += elapsed
+
+    @contextmanager
+    def phase(self, name, account=None):
+        """計時一個階段；指定 account 時同時記入該帳號"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.phases[name] += elapsed
+                if account is not None:
+                    self._account(account)['phases'][name] += elapsed
+
+    def count(self, name, amount=1, account=None):
+        with self._lock:
+            self.counters[name] += amount
+            if account is not None:
+                self._account(account)['counters'][name] += amount
+
+    @contextmanager
+    def track_driver(self, driver):
+        """計算期間內所有 WebDriver 指令數（WebElement 的指令也會經過 driver.execute）"""
+        if driver is None:
+            yield
+            return
+        original_execute = driver.execute
+        metrics = self
+
+        def counting_execute(*args, **kwargs):
+            metrics.count('webdriver_calls')
+            return original_execute(*args, **kwargs)
+
+        driver.execute = counting_execute
+        try:
+            yield
+        finally:
+            driver.execute = original_execute
+
+    def to_record(self):
+        duration = self.duration_s if self.duration_s is not None else time.perf_counter() - self._start
+        return {
+            'run_type': self.run_type,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'duration_s': round(duration, 3),
+            'phases': {k: round(v, 3) for k, v in self.phases.items()},
+            'counters': dict(self.counters),
+            'accounts': {
+                account: {
+                    'duration_s': round(entry['duration_s'], 3),
+                    'phases': {k: round(v, 3) for k, v in entry['phases'].items()},
+                    'counters': dict(entry['counters']),
+                }
+                for account, entry in self.accounts.items()
+            },
+            'error': self.error,
+        }
+
+    def to_prometheus(self):
+        """以 Prometheus 文字格式輸出本次執行的指標"""
+        record = self.to_record()
+        run_type = record['run_type']
+        lines = [
+            '# HELP crawler_last_run_timestamp_seconds Start time of the last run.',
+            '# TYPE crawler_last_run_timestamp_seconds gauge',
+            f'crawler_last_run_timestamp_seconds{{run_type="{run_type}"}} {self.started_at.timestamp():.0f}',
+            '# HELP crawler_last_run_duration_seconds Wall-clock duration of the last run.',
+            '# TYPE crawler_last_run_duration_seconds gauge',
+            f'crawler_last_run_duration_seconds{{run_type="{run_type}"}} {record["duration_s"]}',
+            '# HELP crawler_last_run_success Whether the last run finished without error.',
+            '# TYPE crawler_last_run_success gauge',
+            f'crawler_last_run_success{{run_type="{run_type}"}} {0 if record["error"] else 1}',
+            '# HELP crawler_phase_seconds Time spent in each phase during the last run.',
+            '# TYPE crawler_phase_seconds gauge',
+        ]
+        for name, seconds in sorted(record['phases'].items()):
+            lines.append(f'crawler_phase_seconds{{run_type="{run_type}",phase="{name}"}} {seconds}')
+        lines += [
+            '# HELP crawler_count Counters collected during the last run.',
+            '# TYPE crawler_count gauge',
+        ]
+        for name, value in sorted(record['counters'].items()):
+            lines.append(f'crawler_count{{run_type="{run_type}",name="{name}"}} {value}')
+        lines += [
+            '# HELP crawler_account_duration_seconds Time spent on each account during the last run.',
+            '# TYPE crawler_account_duration_seconds gauge',
+        ]
+        for account, entry in sorted(record['accounts'].items()):
+            label = str(account).replace('\\', '\\\\').replace('"', '\\"')
+            lines.append(f'crawler_account_duration_seconds{{run_type="{run_type}",account="{label}"}} {entry["duration_s"]}')
+        return '\n'.join(lines) + '\n'
+
+    def finish(self, error=None, history_file=HISTORY_FILE):
+        """結束計時，附加紀錄到歷史檔，並視設定輸出 Prometheus 指標檔"""
+        self.duration_s = time.perf_counter() - self._start
+        if error is not None:
+            self.error = str(error)
+        record = self.to_record()
+        try:
+            os.makedirs(os.path.dirname(history_file) or '.', exist_ok=True)
+            with open(history_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except OSError as e:
+            print(f"⚠️ 寫入爬蟲紀錄失敗: {e}")
+
+        prom_path = os.environ.get(PROMETHEUS_ENV)
+        if prom_path:
+            try:
+                # 先寫暫存檔再替換，避免收集器讀到寫到一半的檔案
+                tmp_path = f"{prom_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(self.to_prometheus())
+                os.replace(tmp_path, prom_path)
+            except OSError as e:
+                print(f"⚠️ 寫入 Prometheus 指標檔失敗: {e}")
+        return record
+
+    def summary(self):
+        """一行文字摘要，供 log 使用"""
+        phases = ', '.join(f"{k} {v:.1f}s" for k, v in sorted(self.phases.items(), key=lambda kv: -kv[1]))
+        return f"⏱️ {self.run_type} 耗時 {self.duration_s or 0:.1f}s ({phases})"
+
+
+def load_history(history_file=HISTORY_FILE, limit=None):
+    """讀取歷史紀錄（最舊的在前），limit 只取最後幾筆"""
+    if not os.path.exists(history_file):
+        return []
+    records = []
+    with open(history_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records[-limit:] if limit else records
@@ -0,0 +1,95 @@
+"""
+爬蟲週期的分段管線
+
+原本每個帳號依序「抓取 → 解析 → 讀檔合併 → 寫檔」，全部帳號處理完才爬 SB 日曆：
+瀏覽器等待頁面載入時 CPU 與磁碟閒置，解析與寫檔時瀏覽器又在閒置。StagePipeline
+把流程拆成以有界佇列串接的階段，每個階段各一個執行緒：
+
+- 呼叫端（持有瀏覽器的執行緒）以 put() 送入項目，第一個佇列滿時 put() 會等待（背壓），
+  瀏覽器不會跑到下游前面太多，記憶體中待處理的推文數有上限
+- 每個階段的處理函數接收一個項目，回傳要交給下一階段的項目列表（可以是空的）
+- 各階段依序處理自己的佇列，同一個來源的項目維持送入的順序
+- 任一階段拋出例外時整條管線停止，put() 與 close() 在呼叫端重新拋出該例外
+"""
+
+import queue
+import threading
+
+# 佇列的輪詢間隔（秒）：等待中的 put/get 每隔這麼久檢查一次管線是否已停止
+_POLL_SECONDS = 0.2
+_DONE = object()  # 結束標記，依序傳過每個階段
+
+
+class StagePipeline:
+    """以有界佇列串接、每階段一個執行緒的管線"""
+
+    def __init__(self, stages):
+        """
+        Args:
+            stages: [(名稱, 處理函數, 輸入佇列大小)]，依資料流動的順序排列
+        """
+        self.error = None
+        self._failed = threading.Event()
+        self._error_lock = threading.Lock()
+        self._queues = [queue.Queue(maxsize) for _, _, maxsize in stages]
+        self._threads = []
+        for i, (name, handler, _) in enumerate(stages):
+            outbox = self._queues[i + 1] if i + 1 < len(stages) else None
+            thread = threading.Thread(
+                target=self._run_stage, args=(handler, self._queues[i], outbox),
+                name=f"pipeline-{name}", daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _fail(self, error):
+        with self._error_lock:
+            if self.error is None:
+                self.error = error
+        self._failed.set()
+
+    def _put(self, q, item):
+        """放入佇列，佇列滿時等待；管線已停止時放棄並回傳 False"""
+        while not self._failed.is_set():
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._failed.is_set():
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _run_stage(self, handler, inbox, outbox):
+        try:
+            while True:
+                item = self._get(inbox)
+                if item is _DONE:
+                    break
+                for output in handler(item) or ():
+                    if outbox is not None and not self._put(outbox, output):
+                        return
+        except Exception as e:
+            self._fail(e)
+            return
+        if outbox is not None:
+            self._put(outbox, _DONE)
+
+    def put(self, item):
+        """送入第一個階段（可從多個執行緒呼叫）；佇列滿時等待，管線已停止時拋出造成停止的例外"""
+        if not self._put(self._queues[0], item):
+            raise self.error
+
+    def close(self):
+        """送出結束標記並等待所有階段處理完已送入的項目；有階段失敗時拋出該例外"""
+        self._put(self._queues[0], _DONE)
+        for thread in self._threads:
+            thread.join()
+        if self.error is not None:
+            raise self.error
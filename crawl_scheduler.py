@@ -0,0 +1,286 @@
+"""
+依帳號調整頻率的爬蟲排程
+
+每個帳號各自有下一次執行時間，放在 heap 中依時間取出。每次抓取後依照
+該帳號的發文頻率（由推文時間估計）與新增活動數調整下次間隔與抓取數量：
+
+- 有產生新活動的帳號縮短間隔（最短 min_interval_hours）
+- 連續沒有新活動的帳號以 2 的次方退避（最長 max_interval_hours）
+- 抓取數量依「發文頻率 × 間隔」估計，避免每次都捲動固定篇數
+- 下次執行時間加上隨機抖動，避免所有帳號擠在同一時間
+- 全域預算限制每小時最多執行幾次帳號抓取
+
+狀態保存在 metrics/scheduler_state.json，重新啟動後沿用先前學到的頻率。
+"""
+
+import heapq
+import json
+import math
+import os
+import random
+import time
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+
+from crawl_metrics import METRICS_DIR
+
+STATE_FILE = os.path.join(METRICS_DIR, 'scheduler_state.json')
+
+# 發文頻率與活動產出的指數移動平均權重
+EWMA_ALPHA = 0.3
+
+
+@dataclass(slots=True)
+class AccountSchedule:
+    """單一帳號的排程狀態"""
+    user_id: str
+    name: str = ''
+    next_run: float = 0.0
+    interval_s: float = 0.0
+    num_tweets: int = 0
+    posts_per_day: float | None = None
+    events_per_run: float | None = None
+    quiet_runs: int = 0
+    last_run: float | None = None
+    runs: int = 0
+
+    @classmethod
+    def from_dict(cls, data):
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+def estimate_posts_per_day(tweets_data):
+    """由推文的 post_time 估計每日發文數，資料不足時回傳 None"""
+    times = []
+    for tweet in tweets_data:
+        post_time = tweet.get('post_time')
+        if not post_time:
+            continue
+        try:
+            times.append(datetime.fromisoformat(post_time.replace('Z', '+00:00')).timestamp())
+        except ValueError:
+            continue
+    if len(times) < 2:
+        return None
+    span_days = (max(times) - min(times)) / 86400
+    if span_days <= 0:
+        return None
+    return (len(times) - 1) / span_days
+
+
+def _ewma(previous, value):
+    if value is None:
+        return previous
+    if previous is None:
+        return value
+    return EWMA_ALPHA * value + (1 - EWMA_ALPHA) * previous
+
+
+class CrawlScheduler:
+    """以 heap 管理各帳號下次執行時間的排程器"""
+
+    def __init__(self, base_interval_hours=6.0, base_num_tweets=10, min_interval_hours=1.0,
+                 max_interval_hours=72.0, min_tweets=10, max_tweets=200, jitter=0.15,
+                 budget_per_hour=20, state_file=STATE_FILE, rng=None):
+        """
+        Args:
+            base_interval_hours: 沒有歷史資料時的間隔（即 UI 上的爬蟲間隔）
+            base_num_tweets: 沒有歷史資料時的抓取數量（即 UI 上的抓取數量）
+            min_interval_hours / max_interval_hours: 間隔上下限
+            min_tweets / max_tweets: 抓取數量上下限
+            jitter: 下次執行時間的隨機抖動比例（0.15 = ±15%）
+            budget_per_hour: 每小時最多執行幾次帳號抓取，None 表示不限制
+            state_file: 狀態檔路徑，None 表示不保存
+            rng: random.Random 實例（測試時可固定種子）
+        """
+        self.base_interval_s = base_interval_hours * 3600
+        self.base_num_tweets = base_num_tweets
+        self.min_interval_s = min_interval_hours * 3600
+        self.max_interval_s = max_interval_hours * 3600
+        self.min_tweets = min_tweets
+        self.max_tweets = max(max_tweets, base_num_tweets)
+        self.jitter = jitter
+        self.budget_per_hour = budget_per_hour
+        self.state_file = state_file
+        self.rng = rng or random.Random()
+        self.accounts = {}
+        self._heap = []
+        self._recent_runs = []
+        self.load()
+
+    def configure(self, base_interval_hours, base_num_tweets):
+        """更新基準間隔與抓取數量（UI 上的設定變更時呼叫）"""
+        self.base_interval_s = base_interval_hours * 3600
+        self.base_num_tweets = base_num_tweets
+        self.max_tweets = max(self.max_tweets, base_num_tweets)
+
+    # ---- 狀態保存 ----
+
+    def load(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ 讀取排程狀態失敗，將重新學習: {e}")
+            return
+        for item in data.get('accounts', []):
+            account = AccountSchedule.from_dict(item)
+            self.accounts[account.user_id] = account
+            self._push(account)
+        self._recent_runs = [t for t in data.get('recent_runs', []) if t > time.time() - 3600]
+
+    def save(self):
+        if not self.state_file:
+            return
+        data = {
+            'accounts': [asdict(account) for account in self.accounts.values()],
+            'recent_runs': self._recent_runs,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+            tmp_path = f"{self.state_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, self.state_file)
+        except OSError as e:
+            print(f"⚠️ 儲存排程狀態失敗: {e}")
+
+    # ---- heap ----
+
+    def _push(self, account):
+        heapq.heappush(self._heap, (account.next_run, account.user_id))
+
+    def _peek(self):
+        """回傳最早到期的帳號；heap 中過期（已被重新排程或移除）的項目直接丟棄"""
+        while self._heap:
+            next_run, user_id = self._heap[0]
+            account = self.accounts.get(user_id)
+            if account is not None and account.next_run == next_run:
+                return account
+            heapq.heappop(self._heap)
+        return None
+
+    def sync_accounts(self, user_configs, now=None):
+        """與 user_config.json 同步：新帳號立即排入，已移除的帳號停止排程"""
+        now = time.time() if now is None else now
+        wanted = {config['user_id']: config.get('name', config['user_id']) for config in user_configs}
+        for user_id in list(self.accounts):
+            if user_id not in wanted:
+                del self.accounts[user_id]
+        for user_id, name in wanted.items():
+            account = self.accounts.get(user_id)
+            if account is None:
+                account = AccountSchedule(
+                    user_id=user_id, name=name, next_run=now,
+                    interval_s=self.base_interval_s, num_tweets=self.base_num_tweets,
+                )
+                self.accounts[user_id] = account
+                self._push(account)
+            else:
+                account.name = name
+
+    # ---- 取出到期帳號 ----
+
+    def _budget_wait(self, now):
+        """預算用完時回傳需等待的秒數，否則回傳 0"""
+        if not self.budget_per_hour:
+            return 0.0
+        self._recent_runs = [t for t in self._recent_runs if t > now - 3600]
+        if len(self._recent_runs) < self.budget_per_hour:
+            return 0.0
+        return self._recent_runs[0] + 3600 - now
+
+    def seconds_until_next(self, now=None):
+        """距離下一個帳號可執行還有幾秒（沒有帳號時回傳 None）"""
+        now = time.time() if now is None else now
+        account = self._peek()
+        if account is None:
+            return None
+        return max(account.next_run - now, self._budget_wait(now), 0.0)
+
+    def pop_due(self, now=None, limit=None):
+        """取出所有已到期（且在預算內）的帳號，依到期時間排序"""
+        now = time.time() if now is None else now
+        due = []
+        while limit is None or len(due) < limit:
+            account = self._peek()
+            if account is None or account.next_run > now or self._budget_wait(now) > 0:
+                break
+            heapq.heappop(self._heap)
+            self._recent_runs.append(now)
+            due.append(account)
+        return due
+
+    # ---- 依結果調整 ----
+
+    def record_run(self, user_id, tweets_data=None, events_added=0, now=None):
+        """記錄一次抓取結果並排定下次執行
+
+        Args:
+            user_id: 帳號 ID
+            tweets_data: 本次抓到的推文（用來估計發文頻率），SB 日曆等沒有推文的來源傳 None
+            events_added: 本次新增的活動數
+        """
+        now = time.time() if now is None else now
+        account = self.accounts.get(user_id)
+        if account is None:
+            return None
+
+        account.runs += 1
+        account.last_run = now
+        account.events_per_run = _ewma(account.events_per_run, events_added)
+        if tweets_data:
+            account.posts_per_day = _ewma(account.posts_per_day, estimate_posts_per_day(tweets_data))
+
+        if events_added:
+            account.quiet_runs = 0
+            # 產出越多，間隔越短
+            interval = self.base_interval_s / (1 + math.log1p(account.events_per_run or 0))
+        else:
+            account.quiet_runs += 1
+            interval = self.base_interval_s * (2 ** min(account.quiet_runs, 6))
+
+        if account.posts_per_day:
+            # 預計間隔內的發文數不應超過抓取上限，否則會漏抓
+            max_interval_for_rate = self.max_tweets / account.posts_per_day * 86400
+            interval = min(interval, max_interval_for_rate)
+        account.interval_s = min(max(interval, self.min_interval_s), self.max_interval_s)
+
+        account.num_tweets = self._estimate_num_tweets(account)
+        account.next_run = now + account.interval_s * (1 + self.rng.uniform(-self.jitter, self.jitter))
+        self._push(account)
+        self.save()
+        return account
+
+    def retry_later(self, user_id, delay_s=None, now=None):
+        """抓取失敗時重新排入，預設在最短間隔後重試"""
+        now = time.time() if now is None else now
+        account = self.accounts.get(user_id)
+        if account is None:
+            return
+        delay_s = self.min_interval_s if delay_s is None else delay_s
+        account.next_run = now + delay_s * (1 + self.rng.uniform(0, self.jitter))
+        self._push(account)
+        self.save()
+
+    def _estimate_num_tweets(self, account):
+        if not account.posts_per_day:
+            return self.base_num_tweets
+        # 間隔內預計的新推文數再加 50% 餘裕與固定的置頂/轉推緩衝
+        expected = account.posts_per_day * account.interval_s / 86400
+        return int(min(max(math.ceil(expected * 1.5) + 5, self.min_tweets), self.max_tweets))
+
+    def describe(self, now=None):
+        """各帳號排程的文字摘要，供 log 使用"""
+        now = time.time() if now is None else now
+        lines = []
+        for account in sorted(self.accounts.values(), key=lambda a: a.next_run):
+            rate = f"{account.posts_per_day:.1f}/天" if account.posts_per_day else "未知"
+            lines.append(
+                f"  {account.name}: {max(account.next_run - now, 0) / 3600:.1f} 小時後，"
+                f"間隔 {account.interval_s / 3600:.1f} 小時，抓取 {account.num_tweets} 篇，發文頻率 {rate}"
+            )
+        return '\n'.join(lines)
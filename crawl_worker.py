@@ -0,0 +1,715 @@
+"""
+在獨立子行程中執行爬蟲
+
+抓取、推文清理、datefinder 日期解析與 JSON 合併都很吃 CPU，在 Tk 行程的執行緒中
+執行會與 UI 搶 GIL，瀏覽器卡住時整個介面也跟著停住。這個模組讓瀏覽器與爬蟲
+流程都在子行程中執行，UI 只透過 multiprocessing 佇列溝通：
+
+- 指令佇列（UI → 子行程）：{'type': 'crawl' | 'login' | 'confirm_login' | 'shutdown', 'job_id', 'params'}
+- 進度佇列（子行程 → UI）：{'type': ..., 'time', ...}，例如 cycle_started、
+  account_started、account_finished、account_skipped、cycle_finished、error，
+  以及每個工作結束時的 job_finished / job_failed
+
+瀏覽器（profile1）只在子行程中開啟；同一個 profile 不能同時被兩個 Chrome 使用，
+因此登入也交給子行程執行：子行程的 stdin 不能用來等待使用者，'login' 只開啟登入頁
+就結束，使用者在 UI 確認登入完成後再送出 'confirm_login' 檢查登入狀態。
+取消採合作式：設定 cancel 事件後，捲動中的帳號在下一次捲動前停止（抓到一半的推文
+不合併，下次重新抓取），週期隨即結束；子行程沒有回應時可以 terminate() 並重新啟動。
+
+子行程內的週期以 crawl_pipeline.StagePipeline 分成瀏覽器、解析、寫檔三段，
+下一個帳號的捲動與上一個帳號的解析、寫檔同時進行（見 CrawlRunner.run_cycle）。
+"""
+
+import contextlib
+import functools
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+from datetime import datetime
+
+import pytz
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - seleniumbase 會安裝 psutil
+    psutil = None
+
+from browser_manager import BrowserManager, DriverLeaseTimeout, DriverPool
+from crawl_checkpoint import CrawlCheckpoint
+from crawl_metrics import CrawlMetrics
+from crawl_pipeline import StagePipeline
+from event_archive import ArchivedKeys, compact_outputs
+from event_cache import DEFAULT_CACHE_DIR
+from event_dedup import DuplicateIndex, event_key
+from event_index import load_outputs_index
+from event_model import load_event_file, save_event_file
+from file_lock import file_lock
+from SB_crawler import SB_VENUE_NAME, SBCrawler
+from tweet_parser import process_tweet_to_event
+
+# SB 日曆在排程器與檢查點中的識別碼（與 X 帳號一起處理）
+SB_SCHEDULE_ID = '__sb_calendar__'
+# 等待瀏覽器使用權的上限（秒）：登入時使用者在等，爬蟲則可以等較久
+LOGIN_LEASE_TIMEOUT = 120
+CRAWL_LEASE_TIMEOUT = 1800
+# 活動檔（熱資料）所在目錄
+OUTPUT_DIR = 'outputs'
+# 管線佇列大小：瀏覽器最多領先解析階段多少則推文、解析階段最多領先寫檔階段幾個帳號
+PARSE_QUEUE_SIZE = 200
+WRITE_QUEUE_SIZE = 2
+# 合併時間軸在進度與執行紀錄中的名稱
+COMBINED_LABEL = '合併時間軸'
+
+
+class CrawlCancelled(Exception):
+    """爬蟲週期被取消"""
+
+
+class CrawlRunner:
+    """一次爬蟲週期的實際流程（在子行程中執行，不依賴 tkinter）"""
+
+    def __init__(self, driver_pool, emit=None, cancel_event=None):
+        """
+        Args:
+            driver_pool: DriverPool，每個帳號各自取得瀏覽器使用權
+            emit: 接收進度事件 dict 的函數
+            cancel_event: threading/multiprocessing Event，設定後在下一次捲動前或帳號之間停止
+        """
+        self.driver_pool = driver_pool
+        self._emit = emit
+        self.cancel_event = cancel_event
+        self._duplicate_index = None  # 每個週期第一次合併時才建立
+
+    def emit(self, event_type, **fields):
+        if self._emit is not None:
+            self._emit({'type': event_type, 'time': time.time(), **fields})
+
+    def _is_cancelled(self):
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def _check_cancelled(self):
+        if self._is_cancelled():
+            raise CrawlCancelled()
+
+    def login(self):
+        """開啟 X 登入頁後立即返回，使用者在瀏覽器視窗中自行登入"""
+        with self.driver_pool.lease("手動登入", timeout=LOGIN_LEASE_TIMEOUT) as browser:
+            return {'opened': bool(browser.crawler.open_login_page())}
+
+    def confirm_login(self):
+        """使用者確認登入完成後，載入首頁檢查瀏覽器是否已登入"""
+        with self.driver_pool.lease("確認登入", timeout=LOGIN_LEASE_TIMEOUT) as browser:
+            return {'logged_in': bool(browser.crawler.is_logged_in())}
+
+    def run_cycle(self, user_configs, num_tweets=None, default_num_tweets=10, include_sb=True, combined=False, list_url=None):
+        """抓取帳號推文並合併活動
+
+        流程分成三段，以 StagePipeline 的有界佇列串接：
+        - 瀏覽器（本執行緒）：依序抓取各帳號的推文，每抓到一則就送進管線
+        - 解析：推文轉為活動，帳號抓完後寫入檢查點並交給寫檔階段
+        - 寫檔：讀取場地檔、合併、標記近似重複並寫回，完成後標記檢查點
+        第 N+1 個帳號的捲動與第 N 個帳號的解析、寫檔同時進行。SB 日曆在另一個執行緒中
+        排隊取得瀏覽器使用權，抓到的活動同樣交給寫檔階段。
+
+        combined=True 時所有帳號改由同一個合併時間軸（X 搜尋 from:a OR from:b，或指定的
+        X List）抓取，依推文作者分回各帳號；一次頁面載入與捲動取代每個帳號各一次。
+        合併時間軸完全沒有抓到推文時改回逐帳號抓取。
+
+        Args:
+            user_configs: 要抓取的帳號 [{'user_id', 'name'}]
+            num_tweets: {user_id: 抓取數量}，未指定的帳號使用 default_num_tweets
+            include_sb: 是否一併爬取 SB 玩具間日曆
+            combined: 是否使用合併時間軸
+            list_url: 合併時間軸使用的 X List 網址，未指定時使用搜尋
+
+        Returns:
+            dict: {'accounts': [{'user_id', 'name', 'tweets', 'events_added', 'post_times'}],
+                   'sb_events_added', 'cancelled', 'error', 'summary'}
+        """
+        num_tweets = num_tweets or {}
+        today = datetime.now(pytz.timezone('Asia/Taipei'))
+        result = {'accounts': [], 'sb_events_added': None, 'cancelled': False, 'error': None, 'summary': None}
+
+        # 上一個週期中途中斷時，跳過已完成的帳號並沿用已抓到的推文
+        cycle_accounts = [config['user_id'] for config in user_configs] + ([SB_SCHEDULE_ID] if include_sb else [])
+        checkpoint = CrawlCheckpoint.open(cycle_accounts)
+        if checkpoint.resumed:
+            print(f"爬蟲提示: 從上次中斷處繼續，已完成 {len(checkpoint.completed)} 個來源，剩餘 {len(checkpoint.remaining())} 個。")
+        self.emit('cycle_started', total=len(cycle_accounts), resumed=checkpoint.resumed)
+
+        metrics = CrawlMetrics('crawl')
+        error = None
+        self._duplicate_index = None
+        cycle = _CycleState(today, metrics, checkpoint, result, len(cycle_accounts))
+        pipeline = StagePipeline([
+            ('parse', functools.partial(self._parse_stage, cycle), PARSE_QUEUE_SIZE),
+            ('write', functools.partial(self._write_stage, cycle), WRITE_QUEUE_SIZE),
+        ])
+        sb_thread = None
+        try:
+            try:
+                if include_sb and not checkpoint.is_done(SB_SCHEDULE_ID):
+                    # 與 X 帳號同時排隊取得瀏覽器，抓完的活動交給寫檔階段
+                    sb_thread = threading.Thread(
+                        target=self._run_sb_fetch, args=(pipeline, metrics, len(user_configs), len(cycle_accounts)),
+                        name='crawl-sb', daemon=True,
+                    )
+                    sb_thread.start()
+
+                combined_accounts = []
+                for index, config in enumerate(user_configs):
+                    self._check_cancelled()
+                    if checkpoint.is_done(config['user_id']):
+                        print(f"⏭️ {config['name']} 已在上次中斷前完成，略過。")
+                        metrics.count('accounts_skipped_by_checkpoint')
+                        self.emit('account_skipped', name=config['name'], index=index, total=len(cycle_accounts))
+                        continue
+                    # 合併時間軸模式：檢查點中沒有待合併推文的帳號之後一起抓取
+                    if combined and checkpoint.pending_tweets(config['user_id']) is None:
+                        combined_accounts.append((index, config))
+                        continue
+                    self._crawl_account(config, index, num_tweets.get(config['user_id'], default_num_tweets),
+                                        metrics, checkpoint, pipeline, len(cycle_accounts))
+
+                if combined_accounts:
+                    limits = {config['user_id']: num_tweets.get(config['user_id'], default_num_tweets)
+                              for _, config in combined_accounts}
+                    if not self._scrape_combined(combined_accounts, limits, list_url, metrics, pipeline, len(cycle_accounts)):
+                        # 合併時間軸沒有任何帳號的推文（搜尋被限制、List 網址錯誤等）：改回逐帳號抓取
+                        for index, config in combined_accounts:
+                            self._check_cancelled()
+                            self._crawl_account(config, index, limits[config['user_id']],
+                                                metrics, checkpoint, pipeline, len(cycle_accounts))
+            finally:
+                # 取消或出錯時，已完整抓完的帳號仍會合併寫檔
+                if sb_thread is not None:
+                    sb_thread.join()
+                pipeline.close()
+
+            self._check_cancelled()
+            if not checkpoint.remaining():
+                checkpoint.finish()
+
+            # 將過去月份與已刪除的活動移到封存分區，熱資料檔維持精簡
+            with metrics.phase('compact'):
+                archived = compact_outputs(OUTPUT_DIR)
+            if archived:
+                metrics.count('events_archived', sum(archived.values()))
+                print(f"🗄️ 已封存 {sum(archived.values())} 個過去或已刪除的活動: {archived}")
+        except CrawlCancelled:
+            # 檢查點保留，下次執行從未完成的帳號繼續
+            print("爬蟲提示: 爬蟲已取消，未完成的帳號會在下次執行時繼續。")
+            error = "cancelled"
+            result['cancelled'] = True
+        except Exception as e:
+            error = e
+            result['error'] = str(e)
+            print(f"爬蟲執行錯誤: {e}")
+            traceback.print_exc()
+            self.emit('error', message=f"執行爬蟲時發生錯誤: {e}")
+        finally:
+            metrics.finish(error)
+            result['summary'] = metrics.summary()
+            print(result['summary'])
+        self.emit('cycle_finished', cancelled=result['cancelled'], error=result['error'], summary=result['summary'],
+                  events_added=sum(a['events_added'] for a in result['accounts']) + (result['sb_events_added'] or 0))
+        return result
+
+    def _get_duplicate_index(self):
+        """所有場地熱資料的近似重複索引（透過活動快照載入），同一週期內共用並隨新增活動更新"""
+        if self._duplicate_index is None:
+            try:
+                event_index = load_outputs_index(OUTPUT_DIR, cache_dir=DEFAULT_CACHE_DIR)
+            except OSError as e:
+                print(f"⚠️ 建立近似重複索引失敗: {e}")
+                event_index = ()
+            self._duplicate_index = DuplicateIndex(event_index)
+        return self._duplicate_index
+
+    def _crawl_account(self, config, index, num_tweets_to_get, metrics, checkpoint, pipeline, total):
+        """取得瀏覽器使用權後抓取單一帳號（見 _scrape_account），逾時時略過該帳號"""
+        self.emit('account_started', name=config['name'], index=index, total=total)
+        # 每個帳號各自取得瀏覽器使用權，登入與 SB 日曆等其他工作可以排在帳號之間執行
+        # （取得時會做健康檢查，必要時重新啟動，driver 可能因此換新）
+        try:
+            with self.driver_pool.lease(f"爬蟲:{config['name']}", timeout=CRAWL_LEASE_TIMEOUT, metrics=metrics) as browser:
+                with metrics.account_run(config['name']), metrics.track_driver(browser.driver):
+                    self._scrape_account(browser.crawler, config, index, num_tweets_to_get, metrics, checkpoint, pipeline)
+        except DriverLeaseTimeout as e:
+            print(f"⚠️ {e}，略過 {config['name']}。")
+            metrics.count('driver_lease_timeouts')
+            self.emit('error', message=str(e), name=config['name'])
+
+    def _scrape_combined(self, accounts, limits, list_url, metrics, pipeline, total):
+        """瀏覽器階段：從合併時間軸抓取多個帳號的推文，依作者送進管線
+
+        每個帳號最多保留 limits 中的數量，不在 accounts 中的作者（List 中的其他帳號）略過。
+
+        Returns:
+            bool: 合併時間軸完全沒有這些帳號的推文時回傳 False，由呼叫端改為逐帳號抓取
+        """
+        by_handle = {config['user_id'].lower(): config for _, config in accounts}
+        counts = dict.fromkeys(limits, 0)
+        self.emit('account_started', name=f"{COMBINED_LABEL}（{len(accounts)} 個帳號）", index=accounts[0][0], total=total)
+        try:
+            with self.driver_pool.lease(f"爬蟲:{COMBINED_LABEL}", timeout=CRAWL_LEASE_TIMEOUT, metrics=metrics) as browser:
+                with metrics.account_run(COMBINED_LABEL), metrics.track_driver(browser.driver):
+                    tweet_stream = browser.crawler.iter_combined_tweets(
+                        [config['user_id'] for _, config in accounts],
+                        num_tweets=sum(limits.values()),
+                        list_url=list_url,
+                        ignore_retweets=True,
+                        metrics=metrics,
+                        should_stop=self._is_cancelled,
+                        label=COMBINED_LABEL,
+                    )
+                    with contextlib.closing(tweet_stream):
+                        for tweet in tweet_stream:
+                            config = by_handle.get((tweet.get('author') or '').lower())
+                            if config is None:
+                                metrics.count('tweets_unattributed')
+                                continue
+                            user_id = config['user_id']
+                            if counts[user_id] >= limits[user_id]:
+                                continue
+                            counts[user_id] += 1
+                            pipeline.put(('tweet', user_id, config['name'], tweet))
+                            if all(counts[key] >= limits[key] for key in limits):
+                                break
+        except DriverLeaseTimeout as e:
+            # 逐帳號抓取也拿不到瀏覽器，這些帳號留到下次執行
+            print(f"⚠️ {e}，略過合併時間軸。")
+            metrics.count('driver_lease_timeouts')
+            self.emit('error', message=str(e), name=COMBINED_LABEL)
+            return True
+
+        if self._is_cancelled():
+            # 捲動途中被取消：抓到一半的推文不合併，下次重新抓取
+            for user_id in limits:
+                pipeline.put(('account_aborted', user_id))
+            raise CrawlCancelled()
+        if not any(counts.values()):
+            print(f"⚠️ {COMBINED_LABEL}沒有抓到任何帳號的推文，改為逐帳號抓取。")
+            metrics.count('combined_fallbacks')
+            return False
+        print(f"{COMBINED_LABEL}: " + "、".join(f"{config['name']} {counts[config['user_id']]} 則" for _, config in accounts))
+        for index, config in accounts:
+            pipeline.put(('account_done', config, index, True))
+        return True
+
+    def _scrape_account(self, crawler, config, index, num_tweets_to_get, metrics, checkpoint, pipeline):
+        """瀏覽器階段：抓取單一帳號的推文並逐則送進管線，抓完後送出帳號結束項目"""
+        venue = config['name']
+        # 檢查點中已有本帳號抓到但未合併的推文時直接沿用
+        pending_tweets = checkpoint.pending_tweets(config['user_id'])
+        if pending_tweets is not None:
+            print(f"♻️ 沿用檢查點中 {venue} 的 {len(pending_tweets)} 條推文，略過抓取。")
+            tweet_stream = pending_tweets
+        else:
+            print(f"正在抓取 {venue} (@{config['user_id']}) 的推文...")
+            tweet_stream = crawler.iter_x_tweets(
+                username=config['user_id'],
+                num_tweets=num_tweets_to_get,
+                debug=False,
+                ignore_retweets=True,
+                ignore_pinned=True,
+                metrics=metrics,
+                should_stop=self._is_cancelled,
+            )
+
+        # 推文一抓到就交給解析階段，佇列滿時在這裡等待（背壓）
+        for tweet in tweet_stream:
+            pipeline.put(('tweet', config['user_id'], venue, tweet))
+
+        if pending_tweets is None and self._is_cancelled():
+            # 捲動途中被取消：抓到一半的推文不合併也不寫入檢查點，下次重新抓取本帳號
+            pipeline.put(('account_aborted', config['user_id']))
+            raise CrawlCancelled()
+        pipeline.put(('account_done', config, index, pending_tweets is None))
+
+    def _parse_stage(self, cycle, item):
+        """解析階段：推文轉為活動，帳號結束時寫入檢查點並交給寫檔階段"""
+        kind = item[0]
+        if kind == 'tweet':
+            _, user_id, venue, tweet = item
+            tweets_data, new_events = cycle.parsing.setdefault(user_id, ([], []))
+            tweets_data.append(tweet)
+            with cycle.metrics.phase('parse', account=venue):
+                event = process_tweet_to_event(tweet, venue, cycle.today)
+            if event:
+                new_events.append(event)
+            return []
+        if kind == 'account_aborted':
+            cycle.parsing.pop(item[1], None)
+            return []
+        if kind == 'account_done':
+            _, config, index, scraped = item
+            tweets_data, new_events = cycle.parsing.pop(config['user_id'], ([], []))
+            if scraped and tweets_data:
+                cycle.checkpoint.save_tweets(config['user_id'], tweets_data)
+            return [('merge', config, index, tweets_data, new_events)]
+        return [item]  # SB 的活動直接交給寫檔階段
+
+    def _write_stage(self, cycle, item):
+        """寫檔階段：合併活動並寫回場地檔，完成後標記檢查點並回報進度"""
+        if item[0] == 'sb':
+            self._save_sb_events(cycle, *item[1:])
+            return []
+        _, config, index, tweets_data, new_events = item
+        venue = config['name']
+        events_added = self._merge_account(venue, tweets_data, new_events, cycle.metrics)
+        cycle.checkpoint.mark_done(config['user_id'])
+        cycle.result['accounts'].append({
+            'user_id': config['user_id'],
+            'name': venue,
+            'tweets': len(tweets_data),
+            'events_added': events_added,
+            'post_times': [tweet.get('post_time') for tweet in tweets_data],
+        })
+        self.emit('account_finished', name=venue, index=index, total=cycle.total,
+                  tweets=len(tweets_data), events_added=events_added)
+        return []
+
+    def _merge_account(self, venue, tweets_data, new_events, metrics):
+        """將單一帳號解析出的活動合併進該場地的活動檔，回傳新增活動數"""
+        if not tweets_data:
+            print(f"在 {venue} 的頁面沒有抓取到新的推文。")
+            return 0
+
+        if not new_events:
+            print(f"在 {venue} 的推文中沒有找到包含日期的事件。")
+            return 0
+
+        print(f"從 {len(tweets_data)} 條推文中提取了 {len(new_events)} 個事件")
+
+        output_dir = OUTPUT_DIR
+        os.makedirs(output_dir, exist_ok=True)
+        json_filename = os.path.join(output_dir, f"{venue}_events.json")
+
+        # 1~3 在檔案鎖內完成讀取、合併與寫回，UI 同時編輯同一個場地也不會互相覆蓋
+        with file_lock(json_filename):
+            # 1. Load existing events
+            existing_events = []
+            with metrics.phase('load', account=venue):
+                try:
+                    existing_events = load_event_file(json_filename, venue=venue)
+                except json.JSONDecodeError as e:
+                    print(f"載入現有事件時發生錯誤: {e}")
+                    traceback.print_exc()
+            existing_event_texts = {event.text for event in existing_events}
+            # 已封存（過去月份或已刪除）的活動不在熱資料檔中，另外以去重鍵檢查
+            archived_keys = ArchivedKeys.load(output_dir, venue)
+
+            # 2. Merge new events, avoiding duplicates
+            with metrics.phase('merge', account=venue):
+                unique_new_events = []
+                for event in new_events:
+                    if event.text not in existing_event_texts and not archived_keys.has_text(event.text):
+                        unique_new_events.append(event)
+                        existing_event_texts.add(event.text)
+
+            # 內容相近的活動（預告、提醒、其他場地轉發）仍會加入，但標記 duplicate_of，
+            # 在 UI 的「檢查重複活動」中一起處理
+            with metrics.phase('dedup', account=venue):
+                duplicate_index = self._get_duplicate_index()
+                near_duplicates = 0
+                for event in unique_new_events:
+                    matches = duplicate_index.add(event)
+                    if matches:
+                        event.extra['duplicate_of'] = event_key(matches[0][0])
+                        near_duplicates += 1
+            if near_duplicates:
+                print(f"其中 {near_duplicates} 個與既有活動內容相近，已標記為可能重複")
+                metrics.count('near_duplicates', near_duplicates, account=venue)
+
+            print(f"新增 {len(unique_new_events)} 個新事件到 {venue}")
+            metrics.count('events_added', len(unique_new_events), account=venue)
+            final_events = existing_events + unique_new_events
+
+            # 3. Overwrite the file with the merged list
+            with metrics.phase('write', account=venue):
+                bytes_written = save_event_file(json_filename, final_events)
+        metrics.count('bytes_written', bytes_written, account=venue)
+        return len(unique_new_events)
+
+    def _run_sb_fetch(self, pipeline, metrics, index, total):
+        """SB 日曆執行緒：取得瀏覽器使用權後爬取日曆，活動交給寫檔階段
+
+        SB 爬蟲會暫時調整視窗大小，因此一定要在取得使用權的 driver 上執行；
+        只有一個瀏覽器時，它會排在某兩個帳號之間。
+        """
+        sb_crawler, events = None, None
+        try:
+            with self.driver_pool.lease("爬蟲:SB 日曆", timeout=CRAWL_LEASE_TIMEOUT, metrics=metrics) as browser:
+                if self._is_cancelled():
+                    return
+                print("爬蟲提示: 開始爬取 SB 玩具間活動...")
+                self.emit('account_started', name=SB_VENUE_NAME, index=index, total=total)
+                with metrics.account_run(SB_VENUE_NAME), metrics.track_driver(browser.driver):
+                    sb_crawler, events = self._scrape_sb_events(browser.driver, metrics)
+        except DriverLeaseTimeout as e:
+            print(f"⚠️ {e}，略過 SB 玩具間。")
+            metrics.count('driver_lease_timeouts')
+            self.emit('error', message=str(e), name=SB_VENUE_NAME)
+        try:
+            pipeline.put(('sb', sb_crawler, events, index))
+        except Exception:
+            pass  # 管線已因其他錯誤停止，錯誤由 close() 回報
+
+    def _scrape_sb_events(self, driver, metrics=None):
+        """爬取 SB 玩具間活動，回傳 (SBCrawler, 活動列表)，失敗時回傳 (None, None)"""
+        try:
+            print("⏳ 正在爬取 SB 玩具間活動...")
+            sb_crawler = SBCrawler(driver=driver)
+            return sb_crawler, sb_crawler.scrape_events(metrics=metrics)
+        except Exception as e:
+            print(f"❌ 爬取 SB 玩具間活動時出錯: {e}")
+            traceback.print_exc()
+            # 不要中斷整個爬蟲流程，只是記錄錯誤
+            return None, None
+
+    def _save_sb_events(self, cycle, sb_crawler, events, index):
+        """寫檔階段：合併 SB 玩具間活動並回報進度，失敗時新增數為 None"""
+        sb_events_added = None
+        if sb_crawler is not None:
+            try:
+                if events:
+                    # 儲存活動（自動合併現有資料）
+                    sb_crawler.save_events(events, merge_existing=True, metrics=cycle.metrics)
+                    print(f"✅ 成功爬取 {len(events)} 個 SB 玩具間活動")
+                else:
+                    print("⚠️ 沒有爬取到 SB 玩具間活動")
+                sb_events_added = sb_crawler.last_events_added
+            except Exception as e:
+                print(f"❌ 儲存 SB 玩具間活動時出錯: {e}")
+                traceback.print_exc()
+        if sb_events_added is not None:
+            cycle.checkpoint.mark_done(SB_SCHEDULE_ID)
+        cycle.result['sb_events_added'] = sb_events_added
+        self.emit('account_finished', name=SB_VENUE_NAME, index=index, total=cycle.total,
+                  tweets=0, events_added=sb_events_added or 0)
+
+
+class _CycleState:
+    """一次週期中各管線階段共用的狀態（解析與寫檔各自只在自己的執行緒中修改）"""
+
+    def __init__(self, today, metrics, checkpoint, result, total):
+        self.today = today
+        self.metrics = metrics
+        self.checkpoint = checkpoint
+        self.result = result
+        self.total = total
+        self.parsing = {}  # 解析中的帳號 {user_id: (推文列表, 活動列表)}
+
+
+def worker_main(command_queue, progress_queue, cancel_event, user_data_dir="profile1", locale_code='zh-TW'):
+    """子行程進入點：開啟瀏覽器後依序執行指令佇列中的工作"""
+    from UCanScrapeX import XCrawler
+
+    def emit(event):
+        progress_queue.put(event)
+
+    try:
+        crawler = XCrawler(user_data_dir=user_data_dir, locale_code=locale_code)
+    except Exception as e:
+        emit({'type': 'worker_failed', 'time': time.time(), 'error': f"瀏覽器啟動失敗: {e}"})
+        return
+    driver_pool = DriverPool([BrowserManager(crawler)])
+    runner = CrawlRunner(driver_pool, emit=emit, cancel_event=cancel_event)
+    emit({'type': 'worker_ready', 'time': time.time(), 'pid': os.getpid()})
+
+    try:
+        while True:
+            command = command_queue.get()
+            if command['type'] == 'shutdown':
+                break
+            job_id = command.get('job_id')
+            try:
+                if command['type'] == 'crawl':
+                    job_result = runner.run_cycle(**command.get('params', {}))
+                elif command['type'] == 'login':
+                    job_result = runner.login()
+                elif command['type'] == 'confirm_login':
+                    job_result = runner.confirm_login()
+                else:
+                    raise ValueError(f"未知的指令: {command['type']}")
+                emit({'type': 'job_finished', 'time': time.time(), 'job_id': job_id, 'result': job_result})
+            except Exception as e:
+                traceback.print_exc()
+                emit({'type': 'job_failed', 'time': time.time(), 'job_id': job_id, 'error': str(e)})
+            finally:
+                cancel_event.clear()
+    finally:
+        crawler.close()
+
+
+class CrawlWorkerClient:
+    """UI 端：管理爬蟲子行程、送出工作並接收進度事件
+
+    進度事件由背景執行緒從佇列取出後交給 on_event（注意：on_event 不在 Tk 主執行緒中
+    被呼叫，只應把事件放進執行緒安全的佇列）。
+    """
+
+    def __init__(self, user_data_dir="profile1", locale_code='zh-TW', on_event=None):
+        self.user_data_dir = user_data_dir
+        self.locale_code = locale_code
+        self.on_event = on_event
+        # spawn 在各平台行為一致，子行程不會繼承 Tk 與執行緒的狀態
+        self._ctx = multiprocessing.get_context('spawn')
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._waiters = {}
+        self._results = {}
+        self.process = None
+        self._reader = None
+        self._stopping = False
+
+    # ---- 行程管理 ----
+
+    def start(self):
+        with self._lock:
+            if self.process is not None and self.process.is_alive():
+                return
+            self._stopping = False
+            self.command_queue = self._ctx.Queue()
+            self.progress_queue = self._ctx.Queue()
+            self.cancel_event = self._ctx.Event()
+            self.process = self._ctx.Process(
+                target=worker_main,
+                args=(self.command_queue, self.progress_queue, self.cancel_event, self.user_data_dir, self.locale_code),
+                name='crawl-worker',
+                daemon=True,
+            )
+            self.process.start()
+            self._reader = threading.Thread(
+                target=self._read_progress, args=(self.process, self.progress_queue), daemon=True
+            )
+            self._reader.start()
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def stop(self, timeout=30):
+        """要求子行程結束（目前的工作會先被取消），逾時則強制結束"""
+        if not self.is_alive():
+            return
+        self._stopping = True
+        self.cancel_event.set()
+        self.command_queue.put({'type': 'shutdown'})
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.terminate()
+
+    def terminate(self):
+        """強制結束子行程，連同其開啟的 chromedriver/Chrome"""
+        if self.process is None:
+            return
+        self._stopping = True
+        children = []
+        if psutil is not None and self.process.pid:
+            try:
+                children = psutil.Process(self.process.pid).children(recursive=True)
+            except Exception:
+                children = []
+        self.process.terminate()
+        self.process.join(10)
+        for child in children:
+            try:
+                child.kill()
+            except Exception:
+                continue
+
+    def restart(self):
+        self.terminate()
+        self.start()
+
+    # ---- 工作 ----
+
+    def submit(self, job_type, **params):
+        """送出工作，回傳 job_id；子行程沒有在執行時會先啟動"""
+        if not self.is_alive():
+            self.start()
+        job_id = next(self._job_ids)
+        with self._lock:
+            # 沒有進行中的工作時，之前留下的取消要求不能套用到這個新工作
+            if not any(not waiter.is_set() for waiter in self._waiters.values()):
+                self.cancel_event.clear()
+            self._waiters[job_id] = threading.Event()
+        self.command_queue.put({'type': job_type, 'job_id': job_id, 'params': params})
+        return job_id
+
+    def wait(self, job_id, timeout=None):
+        """等待工作結束，回傳 job_finished/job_failed 事件；逾時回傳 None"""
+        with self._lock:
+            waiter = self._waiters.get(job_id)
+        if waiter is None or not waiter.wait(timeout):
+            return None
+        with self._lock:
+            self._waiters.pop(job_id, None)
+            return self._results.pop(job_id, None)
+
+    def run(self, job_type, timeout=None, **params):
+        return self.wait(self.submit(job_type, **params), timeout)
+
+    def cancel(self, force_after=None):
+        """合作式取消目前的工作；指定 force_after 秒後子行程仍在工作就強制重新啟動
+
+        子行程閒置（沒有進行中或排隊的工作）時不做任何事，避免取消到之後才送出的工作。
+        """
+        if not self.is_alive() or not self._pending_jobs():
+            return
+        self.cancel_event.set()
+        if force_after is not None:
+            def _force():
+                if self.cancel_event.is_set() and self.is_alive() and self._pending_jobs():
+                    print("⚠️ 爬蟲子行程沒有回應取消要求，強制重新啟動。")
+                    self.restart()
+            timer = threading.Timer(force_after, _force)
+            timer.daemon = True
+            timer.start()
+
+    def _pending_jobs(self):
+        with self._lock:
+            return [job_id for job_id, waiter in self._waiters.items() if not waiter.is_set()]
+
+    # ---- 進度 ----
+
+    def _finish_job(self, job_id, event):
+        with self._lock:
+            self._results[job_id] = event
+            waiter = self._waiters.get(job_id)
+        if waiter is not None:
+            waiter.set()
+
+    def _read_progress(self, process, progress_queue):
+        while True:
+            try:
+                event = progress_queue.get(timeout=0.5)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                # 子行程結束（正常關閉、當掉或被強制結束）：讓等待中的工作返回
+                for job_id in self._pending_jobs():
+                    self._finish_job(job_id, {'type': 'job_failed', 'job_id': job_id, 'error': '爬蟲子行程已結束'})
+                expected = self._stopping or process is not self.process
+                self._dispatch({'type': 'worker_exited', 'time': time.time(),
+                                'exitcode': process.exitcode, 'expected': expected})
+                return
+            except (EOFError, OSError):
+                return
+            if event.get('type') in ('job_finished', 'job_failed'):
+                self._finish_job(event.get('job_id'), event)
+            self._dispatch(event)
+
+    def _dispatch(self, event):
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(event)
+        except Exception:
+            traceback.print_exc()
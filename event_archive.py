@@ -0,0 +1,215 @@
+"""
+活動封存：熱資料與冷資料分區
+
+每個場地的 outputs/<venue>_events.json 只保留「熱」活動：本月起（含本月）未刪除的
+活動，以及尚未填上日期、等待校正的活動。整理（compact）時，過去月份的活動與
+已刪除的活動會移到冷資料分區：
+
+    outputs/archive/<venue>/<YYYY-MM>.json   # 依活動月份分區
+    outputs/archive/<venue>/undated.json     # 沒有日期的已刪除活動
+
+UI 與網站同步預設只讀取熱資料，歷史活動用 load_archive() 依場地、月份範圍查詢。
+熱資料的大小只與近期活動數有關，歷史累積多年後載入與同步的成本也不會增加。
+
+封存後熱資料檔不再有這些活動，爬蟲合併時原本靠「檔案中已有相同活動」避免重複，
+因此另外保存已封存活動的去重鍵（outputs/archive/<venue>/_keys.json），
+讓已刪除或已封存的活動不會被重新爬到而加回熱資料。
+"""
+
+import hashlib
+import json
+import os
+from contextlib import ExitStack
+from datetime import datetime
+
+import pytz
+
+from event_model import event_file_version, load_event_file, save_event_files
+from file_lock import file_lock
+
+ARCHIVE_DIRNAME = 'archive'
+UNDATED_PARTITION = 'undated'
+KEYS_FILENAME = '_keys.json'
+
+
+def archive_dir(outputs_dir, venue):
+    return os.path.join(outputs_dir, ARCHIVE_DIRNAME, venue)
+
+
+def partition_path(outputs_dir, venue, partition):
+    return os.path.join(archive_dir(outputs_dir, venue), f"{partition}.json")
+
+
+def _partition_of(event):
+    return event.date[:7] if event.date else UNDATED_PARTITION
+
+
+def _hash(value):
+    return hashlib.sha1(value.encode('utf-8')).hexdigest()[:16]
+
+
+def month_key(today, offset=0):
+    """today 所在月份加上 offset 個月的 'YYYY-MM'（offset 可為負數）"""
+    index = today.year * 12 + today.month - 1 + offset
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def is_hot(event, month_start):
+    """是否留在熱資料：未刪除，且日期在本月以後或沒有日期（等待校正）"""
+    return not event.delete and (event.date is None or event.date >= month_start)
+
+
+class ArchivedKeys:
+    """已封存活動的去重鍵（活動文字，以及 SB 日曆使用的日期 + 標題）"""
+
+    def __init__(self, texts=(), date_titles=()):
+        self.texts = set(texts)
+        self.date_titles = set(date_titles)
+
+    @classmethod
+    def load(cls, outputs_dir, venue):
+        path = os.path.join(archive_dir(outputs_dir, venue), KEYS_FILENAME)
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ 讀取封存去重鍵失敗: {e}")
+            return cls()
+        return cls(data.get('texts', []), data.get('date_titles', []))
+
+    def save(self, outputs_dir, venue):
+        path = os.path.join(archive_dir(outputs_dir, venue), KEYS_FILENAME)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'texts': sorted(self.texts), 'date_titles': sorted(self.date_titles)}, f)
+        os.replace(tmp_path, path)
+
+    def add(self, event):
+        if event.text:
+            self.texts.add(_hash(event.text))
+        if event.date and event.title:
+            self.date_titles.add(_hash(f"{event.date}|{event.title}"))
+
+    def has_text(self, text):
+        return bool(text) and _hash(text) in self.texts
+
+    def has_date_title(self, date, title):
+        return bool(date and title) and _hash(f"{date}|{title}") in self.date_titles
+
+
+def compact_venue(outputs_dir, venue, today=None):
+    """將某場地熱資料中過去月份與已刪除的活動移到冷資料分區，回傳移動的活動數
+
+    熱資料檔、各分區與去重鍵在同一組檔案鎖內更新；活動檔以 save_event_files
+    一次替換，中途失敗時熱資料與分區都維持原狀。
+    """
+    if today is None:
+        today = datetime.now(pytz.timezone('Asia/Taipei'))
+    month_start = f"{month_key(today)}-01"
+    hot_path = os.path.join(outputs_dir, f"{venue}_events.json")
+
+    with ExitStack() as stack:
+        stack.enter_context(file_lock(hot_path))
+        events = load_event_file(hot_path, venue=venue)
+        hot = []
+        cold = {}
+        for event in events:
+            if is_hot(event, month_start):
+                hot.append(event)
+            else:
+                cold.setdefault(_partition_of(event), []).append(event)
+        if not cold:
+            return 0
+
+        files = {hot_path: hot}
+        keys = ArchivedKeys.load(outputs_dir, venue)
+        for partition, moved in cold.items():
+            path = partition_path(outputs_dir, venue, partition)
+            stack.enter_context(file_lock(path))
+            archived = load_event_file(path, venue=venue)
+            # 同一個活動已在分區中時（例如封存後被重新爬到），以熱資料中較新的版本取代。
+            # 以 (日期, text) 比對：固定舉辦的活動每次的 text 相同，只比 text 會互相覆蓋；
+            # 每筆分區中原有的活動最多被取代一次，熱資料中重複的活動也都會保留
+            position = {}
+            for i, event in enumerate(archived):
+                position.setdefault((event.date, event.text), []).append(i)
+            for event in moved:
+                matches = position.get((event.date, event.text))
+                if matches:
+                    archived[matches.pop(0)] = event
+                else:
+                    archived.append(event)
+                keys.add(event)
+            archived.sort(key=lambda e: e.date_key)
+            files[path] = archived
+
+        # 先寫去重鍵：就算之後寫入失敗，多出來的鍵也只會讓爬蟲略過已在熱資料中的活動
+        keys.save(outputs_dir, venue)
+        save_event_files(files)
+    return len(events) - len(hot)
+
+
+def compact_outputs(outputs_dir='./outputs', today=None):
+    """整理所有場地，回傳 {場地: 移動的活動數}（只列出有移動的場地）"""
+    moved = {}
+    for filename in sorted(os.listdir(outputs_dir)):
+        if not filename.endswith('_events.json'):
+            continue
+        venue = filename.replace('_events.json', '')
+        try:
+            count = compact_venue(outputs_dir, venue, today)
+        except Exception as e:
+            print(f"⚠️ 封存 {venue} 的活動時發生錯誤: {e}")
+            continue
+        if count:
+            moved[venue] = count
+    return moved
+
+
+def list_partitions(outputs_dir, venue=None):
+    """列出冷資料分區，回傳 [(場地, 分區名稱, 檔案路徑)]，依場地與月份排序"""
+    root = os.path.join(outputs_dir, ARCHIVE_DIRNAME)
+    if not os.path.isdir(root):
+        return []
+    venues = [venue] if venue is not None else sorted(os.listdir(root))
+    partitions = []
+    for venue_name in venues:
+        directory = os.path.join(root, venue_name)
+        if not os.path.isdir(directory):
+            continue
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith('.json') and filename != KEYS_FILENAME:
+                partitions.append((venue_name, filename[:-len('.json')], os.path.join(directory, filename)))
+    return partitions
+
+
+def archive_versions(outputs_dir, venue=None):
+    """各分區的 event_file_version()，可用來判斷快取的歷史資料是否需要重新讀取"""
+    return {path: event_file_version(path) for _, _, path in list_partitions(outputs_dir, venue)}
+
+
+def load_archive(outputs_dir, venue=None, start=None, end=None, include_deleted=False):
+    """讀取歷史活動
+
+    Args:
+        venue: 只讀取某個場地
+        start / end: 月份範圍（'YYYY-MM'，含頭尾）；指定 start 時不含沒有日期的分區
+        include_deleted: 是否包含已刪除的活動
+    """
+    events = []
+    for venue_name, partition, path in list_partitions(outputs_dir, venue):
+        if partition == UNDATED_PARTITION:
+            if start is not None:
+                continue
+        elif (start is not None and partition < start) or (end is not None and partition > end):
+            continue
+        try:
+            for event in load_event_file(path, venue=venue_name):
+                if include_deleted or not event.delete:
+                    events.append(event)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ 讀取封存檔 {path} 時發生錯誤: {e}")
+    return events
@@ -0,0 +1,143 @@
+"""
+批次修改活動
+
+在場地列表中選取多個日期後，一次套用同一個操作（校正、刪除/取消刪除、設定類別、
+依規則自動分類、日期平移）。每個受影響的檔案只讀取與寫入一次：先在記憶體中修改
+所有活動，全部檔案都寫入暫存檔成功後才一起替換（save_event_files），中途失敗時
+不會只改到一部分的檔案。
+
+選取是依畫面上的日期而來，若檔案在載入後被爬蟲修改過（例如同一天新增了活動），
+套用到檔案上的範圍就會與使用者看到的不同，因此可傳入載入時的版本，
+不符時拋出 EventFileConflict。
+"""
+
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from event_categorizer import categorize_event
+from event_model import NO_DATE, event_file_version, load_event_file, save_event_files
+from file_lock import file_lock
+
+# 操作代碼 → 顯示名稱
+BATCH_ACTIONS = {
+    'check': '標記為已校正',
+    'delete': '標記刪除',
+    'undelete': '取消刪除',
+    'category': '設定類別',
+    'auto_category': '依規則自動分類',
+    'shift_date': '日期平移',
+}
+
+
+@dataclass(slots=True)
+class BatchResult:
+    """批次操作的結果"""
+    action: str
+    changed: int
+    files: dict  # {檔案路徑: 修改後的完整活動列表}
+    bytes_written: int = 0
+    versions: dict = field(default_factory=dict)  # {檔案路徑: 寫入後的 event_file_version()}
+
+
+def _shift(date_str, days):
+    return (datetime.strptime(date_str, '%Y-%m-%d') + timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+def _make_edit(action, value):
+    """回傳修改單一活動的函數，函數回傳該活動是否有變動"""
+    if action == 'check':
+        def edit(event):
+            changed, event.check = not event.check, True
+            return changed
+    elif action in ('delete', 'undelete'):
+        flag = action == 'delete'
+
+        def edit(event):
+            changed, event.delete = event.delete != flag, flag
+            return changed
+    elif action == 'category':
+        if not value:
+            raise ValueError("請指定類別。")
+
+        def edit(event):
+            changed, event.category = event.category != value, value
+            return changed
+    elif action == 'auto_category':
+        def edit(event):
+            # 只分類還沒有類別的活動，不覆蓋人工設定的類別
+            if event.category:
+                return False
+            event.category = categorize_event(event.title or event.text)
+            return event.category is not None
+    elif action == 'shift_date':
+        days = int(value or 0)
+
+        def edit(event):
+            if not days or not event.date:
+                return False  # 沒有日期的活動不平移
+            event.date = _shift(event.date, days)
+            return True
+    else:
+        raise ValueError(f"未知的批次操作: {action}")
+    return edit
+
+
+def apply_batch(selections, action, value=None, expected_versions=None):
+    """對選取的日期上的活動套用批次操作，每個檔案只寫入一次
+
+    Args:
+        selections: {檔案路徑: 日期鍵集合}，日期鍵與 UI 相同（沒有日期為 'N/A'）
+        action: BATCH_ACTIONS 中的操作代碼
+        value: 'category' 的類別代碼，或 'shift_date' 的天數（可為負數）；其他操作不需要
+        expected_versions: {檔案路徑: 載入時的 event_file_version()}（可選）
+
+    Returns:
+        BatchResult；files 中是修改後的完整活動列表，呼叫端可直接更新畫面而不需重新讀檔
+    """
+    # 'undelete' 針對已刪除的活動，其他操作只針對目前顯示中（未刪除）的活動
+    want_deleted = action == 'undelete'
+
+    def selected(filepath, event):
+        return event.delete == want_deleted and (event.date or NO_DATE) in selections[filepath]
+    return _apply(selections, selected, action, value, expected_versions)
+
+
+def apply_to_events(events, action, value=None, expected_versions=None):
+    """對指定的活動（以 source_file、日期與 text 識別）套用批次操作，例如處理近似重複的活動
+
+    固定舉辦的活動每次的 text 相同，只比 text 會連其他日期的同名活動一起修改。
+    參數與回傳值同 apply_batch。
+    """
+    targets = {}
+    for event in events:
+        targets.setdefault(event.source_file, set()).add((event.date, event.text))
+
+    def selected(filepath, event):
+        return (event.date, event.text) in targets[filepath]
+    return _apply(targets, selected, action, value, expected_versions)
+
+
+def _apply(filepaths, selected, action, value, expected_versions):
+    edit = _make_edit(action, value)
+    files = {}
+    changed = 0
+    with ExitStack() as stack:
+        # 讀取到寫入之間持有所有檔案的鎖，爬蟲無法在中間插入寫入
+        for filepath in sorted(filepaths):
+            stack.enter_context(file_lock(filepath))
+        for filepath in filepaths:
+            events = load_event_file(filepath)
+            file_changed = 0
+            for event in events:
+                if selected(filepath, event) and edit(event):
+                    file_changed += 1
+            if file_changed:
+                files[filepath] = events
+                changed += file_changed
+
+        result = BatchResult(action=action, changed=changed, files=files)
+        if files:
+            result.bytes_written = save_event_files(files, expected_versions)
+            result.versions = {filepath: event_file_version(filepath) for filepath in files}
+    return result
@@ -0,0 +1,133 @@
+"""
+活動快照快取
+
+每次啟動或重新整理時，UI 都要把 outputs/*_events.json（縮排過的 JSON）全部解析一次。
+EventSnapshot 把解析並依日期分組後的結果存成單一個 pickle 檔（.cache/ 下），
+並記錄每個來源檔的指紋：
+
+- event_file_version()（inode、修改時間、大小）相同時，直接信任快照中的活動
+- 版本不同時讀取原始檔案並計算 SHA-1；內容沒變（例如只是被重新寫入一次）仍沿用快照
+- 內容改變時才重新解析該檔案，其他檔案維持快照內容
+
+快照只在本機由本程式寫入與讀取；格式不符、檔案損毀或讀取失敗時一律當作沒有快照，
+回到逐檔解析，不會影響資料本身。
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+
+from event_model import EVENT_FIELDS, Event, event_file_version, events_from_json
+
+DEFAULT_CACHE_DIR = '.cache'
+SNAPSHOT_FORMAT = 1  # 快照內容的格式版本，結構改變時遞增，舊快照會被忽略
+
+
+def snapshot_path(outputs_dir, cache_dir=DEFAULT_CACHE_DIR):
+    """每個 outputs 目錄各自一個快照檔"""
+    digest = hashlib.sha1(os.path.abspath(outputs_dir).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_dir, f"events_{digest}.pickle")
+
+
+def _to_row(event):
+    return tuple(getattr(event, name) for name in EVENT_FIELDS) + (event.extra,)
+
+
+def _group_rows(events):
+    """依日期鍵分組：[(日期鍵, [活動 row, ...]), ...]，同一天保持檔案中的順序"""
+    groups = {}
+    for event in events:
+        groups.setdefault(event.date_key, []).append(_to_row(event))
+    # NO_DATE ('N/A') 以字串比較也大於所有日期，排在最後
+    return sorted(groups.items())
+
+
+def _events_from_groups(groups, source_file):
+    intern = sys.intern
+    events = []
+    for _, rows in groups:
+        for row in rows:
+            event = Event(*row[:-1], source_file=source_file, extra=dict(row[-1]) if row[-1] else {})
+            event.venue = intern(event.venue)
+            if event.category:
+                event.category = intern(event.category)
+            events.append(event)
+    return events
+
+
+class EventSnapshot:
+    """outputs 目錄的快照；load_file() 取得活動，save() 在有變動時寫回"""
+
+    def __init__(self, path, files=None):
+        self.path = path
+        self._files = files or {}  # {檔名: (版本, SHA-1, 分組後的 rows)}
+        self._seen = set()
+        self._dirty = False
+        self.hits = 0
+        self.reparsed = 0
+
+    @classmethod
+    def open(cls, outputs_dir, cache_dir=DEFAULT_CACHE_DIR):
+        """讀取快照（一次讀取整個檔案），沒有或無法使用時回傳空的快照"""
+        path = snapshot_path(outputs_dir, cache_dir)
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+            if data.get('format') == SNAPSHOT_FORMAT:
+                return cls(path, data['files'])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ 活動快照無法使用，將重新解析所有檔案: {e}")
+        return cls(path)
+
+    def load_file(self, filepath, venue):
+        """取得檔案的 (版本, 依日期排序的活動列表)，只在內容改變時重新解析
+
+        JSON 格式錯誤時拋出 json.JSONDecodeError（與 load_event_file 相同）。
+        """
+        filename = os.path.basename(filepath)
+        self._seen.add(filename)
+        # 先取版本再讀取：讀取期間被替換時版本會過期，之後的寫入檢查會失敗而不是覆蓋
+        version = event_file_version(filepath)
+        cached = self._files.get(filename)
+        if cached is not None and cached[0] == version:
+            self.hits += 1
+            return version, _events_from_groups(cached[2], filepath)
+
+        with open(filepath, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha1(content).hexdigest()
+        self._dirty = True
+        if cached is not None and cached[1] == digest:
+            self.hits += 1
+            self._files[filename] = (version, digest, cached[2])
+            return version, _events_from_groups(cached[2], filepath)
+
+        self.reparsed += 1
+        text = content.decode('utf-8')
+        events = events_from_json(json.loads(text), venue=venue) if text.strip() else []
+        groups = _group_rows(events)
+        self._files[filename] = (version, digest, groups)
+        return version, _events_from_groups(groups, filepath)
+
+    def save(self):
+        """移除這次沒有讀到的檔案，有變動時以暫存檔替換寫回快照"""
+        for filename in [name for name in self._files if name not in self._seen]:
+            del self._files[filename]
+            self._dirty = True
+        if not self._dirty:
+            return False
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'format': SNAPSHOT_FORMAT, 'files': self._files}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ 寫入活動快照失敗: {e}")
+            return False
+        self._dirty = False
+        return True
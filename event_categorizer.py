@@ -0,0 +1,111 @@
+"""
+活動自動分類
+
+category_rules.json 的規則（見 config_service.DEFAULT_CATEGORY_RULES）編譯成單一個
+正規表示式：每條規則是一個具名群組，依 priority 由高到低排列，同一個位置符合多條
+規則時 alternation 會先選到優先的規則。每次找到符合後從下一個字元繼續搜尋（而不是
+從符合的結尾），重疊的高優先關鍵字不會被較低優先的關鍵字吃掉。一次掃描就能決定
+類別；遇到最高優先的規則時提前結束。
+
+文字與關鍵字都先經過 text_normalize 的正規化（全形轉半形、小寫），所有分支都以字面字元開頭（單字邊界的 lookbehind 放在字元之後），
+正規表示式引擎可以用開頭字元快速略過不可能符合的位置。
+
+規則檔改變時透過 ConfigService 的訂閱重新編譯，爬蟲與 UI 不需要重新啟動。
+"""
+
+import re
+import threading
+import time
+
+from config_service import get_config_service
+from text_normalize import normalize_text
+
+# 同一個行程中最多隔多久檢查一次規則檔是否改變（秒），逐篇分類時不用每次都 stat
+RULES_CHECK_SECONDS = 5.0
+_GROUP_PREFIX = '_rule'
+
+
+def _rule_alternatives(rule):
+    alternatives = [re.escape(normalize_text(keyword).lower) for keyword in rule.get('keywords', [])]
+    for word in rule.get('words', []):
+        word = re.escape(normalize_text(word).lower)
+        alternatives.append(rf'{word}(?<![0-9a-z]{word})(?![0-9a-z])')
+    alternatives += [f'(?i:{pattern})' for pattern in rule.get('patterns', [])]
+    return alternatives
+
+
+class CategoryMatcher:
+    """編譯後的分類規則"""
+
+    __slots__ = ('categories', '_pattern')
+
+    def __init__(self, rules):
+        # sorted 是穩定排序：同 priority 的規則維持檔案中的順序
+        ordered = sorted((rule for rule in rules if _rule_alternatives(rule)), key=lambda rule: -rule['priority'])
+        self.categories = [rule['category'] for rule in ordered]
+        if ordered:
+            groups = '|'.join(f"(?P<{_GROUP_PREFIX}{i}>{'|'.join(_rule_alternatives(rule))})" for i, rule in enumerate(ordered))
+            self._pattern = re.compile(groups)
+        else:
+            self._pattern = None
+
+    def match(self, text, default=None):
+        """回傳 text（原文或 NormalizedText）符合的最高優先類別，沒有符合的規則時回傳 default"""
+        if not text or self._pattern is None:
+            return default
+        text = normalize_text(text).lower
+        search = self._pattern.search
+        best = None
+        pos = 0
+        while True:
+            m = search(text, pos)
+            if m is None:
+                break
+            index = int(m.lastgroup[len(_GROUP_PREFIX):])
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+            pos = m.start() + 1
+        return self.categories[best] if best is not None else default
+
+
+class EventCategorizer:
+    """依設定服務中的分類規則分類活動，規則改變時自動重新編譯"""
+
+    def __init__(self, config_service=None):
+        self._config = (config_service or get_config_service()).category_rules
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._matcher = CategoryMatcher(self._config.get() or [])
+        self._config.subscribe(self._recompile)
+
+    def _recompile(self, rules):
+        matcher = CategoryMatcher(rules or [])
+        with self._lock:
+            self._matcher = matcher
+        print(f"分類規則已更新: {len(matcher.categories)} 條規則")
+
+    def categorize(self, text, default=None):
+        """回傳 text 的類別代碼，沒有符合的規則時回傳 default"""
+        now = time.monotonic()
+        if now - self._checked_at >= RULES_CHECK_SECONDS:
+            self._checked_at = now
+            self._config.refresh()  # 檔案改變時會呼叫 _recompile
+        with self._lock:
+            matcher = self._matcher
+        return matcher.match(text, default)
+
+
+_default_categorizer = None
+_default_categorizer_lock = threading.Lock()
+
+
+def categorize_event(text, default=None):
+    """以同一個行程共用的分類器分類活動文字（SB 的標題或推文內容）"""
+    global _default_categorizer
+    if _default_categorizer is None:
+        with _default_categorizer_lock:
+            if _default_categorizer is None:
+                _default_categorizer = EventCategorizer()
+    return _default_categorizer.categorize(text, default)
@@ -0,0 +1,165 @@
+"""
+近似重複活動偵測
+
+同一個活動常被發好幾次：預告、提醒、「剩最後幾位」，以及其他場地的轉發。這些推文的
+text 不完全相同，只以 text 去重時每一則都會成為一個待校正的活動。
+
+DuplicateIndex 以 MinHash + LSH 找出內容相近的活動：
+
+- 文字正規化（NFKC、小寫、去除網址與 @帳號、標點改為空白）後切成字元 3-gram
+- 每個 3-gram 只計算一次 CRC32，依餘數分到 NUM_BINS 個桶中各取最小值
+  （one-permutation MinHash），得到固定長度的簽章
+- 簽章每 ROWS_PER_BAND 個值組成一個 band，以 (日期, band 編號, band 值) 為鍵放進
+  LSH 桶；只有同一天、至少一個 band 完全相同的活動才會成為候選
+- 候選再以 3-gram 的 Jaccard 相似度確認，達到 SIMILARITY_THRESHOLD 才視為重複
+
+每個新活動只需要查詢固定數量的桶，與已收錄的活動數無關。活動以 (場地, 日期, 文字)
+識別（與 event_search.doc_key 相同）：固定舉辦的活動每次的 text 相同，不同日期的
+活動必須是不同的項目，否則會被併進同一個群組。
+"""
+
+import hashlib
+import re
+import zlib
+
+from event_search import doc_key
+from text_normalize import normalize_text
+
+SHINGLE_SIZE = 3
+NUM_BINS = 32
+ROWS_PER_BAND = 2
+SIMILARITY_THRESHOLD = 0.5
+
+_URL_PATTERN = re.compile(r'https?://\S+|www\.\S+')
+_MENTION_PATTERN = re.compile(r'@\w+')
+_NON_WORD_PATTERN = re.compile(r'[\W_]+')
+
+
+def normalize_for_similarity(text):
+    """相似度比較用的正規化文字"""
+    text = normalize_text(text).lower
+    text = _URL_PATTERN.sub(' ', text)
+    text = _MENTION_PATTERN.sub(' ', text)
+    return _NON_WORD_PATTERN.sub(' ', text).strip()
+
+
+def shingles(text):
+    """正規化後的字元 3-gram 集合"""
+    normalized = normalize_for_similarity(text)
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+def signature(shingle_set):
+    """one-permutation MinHash 簽章；沒有任何 3-gram 落入的桶為 None"""
+    bins = [None] * NUM_BINS
+    for shingle in shingle_set:
+        h = zlib.crc32(shingle.encode('utf-8'))
+        index = h % NUM_BINS
+        value = h // NUM_BINS
+        current = bins[index]
+        if current is None or value < current:
+            bins[index] = value
+    return tuple(bins)
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def event_key(event):
+    """活動的短識別碼（場地 + 日期 + 文字），用於記錄 duplicate_of"""
+    return hashlib.sha1(f"{event.venue}\n{event.date_key}\n{event.text}".encode('utf-8')).hexdigest()[:12]
+
+
+def _band_keys(date, sig):
+    for start in range(0, NUM_BINS, ROWS_PER_BAND):
+        band = sig[start:start + ROWS_PER_BAND]
+        if None not in band:
+            yield (date, start, band)
+
+
+class DuplicateIndex:
+    """跨場地的近似重複活動索引，同一群近似重複的活動以 union-find 合併成群組"""
+
+    def __init__(self, events=(), threshold=SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._buckets = {}
+        self._events = {}  # {(場地, 日期, 文字): 活動}
+        self._parent = {}
+        for event in events:
+            self.add(event)
+
+    def __len__(self):
+        return len(self._events)
+
+    def _find(self, key):
+        parent = self._parent
+        root = key
+        while parent[root] != root:
+            root = parent[root]
+        while parent[key] != root:
+            parent[key], key = root, parent[key]
+        return root
+
+    def _union(self, a, b):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            self._parent[root_b] = root_a
+
+    def find_similar(self, event, _shingles=None, _sig=None):
+        """回傳與 event 同一天且內容相近的已收錄活動 [(活動, 相似度)]，相似度高的在前"""
+        if not event.date or not event.text:
+            return []
+        event_shingles = _shingles if _shingles is not None else shingles(event.text)
+        sig = _sig if _sig is not None else signature(event_shingles)
+        own_key = doc_key(event)
+        candidates = set()
+        for bucket_key in _band_keys(event.date, sig):
+            candidates.update(self._buckets.get(bucket_key, ()))
+        candidates.discard(own_key)
+
+        matches = []
+        for key in candidates:
+            other = self._events[key]
+            similarity = jaccard(event_shingles, shingles(other.text))
+            if similarity >= self.threshold:
+                matches.append((other, similarity))
+        matches.sort(key=lambda item: -item[1])
+        return matches
+
+    def add(self, event):
+        """收錄活動並回傳它的近似重複活動（同 find_similar）；沒有日期的活動不收錄"""
+        if not event.date or not event.text:
+            return []
+        key = doc_key(event)
+        if key in self._events:
+            self._events[key] = event
+            return []
+        event_shingles = shingles(event.text)
+        sig = signature(event_shingles)
+        matches = self.find_similar(event, event_shingles, sig)
+
+        self._events[key] = event
+        self._parent[key] = key
+        for bucket_key in _band_keys(event.date, sig):
+            self._buckets.setdefault(bucket_key, []).append(key)
+        for other, _ in matches:
+            self._union(doc_key(other), key)
+        return matches
+
+    def clusters(self, min_size=2):
+        """近似重複的群組：[[活動, ...], ...]，群組依日期排序，群組內依場地排序"""
+        groups = {}
+        for key, event in self._events.items():
+            groups.setdefault(self._find(key), []).append(event)
+        result = [
+            sorted(events, key=lambda e: (e.venue, e.text))
+            for events in groups.values()
+            if len(events) >= min_size
+        ]
+        result.sort(key=lambda events: (events[0].date_key, events[0].venue))
+        return result
@@ -0,0 +1,259 @@
+"""
+依日期排序的場地活動索引
+
+每個場地的活動以日期排序存放，月份、日期區間與未來 N 天的查詢都用 bisect 完成，
+不需要每次掃描全部活動或重新排序。
+"""
+
+import heapq
+import json
+import os
+import traceback
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from itertools import groupby
+
+import pytz
+
+from event_cache import EventSnapshot
+from event_model import NO_DATE, event_file_version, load_event_file
+from event_search import doc_key
+
+# 字串比較下，大於任何 YYYY-MM-DD 的上界（'N/A' 本身也大於所有日期，排在最後）
+_DATE_MAX = '9999-99-99'
+
+
+class VenueEvents:
+    """單一場地的活動，依日期鍵排序（沒有日期的活動鍵為 'N/A'，排在最後）"""
+
+    __slots__ = ('venue', '_keys', '_events')
+
+    def __init__(self, venue):
+        self.venue = venue
+        self._keys = []
+        self._events = []
+
+    def __len__(self):
+        return len(self._events)
+
+    def __iter__(self):
+        return iter(self._events)
+
+    def add(self, event):
+        """插入活動，同一天的活動保持插入順序"""
+        pos = bisect_right(self._keys, event.date_key)
+        self._keys.insert(pos, event.date_key)
+        self._events.insert(pos, event)
+
+    def extend(self, events):
+        """一次加入多個活動：只排序一次，已依日期排序的輸入（例如快照）只需線性合併"""
+        self._events = sorted(self._events + list(events), key=lambda e: e.date_key)
+        self._keys = [event.date_key for event in self._events]
+
+    def remove(self, event, date_key=None):
+        """移除活動（以物件身分比對），回傳是否找到
+
+        Args:
+            event: 要移除的活動
+            date_key: 活動被修改前的日期鍵；預設使用目前的 event.date_key
+        """
+        key = date_key if date_key is not None else event.date_key
+        lo = bisect_left(self._keys, key)
+        hi = bisect_right(self._keys, key, lo)
+        for i in range(lo, hi):
+            if self._events[i] is event:
+                del self._keys[i]
+                del self._events[i]
+                return True
+        return False
+
+    def range(self, start=None, end=None):
+        """回傳 start <= 日期 <= end 的活動（依日期排序）"""
+        lo = 0 if start is None else bisect_left(self._keys, start)
+        hi = len(self._keys) if end is None else bisect_right(self._keys, end, lo)
+        return self._events[lo:hi]
+
+    def on(self, date_key):
+        """回傳某一天的所有活動"""
+        return self.range(date_key, date_key)
+
+    def dates(self):
+        """依序回傳所有不重複的日期鍵"""
+        return [key for key, _ in groupby(self._keys)]
+
+    def year_months(self):
+        """依序回傳有活動的年月（'YYYY-MM'），每個月只做一次 bisect"""
+        months = []
+        keys = self._keys
+        i = 0
+        while i < len(keys) and keys[i] != NO_DATE:
+            year_month = keys[i][:7]
+            months.append(year_month)
+            i = bisect_right(keys, f"{year_month}-99", i)
+        return months
+
+    def grouped_by_date(self):
+        """依日期分組，產生 (日期鍵, 活動列表)"""
+        for key, items in groupby(self._events, key=lambda e: e.date_key):
+            yield key, list(items)
+
+
+class EventIndex:
+    """跨場地的活動索引
+
+    attach_search() 掛上 EventSearchIndex 後，add/remove/update/replace 會同步更新全文索引。
+    file_versions 記錄載入時各檔案的 event_file_version()，批次寫入時用來確認
+    畫面上的資料仍是檔案的最新內容。
+    """
+
+    def __init__(self, events=()):
+        self._venues = {}
+        self.search_index = None
+        self.file_versions = {}
+        for event in events:
+            self.add(event)
+
+    def __len__(self):
+        return sum(len(v) for v in self._venues.values())
+
+    def venues(self):
+        """依名稱排序的場地列表"""
+        return sorted(self._venues)
+
+    def venue(self, venue):
+        """取得場地的 VenueEvents（不存在時建立空的）"""
+        venue_events = self._venues.get(venue)
+        if venue_events is None:
+            venue_events = self._venues[venue] = VenueEvents(venue)
+        return venue_events
+
+    def __iter__(self):
+        for venue_events in self._venues.values():
+            yield from venue_events
+
+    def attach_search(self, search_index):
+        """掛上全文索引並與目前的活動同步（只重新切詞有變動的活動）"""
+        self.search_index = search_index
+        return search_index.sync(self)
+
+    def add(self, event):
+        self.venue(event.venue).add(event)
+        if self.search_index is not None:
+            self.search_index.add(event)
+
+    def remove(self, event, date_key=None):
+        venue_events = self._venues.get(event.venue)
+        removed = venue_events.remove(event, date_key) if venue_events else False
+        if removed and self.search_index is not None:
+            self.search_index.remove(event, date_key)
+        return removed
+
+    def set_venue(self, venue, events):
+        """以新的活動列表取代某場地的所有活動（批次修改後直接使用寫入的結果，不需重新讀檔）"""
+        old_venue = self._venues.pop(venue, None)
+        for event in events:
+            self.add(event)
+        if old_venue is not None and self.search_index is not None:
+            # 內容沒變的活動在 add() 時已換成新物件，這裡只移除已不存在的活動
+            kept_keys = {doc_key(event) for event in events}
+            for event in old_venue:
+                if doc_key(event) not in kept_keys:
+                    self.search_index.remove(event)
+
+    def update(self, event, old_date_key):
+        """活動日期被修改後，將它移到新的位置"""
+        self.remove(event, old_date_key)
+        self.add(event)
+
+    def replace(self, old_event, new_event):
+        """以新活動取代舊活動（例如校正後的版本）"""
+        self.remove(old_event)
+        self.add(new_event)
+
+    def events_on(self, venue, date_key):
+        venue_events = self._venues.get(venue)
+        return venue_events.on(date_key) if venue_events else []
+
+    def range(self, start=None, end=None, venue=None):
+        """回傳 start <= 日期 <= end 的活動
+
+        指定 venue 時只查詢該場地，否則合併所有場地並依日期排序。
+        """
+        if venue is not None:
+            venue_events = self._venues.get(venue)
+            return venue_events.range(start, end) if venue_events else []
+        return list(heapq.merge(
+            *(v.range(start, end) for v in self._venues.values()),
+            key=lambda e: e.date_key,
+        ))
+
+    def dated(self, venue=None):
+        """所有有日期的活動（不含 'N/A'）"""
+        return self.range(None, _DATE_MAX, venue=venue)
+
+    def month(self, year, month, venue=None):
+        """某年某月的所有活動"""
+        prefix = f"{year:04d}-{month:02d}"
+        return self.range(f"{prefix}-00", f"{prefix}-99", venue=venue)
+
+    def year_months(self, venue=None):
+        """依序回傳有活動的年月（'YYYY-MM'）"""
+        if venue is not None:
+            venue_events = self._venues.get(venue)
+            return venue_events.year_months() if venue_events else []
+        months = set()
+        for venue_events in self._venues.values():
+            months.update(venue_events.year_months())
+        return sorted(months)
+
+    def upcoming(self, days, today=None, venue=None):
+        """從今天起 days 天內（含今天）的活動"""
+        if today is None:
+            today = datetime.now(pytz.timezone('Asia/Taipei'))
+        start = today.strftime('%Y-%m-%d')
+        end = (today + timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        return self.range(start, end, venue=venue)
+
+    def grouped_by_date(self, venue):
+        """某場地依日期分組的活動，產生 (日期鍵, 活動列表)"""
+        venue_events = self._venues.get(venue)
+        if venue_events:
+            yield from venue_events.grouped_by_date()
+
+
+def load_outputs_index(outputs_dir, include_deleted=False, cache_dir=None):
+    """讀取 outputs 目錄下所有 `<venue>_events.json` 並建立索引
+
+    Args:
+        outputs_dir: 活動檔案目錄
+        include_deleted: 是否包含已標記刪除的活動（UI 預設不顯示）
+        cache_dir: 活動快照的目錄（見 event_cache）；指定時只重新解析有變動的檔案
+    """
+    event_index = EventIndex()
+    snapshot = EventSnapshot.open(outputs_dir, cache_dir) if cache_dir else None
+    for filename in os.listdir(outputs_dir):
+        if not filename.endswith('_events.json'):
+            continue
+        filepath = os.path.join(outputs_dir, filename)
+        venue_name = filename.replace('_events.json', '')
+        try:
+            if snapshot is not None:
+                version, events = snapshot.load_file(filepath, venue_name)
+            else:
+                # 先取版本再讀取：讀取期間被替換時版本會過期，之後的寫入檢查會失敗而不是覆蓋
+                version = event_file_version(filepath)
+                events = load_event_file(filepath, venue=venue_name)
+            event_index.venue(venue_name).extend(
+                event for event in events if include_deleted or not event.delete
+            )
+            event_index.file_versions[filepath] = version
+        except json.JSONDecodeError as e:
+            print(f"載入檔案 {filepath} 時發生 JSON 錯誤: {e}")
+            traceback.print_exc()
+        except Exception as e:
+            print(f"載入檔案 {filepath} 時發生錯誤: {e}")
+            traceback.print_exc()
+    if snapshot is not None:
+        snapshot.save()
+        print(f"活動快照: 沿用 {snapshot.hits} 個檔案，重新解析 {snapshot.reparsed} 個檔案")
+    return event_index
@@ -0,0 +1,308 @@
+"""
+活動資料模型
+
+所有活動在程式內部統一使用 `Event`，只在讀寫 outputs/*_events.json 時轉換成 dict。
+
+寫入一律持有檔案鎖並以暫存檔 + os.replace 替換；讀取-修改-寫入的流程在外層以
+file_lock(filepath) 包住，爬蟲與 UI 同時修改同一個檔案時不會互相覆蓋。
+"""
+
+import json
+import os
+import re
+import sys
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from file_lock import file_lock
+
+# JSON 檔案中活動欄位的固定順序（與既有檔案格式一致）
+EVENT_FIELDS = (
+    'date', 'text', 'check', 'venue', 'start_time', 'end_time',
+    'link', 'title', 'brief_description', 'delete', 'category',
+)
+
+_DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+_TIME_PATTERN = re.compile(r'(\d{1,2})[:：](\d{2})')
+
+NO_DATE = 'N/A'  # 沒有日期的活動在 UI 中使用的分組鍵
+
+
+class EventValidationError(ValueError):
+    """活動資料格式不正確"""
+
+
+class EventFileConflict(RuntimeError):
+    """活動檔在讀取後被其他寫入者修改（樂觀並行檢查失敗）"""
+
+
+def _clean_str(value):
+    """將 None 轉為空字串並去除前後空白"""
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def _optional_str(value):
+    """空字串或 None 一律視為 None"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def is_valid_date(date_str):
+    """檢查是否為合法的 YYYY-MM-DD 日期"""
+    if not date_str or not _DATE_PATTERN.fullmatch(date_str):
+        return False
+    try:
+        datetime.strptime(date_str, '%Y-%m-%d')
+    except ValueError:
+        return False
+    return True
+
+
+def normalize_date(value):
+    """將日期欄位正規化：空值與 'N/A' 皆轉為 None"""
+    value = _optional_str(value)
+    if value is None or value.upper() == NO_DATE:
+        return None
+    return value
+
+
+def normalize_time(value):
+    """將時間欄位正規化為 HH:MM，無法解析時保留原字串"""
+    value = _optional_str(value)
+    if value is None:
+        return None
+    m = _TIME_PATTERN.fullmatch(value)
+    if m:
+        return f"{int(m.group(1)):02d}:{m.group(2)}"
+    return value
+
+
+@dataclass(slots=True)
+class Event:
+    """單一活動
+
+    source_file 為執行時欄位，不會寫回 JSON；extra 保存檔案中未知的欄位以免遺失。
+    """
+    date: str | None
+    text: str = ''
+    check: bool = False
+    venue: str = ''
+    start_time: str | None = None
+    end_time: str | None = None
+    link: str | None = None
+    title: str = ''
+    brief_description: str = ''
+    delete: bool = False
+    category: str | None = None
+    source_file: str | None = field(default=None, compare=False, repr=False)
+    extra: dict = field(default_factory=dict, compare=False, repr=False)
+
+    @property
+    def date_key(self):
+        """UI 分組用的日期鍵，沒有日期時為 'N/A'"""
+        return self.date or NO_DATE
+
+    @property
+    def has_title(self):
+        """是否有可顯示的標題（排除空白與佔位用的 '.'）"""
+        return bool(self.title) and self.title != '.'
+
+    def normalize(self):
+        """就地正規化所有欄位，回傳自身"""
+        self.date = normalize_date(self.date)
+        self.text = _clean_str(self.text)
+        self.check = bool(self.check)
+        self.venue = sys.intern(_clean_str(self.venue))
+        self.start_time = normalize_time(self.start_time)
+        self.end_time = normalize_time(self.end_time)
+        self.link = _optional_str(self.link)
+        self.title = _clean_str(self.title)
+        self.brief_description = _clean_str(self.brief_description)
+        self.delete = bool(self.delete)
+        category = _optional_str(self.category)
+        self.category = sys.intern(category) if category else None
+        return self
+
+    def validate(self):
+        """嚴格驗證（用於使用者輸入），失敗時拋出 EventValidationError"""
+        if self.date is not None and not is_valid_date(self.date):
+            raise EventValidationError("日期格式不正確。請使用 YYYY-MM-DD 格式。")
+        if not self.venue:
+            raise EventValidationError("場地不能為空。")
+        return self
+
+    def build_text(self):
+        """依場地、標題與時間組出 text 欄位（網站與手動建立的活動使用）"""
+        text = f"{self.venue} - {self.title}"
+        if self.start_time and self.end_time:
+            text += f" {self.start_time}~{self.end_time}"
+        return text
+
+    @classmethod
+    def from_dict(cls, data, venue=None, source_file=None):
+        """從 JSON dict 建立並正規化活動
+
+        Args:
+            data: 原始 dict
+            venue: 若提供，覆寫 dict 中的 venue（以檔名為準）
+            source_file: 活動所在的檔案路徑
+        """
+        extra = {k: v for k, v in data.items() if k not in EVENT_FIELDS and k != 'source_file'}
+        event = cls(
+            date=data.get('date'),
+            text=data.get('text'),
+            check=data.get('check', False),
+            venue=venue if venue is not None else data.get('venue'),
+            start_time=data.get('start_time'),
+            end_time=data.get('end_time'),
+            link=data.get('link'),
+            title=data.get('title'),
+            brief_description=data.get('brief_description'),
+            delete=data.get('delete', False),
+            category=data.get('category'),
+            source_file=source_file,
+            extra=extra,
+        )
+        return event.normalize()
+
+    def to_dict(self):
+        """轉換為寫入 JSON 用的 dict（不含 source_file）"""
+        data = {
+            'date': self.date,
+            'text': self.text,
+            'check': self.check,
+            'venue': self.venue,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'link': self.link,
+            'title': self.title,
+            'brief_description': self.brief_description,
+            'delete': self.delete,
+            'category': self.category,
+        }
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+def events_from_json(raw_events, venue=None, source_file=None):
+    """將 JSON 陣列轉為 Event 列表，略過非 dict 的項目"""
+    return [
+        Event.from_dict(item, venue=venue, source_file=source_file)
+        for item in raw_events
+        if isinstance(item, dict)
+    ]
+
+
+def events_to_json(events):
+    """將 Event 列表轉為可寫入 JSON 的 dict 列表"""
+    return [event.to_dict() for event in events]
+
+
+def venue_from_filename(filename):
+    """從 `<venue>_events.json` 檔名取得場地名稱"""
+    return os.path.basename(filename).replace('_events.json', '')
+
+
+def load_event_file(filepath, venue=None):
+    """讀取活動檔案，空檔案或不存在時回傳空列表
+
+    JSON 格式錯誤時拋出 json.JSONDecodeError，由呼叫端決定如何處理。
+    """
+    if not os.path.exists(filepath):
+        return []
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if not content.strip():
+        return []
+    if venue is None:
+        venue = venue_from_filename(filepath)
+    return events_from_json(json.loads(content), venue=venue, source_file=filepath)
+
+
+def event_file_version(filepath):
+    """檔案目前的版本標記，不存在時回傳 None
+
+    每次寫入都以暫存檔替換，inode、修改時間（奈秒）與大小至少會有一個改變，
+    因此只需 stat 就能判斷檔案在讀取後是否被其他寫入者修改過。
+    """
+    try:
+        stat = os.stat(filepath)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _check_version(filepath, expected_version):
+    if expected_version is not None and event_file_version(filepath) != expected_version:
+        raise EventFileConflict(f"{os.path.basename(filepath)} 在讀取後已被其他程式修改，請重新載入後再試一次。")
+
+
+def _stage_event_file(filepath, events):
+    """寫入暫存檔並確實寫到磁碟，回傳 (暫存檔路徑, 位元組數)"""
+    os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(events_to_json(events), f, ensure_ascii=False, indent=4)
+        size = f.tell()
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp_path, size
+
+
+def save_event_file(filepath, events, expected_version=None):
+    """將活動列表寫入檔案，回傳寫入的位元組數
+
+    寫入期間持有檔案鎖，先寫暫存檔再以 os.replace 替換，讀取端不會讀到寫到一半的檔案。
+    讀取-修改-寫入時請在外層以 file_lock(filepath) 包住整個流程。
+
+    Args:
+        expected_version: 讀取時的 event_file_version()；檔案之後被修改過時拋出 EventFileConflict
+    """
+    with file_lock(filepath):
+        _check_version(filepath, expected_version)
+        tmp_path, size = _stage_event_file(filepath, events)
+        os.replace(tmp_path, filepath)
+        return size
+
+
+def save_event_files(files, expected_versions=None):
+    """一次寫入多個活動檔，回傳寫入的總位元組數
+
+    取得所有檔案的鎖（依路徑排序，避免互相等待）後先把所有檔案寫入暫存檔，
+    全部成功後才逐一替換；任何一個寫入失敗或版本不符時刪除暫存檔並拋出例外，
+    原本的檔案都不會被修改。
+
+    Args:
+        files: {檔案路徑: 活動列表}
+        expected_versions: {檔案路徑: event_file_version()}（可選），用於樂觀並行檢查
+    """
+    expected_versions = expected_versions or {}
+    with ExitStack() as stack:
+        for filepath in sorted(files):
+            stack.enter_context(file_lock(filepath))
+        for filepath in files:
+            _check_version(filepath, expected_versions.get(filepath))
+
+        staged = []
+        total = 0
+        try:
+            for filepath, events in files.items():
+                tmp_path, size = _stage_event_file(filepath, events)
+                staged.append((tmp_path, filepath))
+                total += size
+        except BaseException:
+            for tmp_path in [f"{filepath}.tmp" for filepath in files]:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            raise
+        for tmp_path, filepath in staged:
+            os.replace(tmp_path, filepath)
+        return total
@@ -0,0 +1,191 @@
+"""
+跨場地活動全文搜尋
+
+以倒排索引（token → 活動）搜尋所有場地的 title、text、brief_description 與 link：
+
+- 中日韓文字沒有空白分詞，連續的 CJK 字元切成單字與相鄰兩字（bigram），
+  查詢「縛り」會用「縛り」這個 bigram 取出候選，查詢單一字時用單字
+- 英數字以整個單字為 token，查詢時以前綴比對，邊打字邊搜尋也能找到
+- 候選活動最後再以原文子字串確認，避免 bigram 不相鄰造成的誤判
+
+索引以 (場地, 日期鍵, 活動文字) 識別活動：固定舉辦的活動每次的 text 相同，
+只以 text 識別會讓不同日期的活動併成一筆。
+重新載入 outputs 時 sync() 只重新切詞內容有變動的活動，編輯活動時透過
+EventIndex 的 add/remove 同步更新，查詢時不需要重新讀取任何 JSON 檔案。
+"""
+
+import re
+from bisect import bisect_left
+
+_CJK = '぀-ヿ㐀-䶿一-鿿豈-﫿가-힯'
+_TOKEN_PATTERN = re.compile(rf'([{_CJK}]+)|([^\W_{_CJK}]+)')
+_CJK_CHAR = re.compile(rf'[{_CJK}]')
+
+SEARCH_FIELDS = ('title', 'text', 'brief_description', 'link')
+
+
+def _fold(text):
+    return text.casefold() if text else ''
+
+
+def tokenize(text):
+    """切出搜尋用的 token 集合：CJK 的單字與 bigram，以及英數字單字"""
+    tokens = set()
+    for cjk, word in _TOKEN_PATTERN.findall(_fold(text)):
+        if word:
+            tokens.add(word)
+            continue
+        tokens.update(cjk)
+        tokens.update(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return tokens
+
+
+def doc_key(event, date_key=None):
+    """活動在索引中的識別鍵；date_key 為活動被修改前的日期鍵（預設使用目前的 event.date_key）"""
+    return (event.venue, date_key if date_key is not None else event.date_key, event.text)
+
+
+class EventSearchIndex:
+    """活動的倒排索引"""
+
+    def __init__(self, events=()):
+        self._postings = {}
+        self._docs = {}
+        self._words = None  # 排序後的英數字 token，前綴查詢時才建立
+        for event in events:
+            self.add(event)
+
+    def __len__(self):
+        return len(self._docs)
+
+    @staticmethod
+    def _fingerprint(event):
+        return tuple(getattr(event, name) or '' for name in SEARCH_FIELDS)
+
+    def add(self, event):
+        """加入或更新一個活動"""
+        key = doc_key(event)
+        fingerprint = self._fingerprint(event)
+        doc = self._docs.get(key)
+        if doc is not None:
+            if doc[1] == fingerprint:
+                # 內容沒變，只換成最新的物件
+                self._docs[key] = (event, fingerprint, doc[2], doc[3])
+                return
+            self._remove_key(key)
+        haystack = '\n'.join(_fold(value) for value in fingerprint)
+        tokens = frozenset(tokenize(haystack))
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                self._words = None
+            postings.add(key)
+        self._docs[key] = (event, fingerprint, tokens, haystack)
+
+    def remove(self, event, date_key=None):
+        """移除活動，回傳是否找到
+
+        Args:
+            event: 要移除的活動
+            date_key: 活動被修改前的日期鍵；預設使用目前的 event.date_key
+        """
+        return self._remove_key(doc_key(event, date_key))
+
+    def _remove_key(self, key):
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return False
+        for token in doc[2]:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.discard(key)
+            if not postings:
+                del self._postings[token]
+                self._words = None
+        return True
+
+    def sync(self, events):
+        """與目前的活動集合同步：只切詞新增或內容改變的活動，移除已不存在的活動
+
+        Returns:
+            (新增或更新數, 移除數)
+        """
+        wanted = {}
+        for event in events:
+            wanted[doc_key(event)] = event
+        removed = [key for key in self._docs if key not in wanted]
+        for key in removed:
+            self._remove_key(key)
+        changed = 0
+        for key, event in wanted.items():
+            doc = self._docs.get(key)
+            if doc is None or doc[1] != self._fingerprint(event):
+                changed += 1
+            self.add(event)
+        return changed, len(removed)
+
+    def _prefix_postings(self, prefix):
+        """英數字 token 以前綴比對，回傳所有符合單字的活動聯集"""
+        if self._words is None:
+            self._words = sorted(token for token in self._postings if not _CJK_CHAR.match(token))
+        words = self._words
+        matched = set()
+        i = bisect_left(words, prefix)
+        while i < len(words) and words[i].startswith(prefix):
+            matched |= self._postings[words[i]]
+            i += 1
+        return matched
+
+    def _term_candidates(self, term):
+        """單一查詢詞的候選活動；查詢詞中沒有可用 token 時回傳 None"""
+        candidates = None
+        for cjk, word in _TOKEN_PATTERN.findall(term):
+            if word:
+                keys_list = [self._prefix_postings(word)]
+            elif len(cjk) == 1:
+                keys_list = [self._postings.get(cjk, set())]
+            else:
+                keys_list = [self._postings.get(cjk[i:i + 2], set()) for i in range(len(cjk) - 1)]
+            # 由最小的集合開始取交集
+            for keys in sorted(keys_list, key=len):
+                candidates = set(keys) if candidates is None else candidates & keys
+                if not candidates:
+                    return candidates
+        return candidates
+
+    def search(self, query, venue=None, limit=None):
+        """搜尋活動：以空白分隔的每個詞都必須出現（不分大小寫）
+
+        Args:
+            query: 查詢字串
+            venue: 只搜尋某個場地
+            limit: 最多回傳幾筆
+
+        Returns:
+            依日期排序的活動列表（沒有日期的排在最後）
+        """
+        terms = _fold(query).split()
+        if not terms:
+            return []
+        candidates = None
+        for term in sorted(terms, key=len, reverse=True):
+            term_keys = self._term_candidates(term)
+            if term_keys is None:
+                continue  # 只有標點符號的詞，留給最後的子字串確認
+            candidates = term_keys if candidates is None else candidates & term_keys
+            if not candidates:
+                return []
+        if candidates is None:
+            candidates = self._docs.keys()
+
+        results = []
+        for key in candidates:
+            if venue is not None and key[0] != venue:
+                continue
+            event, _, _, haystack = self._docs[key]
+            if all(term in haystack for term in terms):
+                results.append(event)
+        results.sort(key=lambda e: (e.date_key, e.venue))
+        return results[:limit] if limit else results
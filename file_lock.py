@@ -0,0 +1,89 @@
+"""
+跨執行緒、跨行程的檔案鎖
+
+爬蟲子行程、SB 日曆抓取與 UI 的編輯都會對同一個 outputs/<venue>_events.json
+做「讀取 → 修改 → 寫回」。file_lock() 以旁邊的 `<檔名>.lock` 檔取得建議式鎖
+（POSIX 使用 fcntl.flock，Windows 使用 msvcrt.locking），同一時間只有一個
+寫入者能進行讀取-修改-寫入。
+
+資料檔本身以暫存檔 + os.replace 替換，inode 每次寫入都會改變，因此鎖放在
+不會被替換的 .lock 檔上。同一個執行緒可以重複取得同一個鎖（例如在鎖內呼叫
+save_event_file），不會自己卡住自己。
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+LOCK_SUFFIX = '.lock'
+
+_local = threading.local()
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _thread_lock(lock_path):
+    """同一行程內各執行緒共用的鎖（Windows 的 msvcrt 鎖在同一行程內不會互斥）"""
+    with _thread_locks_guard:
+        lock = _thread_locks.get(lock_path)
+        if lock is None:
+            lock = _thread_locks[lock_path] = threading.Lock()
+        return lock
+
+
+def _lock_os(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    elif msvcrt is not None:
+        while True:
+            try:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                time.sleep(0.05)
+
+
+def _unlock_os(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(filepath):
+    """取得 filepath 的獨占鎖（可重入），離開時釋放"""
+    lock_path = os.path.abspath(filepath) + LOCK_SUFFIX
+    held = getattr(_local, 'held', None)
+    if held is None:
+        held = _local.held = {}
+    if lock_path in held:
+        held[lock_path] += 1
+        try:
+            yield
+        finally:
+            held[lock_path] -= 1
+        return
+
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with _thread_lock(lock_path):
+        with open(lock_path, 'a+b') as f:
+            _lock_os(f)
+            held[lock_path] = 1
+            try:
+                yield
+            finally:
+                del held[lock_path]
+                _unlock_os(f)
@@ -0,0 +1,61 @@
+"""
+文字正規化
+
+推文與 SB 日曆的文字混用全形與半形符號（／、－、～、：、全形數字與英文），各個解析器
+原本在正規表示式中逐一列出這些變體，並在各處重複呼叫 .lower()。normalize_text()
+對每段文字只做一次：
+
+- NFKC：全形英數字與符號轉為半形（／→/、－→-、～→~、：→:、１９→19、ＳＰ→SP）
+- 符號統一：NFKC 不會處理的各種破折號、波浪號、冒號與斜線也轉為 ASCII
+- 空白：連續的空白與 tab 合併為一個空格（保留換行）
+- lower：casefold 後的影子版本，供不分大小寫的比對使用
+
+結果以 NormalizedText 回傳並以原文為鍵快取，同一篇推文依序經過日期、時間、分類與
+近似重複比對時只會正規化一次。活動的 text 欄位仍保存原文（去重與檔案格式不變），
+正規化的結果只用於比對。
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+
+# NFKC 之後仍需要統一的符號（以正規表示式替換：str.translate 遇到中文字時逐字查表，慢很多）
+_PUNCTUATION_MAP = {
+    **dict.fromkeys('‐‑‒–—―−﹘﹣', '-'),
+    **dict.fromkeys('〜∼˜', '~'),
+    **dict.fromkeys('∶꞉', ':'),
+    **dict.fromkeys('⁄∕', '/'),
+}
+_PUNCTUATION_PATTERN = re.compile(f"[{''.join(_PUNCTUATION_MAP)}]")
+_HORIZONTAL_SPACE = re.compile(r'[^\S\n]+')
+
+
+@dataclass(frozen=True, slots=True)
+class NormalizedText:
+    """正規化後的文字與它的小寫影子"""
+    original: str
+    text: str
+    lower: str
+
+    def __str__(self):
+        return self.text
+
+
+@lru_cache(maxsize=4096)
+def _normalize(text):
+    # 大部分推文已經是 NFKC 形式，檢查比轉換快得多
+    if not unicodedata.is_normalized('NFKC', text):
+        text_nfkc = unicodedata.normalize('NFKC', text)
+    else:
+        text_nfkc = text
+    normalized = _PUNCTUATION_PATTERN.sub(lambda m: _PUNCTUATION_MAP[m.group()], text_nfkc)
+    normalized = _HORIZONTAL_SPACE.sub(' ', normalized).strip()
+    return NormalizedText(text, normalized, normalized.casefold())
+
+
+def normalize_text(text):
+    """正規化文字（同一段原文只計算一次）；已經是 NormalizedText 時直接回傳"""
+    if isinstance(text, NormalizedText):
+        return text
+    return _normalize(text or '')
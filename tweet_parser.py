@@ -0,0 +1,175 @@
+"""
+推文解析：從推文文字中找出活動日期、時間範圍與連結，轉為 Event
+
+爬蟲子行程與 UI 都會使用，因此獨立成不依賴 tkinter 的模組。
+"""
+
+import re
+import traceback
+from datetime import datetime
+
+import datefinder
+import pytz
+
+from event_categorizer import categorize_event
+from event_model import Event
+from text_normalize import normalize_text
+
+# 以下的模式都套用在 normalize_text() 的結果上：全形符號與各種破折號、波浪號已統一成
+# ASCII 的 / - ~ :，模式中不需要再列出全形變體
+_MONTH_DAY_PATTERN = re.compile(r'(\d{1,2})[/-](\d{1,2})')
+_CLOCK_RANGE_PATTERN = re.compile(r'(\d{1,2}):(\d{2})\s*[~-]\s*(\d{1,2}):(\d{2})')
+_HOUR_RANGE_PATTERN = re.compile(r'(\d{1,2})[點点时時]\s*[~-]\s*(\d{1,2})[點点时時]')
+_AMPM_RANGE_PATTERN = re.compile(r'(\d{1,2})\s*(am|pm)?\s*[~-]\s*(\d{1,2})\s*(am|pm)')  # 套用在小寫影子上
+_ZH_HOUR_RANGE_PATTERN = re.compile(r'(早上|上午|下午|晚上)?(\d{1,2})[點点时時][~-](\d{1,2})[點点时時]')
+
+
+# 日期和時間解析函數（從 crawler_API.py 移植）
+def parse_date_with_year(text, today=None):
+    """
+    嘗試從文字中解析日期，若無年份自動補今年或最近一次未來日期。
+    支援多種分隔符：/、／(全形)、-、－(全形)（text 可以是原文或 NormalizedText）
+    """
+    if today is None:
+        taipei_tz = pytz.timezone('Asia/Taipei')
+        today = datetime.now(taipei_tz)
+    
+    # 支援 9/13、09/13、9-13、09-13；全形斜線與減號已在正規化時轉為半形
+    raw = normalize_text(text)
+    m = _MONTH_DAY_PATTERN.search(raw.text)
+    if m:
+        month, day = int(m.group(1)), int(m.group(2))
+        year = today.year
+        
+        # 驗證月份和日期的有效性
+        if month < 1 or month > 12 or day < 1 or day > 31:
+            print(f"日期解析錯誤: 月份或日期超出有效範圍 (月:{month}, 日:{day}), 原始文字: {raw.original}")
+            return None
+        
+        # 確保 try_date 使用與 today 相同的時區
+        taipei_tz = pytz.timezone('Asia/Taipei')
+        try:
+            try_date = taipei_tz.localize(datetime(year, month, day))
+            # 若日期已過，則補下一年（2/29 在下一年可能不存在，同樣視為無效日期）
+            if try_date < today:
+                try_date = taipei_tz.localize(datetime(year+1, month, day))
+        except ValueError as e:
+            # 2/30、9/31 這類不存在的日期：記錄後略過，不讓例外中斷整個解析階段
+            print(f"日期解析錯誤: {e}, 月:{month}, 日:{day}, 原始文字前50字: {raw.original[:50]}...")
+            traceback.print_exc()
+            return None
+        return try_date
+    return None
+
+def parse_time_range(text):
+    """
+    支援多種時間範圍格式：19:00~22:00、19點-22點、7pm-10pm、晚上七點-十點
+    支援全形和半形字符（text 可以是原文或 NormalizedText）
+    """
+    normalized = normalize_text(text)
+    text = normalized.text
+
+    # 1. 19:00~22:00、19:00-22:00、19:00～22:00、19:00－22:00、19：00～22：00（全形已轉為半形）
+    m = _CLOCK_RANGE_PATTERN.search(text)
+    if m:
+        start_time = f"{int(m.group(1)):02d}:{m.group(2)}"
+        end_time = f"{int(m.group(3)):02d}:{m.group(4)}"
+        return start_time, end_time
+    
+    # 2. 19點-22點、19點～22點
+    m = _HOUR_RANGE_PATTERN.search(text)
+    if m:
+        return f"{int(m.group(1)):02d}:00", f"{int(m.group(2)):02d}:00"
+    
+    # 3. 7pm-10pm（在小寫影子上比對，PM/Pm 都會符合）
+    m = _AMPM_RANGE_PATTERN.search(normalized.lower)
+    if m:
+        def to24h(h, ap):
+            h = int(h)
+            if ap == 'pm' and h != 12:
+                h += 12
+            if ap == 'am' and h == 12:
+                h = 0
+            return f"{h:02d}:00"
+        return to24h(m.group(1), m.group(2)), to24h(m.group(3), m.group(4))
+    
+    # 4. 晚上七點-十點
+    m = _ZH_HOUR_RANGE_PATTERN.search(text)
+    if m:
+        def zh_to24h(prefix, h):
+            h = int(h)
+            if prefix in ['下午', '晚上'] and h < 12:
+                h += 12
+            return f"{h:02d}:00"
+        return zh_to24h(m.group(1), m.group(2)), zh_to24h(m.group(1), m.group(3))
+    
+    return None, None
+
+def extract_links(text):
+    """
+    從文字中提取所有連結。
+    """
+    # 匹配 http(s):// 或 www. 開頭的連結
+    urls = re.findall(r'https?://[^\s<>\"\'{}|^`]+', text)
+    if not urls:
+        urls = re.findall(r'www\.[^\s<>\"\'{}|^`]+', text)
+    return urls
+
+def process_tweet_to_event(tweet_data, venue_name, today=None):
+    """
+    將推文資料處理成 Event，沒有日期的推文回傳 None
+    """
+    if today is None:
+        taipei_tz = pytz.timezone('Asia/Taipei')
+        today = datetime.now(taipei_tz)
+    
+    text = tweet_data.get('text', '').strip()
+    
+    # 1. RT開頭直接跳過
+    if text.startswith('RT'):
+        return None
+
+    # 日期、時間與分類都在同一份正規化結果上比對，活動本身保存原文
+    normalized = normalize_text(text)
+
+    # 2. 解析日期
+    date_obj = None
+    date_matches = list(datefinder.find_dates(normalized.text, source=True))
+    if date_matches:
+        date_obj, _ = date_matches[0]
+        taipei_tz = pytz.timezone('Asia/Taipei')
+        if date_obj.tzinfo is None:
+            date_obj = taipei_tz.localize(date_obj)
+        else:
+            date_obj = date_obj.astimezone(taipei_tz)
+    else:
+        # 嘗試補年份
+        date_obj = parse_date_with_year(normalized, today)
+        # parse_date_with_year 已經返回 timezone-aware datetime，不需要再 localize
+    
+    if not date_obj:
+        return None  # 沒有日期就跳過
+    
+    # 避免錯誤日期格式
+    if date_obj.year < 2000 or date_obj.year > 2100:
+        return None
+    
+    date_found = date_obj.strftime('%Y-%m-%d')
+
+    # 3. 解析時間範圍
+    start_time, end_time = parse_time_range(normalized)
+
+    # 提取連結，文本中沒有連結時使用推文連結
+    links = extract_links(text)
+    link = links[0] if links else tweet_data.get('tweet_url')
+
+    return Event(
+        date=date_found,
+        text=text,
+        check=False,
+        venue=venue_name,
+        start_time=start_time,
+        end_time=end_time,
+        link=link,
+        category=categorize_event(normalized),  # 沒有符合的規則時留空，由人工分類
+    ).normalize()